@@ -6,9 +6,12 @@ from .cli import (say_hello, ask_if_snapshot_wanted, handle_snapshot_request,
 from .load import load_data
 from .classes.time_custom import Time_Custom
 from .classes.hash import Hash
-from .classes.package import Package
+from .classes.package import Package, PkgState
 from .classes.truck import Truck
+from .classes.delivery_groups import DeliveryGroups
+from .classes.neighbor_index import NeighborIndex
 from .classes.route_builder import RouteBuilder
+from .classes.travel_times import build_travel_time_matrix
 from .tests.general import test
 
 
@@ -22,21 +25,19 @@ Note: the number 79 is hardcoded 5 times in "display" functions and methods
 
 def all_packages_delivered(packages):
     '''Return whether all packages are delivered.'''
-    return all([pkg.props['state'].name == 'DELIVERED'
-                for pkg in packages])
+    return all([pkg.state is PkgState.DELIVERED for pkg in packages])
 
 
 def number_delivered(packages):
     '''Return count of number delivered.'''
-    return sum([1 for pkg in packages
-                if pkg.props['state'].name == 'DELIVERED'])
+    return sum([1 for pkg in packages if pkg.state is PkgState.DELIVERED])
 
 
 def display_packages_with_history(packages):
     '''Display each package and its delivery-status histories.'''
     sorted_pkgs_with_history = '\n'.join(
         [(str(p).replace('PkgState.', '') + '\n\t' + p.history_string('\t'))
-         for p in sorted(packages, key=lambda p: p.props['ID'])])
+         for p in sorted(packages, key=lambda p: p.ID)])
 
     print(f'Packages and their histories:\n{sorted_pkgs_with_history}\n')
     print('*' * 79, '\n')
@@ -50,11 +51,11 @@ def display_distance_traveled(total_distance):
 def is_package_delivered_and_on_time(package):
     '''Return whether the given package was delivered at all if it had no
     deadline, and whether it was delivered on time if it did have one.'''
-    for record in package.props['history']:
-        if record.state.name == 'DELIVERED':
-            if package.props['deadline'] is None:
+    for record in package.history:
+        if record.state is PkgState.DELIVERED:
+            if package.deadline is None:
                 return True
-            if record.time <= package.props['deadline']:
+            if record.time <= package.deadline:
                 return True
     return False
 
@@ -77,19 +78,16 @@ def display_distances(distances):
     print('DISTANCES\n', string)
 
 
-def run_program(distance_csv, package_csv):
-    '''Run the program!'''
-    distances, Locations, packages = load_data(distance_csv, package_csv)
-
-    say_hello()
-    Destination_Corrections = get_destination_corrections(Locations)
-    route_display_wanted = ask_if_route_display_wanted()
-    snapshot_wanted = ask_if_snapshot_wanted()
-    package_histories_wanted = ask_if_package_histories_wanted()
-    print('*' * 79, '\n')
-
+def deliver_packages(distances, Locations, packages, Destination_Corrections,
+                     route_display_wanted=False):
+    '''Send trucks out, one route at a time, until all packages are delivered
+    (or no more can be); return the trucks.'''
     number_of_trucks = 3
     number_of_drivers = 2
+    Truck.id_counter = 1  # each run numbers its trucks from 1
+    travel_times = build_travel_time_matrix(distances, Truck.speed_function)
+    neighbors = NeighborIndex(distances)
+    delivery_groups = DeliveryGroups(packages)
     trucks = []
     for i in range(number_of_drivers):  # trucks can't be sent without drivers
         trucks.append(Truck())
@@ -99,8 +97,7 @@ def run_program(distance_csv, package_csv):
 
         # send out whichever truck arrives to the hub first, or the lower-ID
         # truck if they are ready to leave at the same time (e.g. 8 AM)
-        truck = sorted(trucks,
-                       key=lambda t: (t.props['time'], t.props['ID']))[0]
+        truck = sorted(trucks, key=lambda t: (t.time, t.ID))[0]
 
         packages_ready = truck.get_available_packages(
             packages, Destination_Corrections)
@@ -110,8 +107,8 @@ def run_program(distance_csv, package_csv):
         if (len(packages_ready) == 0 and
                 len(Destination_Corrections) > 0):
             latest_correction = max([c.time for c in Destination_Corrections])
-            if truck.props['time'] < latest_correction:
-                truck.props['time'] = latest_correction
+            if truck.time < latest_correction:
+                truck.time = latest_correction
 
                 packages_ready = truck.get_available_packages(
                     packages, Destination_Corrections)
@@ -120,16 +117,19 @@ def run_program(distance_csv, package_csv):
             ['available_packages', packages_ready],
             ['distances', distances],
             ['max_load', Truck.max_packages],
-            ['truck_number', truck.props['ID']],
+            ['truck_number', truck.ID],
             ['Locations', Locations],
             ['speed_function', Truck.speed_function],
+            ['travel_times', travel_times],
+            ['neighbors', neighbors],
+            ['delivery_groups', delivery_groups],
             ['starting_location', Truck.starting_location],
-            ['leaving_hub_at', truck.props['time']])
+            ['leaving_hub_at', truck.time])
         route_builder = RouteBuilder(route_parameters)
         route = route_builder.build_route()
 
         if route_display_wanted and route != []:
-            print(f"\nFOR Truck {truck.props['ID']}, AT {truck.props['time']}")
+            print(f"\nFOR Truck {truck.ID}, AT {truck.time}")
             route_builder.display_route()
 
         truck.load(route_builder.get_packages())
@@ -139,8 +139,26 @@ def run_program(distance_csv, package_csv):
         if not number_delivered_after_loop > number_delivered_before_loop:
             break
 
-    total_distance = sum([truck.props['mileage_for_day']
-                          for truck in trucks])
+    return trucks
+
+
+def run_program(distance_csv, package_csv, cache_path=None):
+    '''Run the program! If cache_path is given, load data through a binary
+    cache there (see load_data).'''
+    distances, Locations, packages = load_data(distance_csv, package_csv,
+                                               cache_path)
+
+    say_hello()
+    Destination_Corrections = get_destination_corrections(Locations)
+    route_display_wanted = ask_if_route_display_wanted()
+    snapshot_wanted = ask_if_snapshot_wanted()
+    package_histories_wanted = ask_if_package_histories_wanted()
+    print('*' * 79, '\n')
+
+    trucks = deliver_packages(distances, Locations, packages,
+                              Destination_Corrections, route_display_wanted)
+
+    total_distance = sum([truck.mileage_for_day for truck in trucks])
     display_distance_traveled(total_distance)
     display_number_delivered_on_time(packages)
     print('\n')
@@ -166,5 +184,6 @@ if __name__ == '__main__':
         # raise IndexError('You didn\'t provide both required csv files')
         dist_csv = '/Users/adamisom/Desktop/WGUPS Distance Table.csv'
         pkg_csv = '/Users/adamisom/Desktop/WGUPS Package File.csv'
+    cache_path = sys.argv[3] if len(sys.argv) > 3 else None
 
-    run_program(dist_csv, pkg_csv)
+    run_program(dist_csv, pkg_csv, cache_path)
@@ -0,0 +1,243 @@
+import os
+import struct
+import sys
+from array import array
+from hashlib import sha256
+from mmap import mmap, ACCESS_READ, ALLOCATIONGRANULARITY
+from .classes.distance_matrix import DistanceMatrix
+from .classes.location_index import LocationIndex
+from .classes.package import (Package, PackageSpecialNote_ValueError,
+                              parse_special_notes)
+from .classes.time_custom import Time_Custom
+
+
+'''
+A binary cache of what load_data parses out of the distance and package csv
+files, so that runs after the first can skip csv parsing, cleaning, filling
+and validation. It is one file, laid out as:
+
+    header      magic, version, byte order, number of locations and
+                packages, a key (size, mtime, sha256) for each csv file,
+                and the offset and length of the two blocks below
+    distances   the DistanceMatrix triangle as native doubles, starting on
+                a page boundary so it can be memory-mapped as it is
+    tables      packed location and package tables: one array of integers
+                (package ID, location number and deadline in seconds, or
+                -1 for none, per package), the byte length of every string
+                (matrix label, each location's landmark and address, each
+                package's weight and special note), then the strings, UTF-8
+
+The cache is used only if its version and byte order are current and both
+csv files still match their keys: same size, and either the same mtime or
+(for a file that was merely touched or copied) the same sha256.
+'''
+MAGIC = b'PKGCACHE'
+VERSION = 1
+BYTE_ORDERS = {'little': 0, 'big': 1}
+
+# magic, version, byte order, locations, packages, distance csv key,
+# package csv key, distance block offset + length, table offset + length
+header_struct = struct.Struct('<8sHHQQ Qq32s Qq32s QQ QQ')
+counts_struct = struct.Struct('<QQ')
+
+
+def file_digest(path):
+    '''Return sha256 digest of the contents of the file at path.'''
+    digest = sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(2**20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def source_key(path):
+    '''Return (size, mtime in ns, sha256) identifying a csv file's contents.'''
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns, file_digest(path)
+
+
+def source_matches(path, size, mtime_ns, digest):
+    '''Return whether the file at path still matches its key in the cache;
+    its contents are only hashed if its size matches but its mtime doesn't.
+    '''
+    stat = os.stat(path)
+    if stat.st_size != size:
+        return False
+    return stat.st_mtime_ns == mtime_ns or file_digest(path) == digest
+
+
+def align(offset):
+    '''Return offset rounded up to the next page (mmap-able) boundary.'''
+    return -(-offset // ALLOCATIONGRANULARITY) * ALLOCATIONGRANULARITY
+
+
+def write_cache(cache_path, distance_csv, package_csv,
+                distances, Locations, packages, package_notes):
+    '''Write loaded data to a cache file for distance_csv and package_csv.
+
+    package_notes holds the special note string of each package in packages
+    (Packages keep only the parsed note). The file is written under a
+    temporary name and then renamed, so that a reader (or a memory map of
+    an older cache) never sees a half-written file.
+    '''
+    strings = [distances.label]
+    for location in Locations:
+        strings += [location.landmark, location.address]
+    integers = array('q')
+    for package, note in zip(packages, package_notes):
+        deadline = package.deadline
+        integers.extend((package.ID, package.location.num,
+                         -1 if deadline is None else deadline.seconds))
+        strings += [package.weight, note]
+
+    encoded = [string.encode() for string in strings]
+    lengths = array('Q', map(len, encoded))
+    tables = b''.join([counts_struct.pack(len(integers), len(lengths)),
+                       integers.tobytes(), lengths.tobytes()] + encoded)
+
+    triangle = array('d', distances.triangle()).tobytes()
+    distance_offset = align(header_struct.size)
+    table_offset = distance_offset + len(triangle)
+
+    header = header_struct.pack(
+        MAGIC, VERSION, BYTE_ORDERS[sys.byteorder],
+        distances.size, len(packages),
+        *source_key(distance_csv), *source_key(package_csv),
+        distance_offset, len(triangle), table_offset, len(tables))
+
+    temporary_path = f'{cache_path}.{os.getpid()}.tmp'
+    with open(temporary_path, 'wb') as f:
+        f.write(header)
+        f.write(bytes(distance_offset - len(header)))
+        f.write(triangle)
+        f.write(tables)
+    os.replace(temporary_path, cache_path)
+
+
+def read_header(cache_file):
+    '''Return the header fields of an open cache file, or None if it is not
+    a cache this version of the program can read.'''
+    header = cache_file.read(header_struct.size)
+    if len(header) != header_struct.size:
+        return None
+    fields = header_struct.unpack(header)
+    magic, version, byte_order = fields[:3]
+    if (magic != MAGIC or version != VERSION or
+            byte_order != BYTE_ORDERS[sys.byteorder]):
+        return None
+    return fields
+
+
+def read_cache(cache_path, distance_csv, package_csv, Location_constructor):
+    '''Return distances, Locations and packages from the cache file, as
+    load_data would, or None if there is no up-to-date cache there.
+
+    The distances are not read but memory-mapped: the DistanceMatrix is
+    backed by the file itself, and pages are loaded as rows are used.
+    A cache that cannot be read, or is corrupt, counts as no cache.
+    '''
+    try:
+        return read_cache_file(cache_path, distance_csv, package_csv,
+                               Location_constructor)
+    except (OSError, ValueError, IndexError, TypeError, struct.error,
+            PackageSpecialNote_ValueError):
+        # ValueError includes UnicodeDecodeError and mapping an empty file
+        return None
+
+
+def read_cache_file(cache_path, distance_csv, package_csv,
+                    Location_constructor):
+    '''Return what read_cache does, but raise if the cache file cannot be
+    read or is malformed in a way its header and lengths do not catch.'''
+    with open(cache_path, 'rb') as cache_file:
+        fields = read_header(cache_file)
+        if fields is None:
+            return None
+        (_, _, _, number_of_locations, number_of_packages,
+         *keys, distance_offset, distance_length,
+         table_offset, table_length) = fields
+        if not (source_matches(distance_csv, *keys[:3]) and
+                source_matches(package_csv, *keys[3:])):
+            return None
+        pairs = number_of_locations * (number_of_locations - 1) // 2
+        if (distance_length != 8 * pairs or
+                os.fstat(cache_file.fileno()).st_size < (table_offset +
+                                                         table_length)):
+            return None
+        mapped = mmap(cache_file.fileno(), 0, access=ACCESS_READ)
+
+    view = memoryview(mapped)
+    triangle = view[distance_offset:distance_offset + distance_length]
+    try:
+        with view[table_offset:table_offset + table_length] as table_view:
+            tables = read_tables(table_view)
+        if (tables is None or
+                len(tables[0]) != 1 + 2*(number_of_locations +
+                                         number_of_packages)
+                or len(tables[1]) != 3 * number_of_packages):
+            release_mapping(mapped, view, triangle)
+            return None
+        strings, integers = tables
+
+        Locations = LocationIndex(
+            Location_constructor(num, *strings[2*num - 1:2*num + 1])
+            for num in range(1, number_of_locations + 1))
+
+        packages = []
+        first_string = 2 * number_of_locations + 1
+        parsed_notes = parse_special_notes(strings[first_string + 1::2])
+        for index in range(number_of_packages):
+            ID, location_num, deadline = integers[3*index:3*index + 3]
+            weight, note = strings[first_string + 2*index:
+                                   first_string + 2*index + 2]
+            deadline = (None if deadline < 0 else
+                        Time_Custom.from_seconds(deadline))
+            packages.append(Package(ID, deadline, weight, note,
+                                    Locations[location_num - 1],
+                                    parsed_notes[index]))
+    except BaseException:
+        release_mapping(mapped, view, triangle)
+        raise
+
+    # made last, as the matrix keeps (a view of) the memory map open
+    distances = DistanceMatrix(number_of_locations, strings[0],
+                               data=triangle.cast('d'))
+
+    return distances, Locations, packages
+
+
+def release_mapping(mapped, *views):
+    '''Release views of a cache file's memory map and close it, so that
+    the file can be replaced (which Windows refuses while it is mapped).'''
+    for view in views:
+        view.release()
+    mapped.close()
+
+
+def read_tables(table_bytes):
+    '''Return (strings, integers) unpacked from the table block, or None if
+    the block is not consistent with itself.'''
+    number_of_integers, number_of_strings = counts_struct.unpack_from(
+        table_bytes)
+    start = counts_struct.size
+    if start + 8 * (number_of_integers + number_of_strings) > len(table_bytes):
+        return None
+
+    integers = array('q')
+    integers.frombytes(table_bytes[start:start + 8 * number_of_integers])
+    start += 8 * number_of_integers
+
+    lengths = array('Q')
+    lengths.frombytes(table_bytes[start:start + 8 * number_of_strings])
+    start += 8 * number_of_strings
+
+    text = bytes(table_bytes[start:])
+    strings = []
+    position = 0
+    for length in lengths:
+        strings.append(text[position:position + length].decode())
+        position += length
+    if position != len(text):
+        return None
+
+    return strings, integers
@@ -0,0 +1,66 @@
+class DeliveryGroups():
+    '''Packages that must be delivered together, as a disjoint-set (union-
+    find) of package IDs.
+
+    A package whose special note says it must be delivered with others is
+    in one group with them, and groups sharing a package are one group, so
+    that each group is closed under 'delivered with'. The groups are built
+    once, from all packages' notes, by unions (by size) of note IDs; find
+    halves paths as it goes, so a lookup takes O(α(n)), effectively
+    constant, time. After building, members maps each group's root ID to
+    the sorted IDs in it, so a group's members are never searched for.
+
+    IDs named in a note need not be IDs of any package passed in; packages
+    in no group at all are not stored.
+    '''
+
+    def __init__(self, packages=()):
+        '''Create DeliveryGroups from packages' deliver-with notes.'''
+        self.parent = {}
+        self.size = {}
+        for pkg in packages:
+            for ID in pkg.special_note.deliver_with or ():
+                self.union(pkg.ID, ID)
+
+        self.members = {}
+        for ID in self.parent:
+            self.members.setdefault(self.find(ID), []).append(ID)
+        for IDs in self.members.values():
+            IDs.sort()
+
+    def find(self, ID):
+        '''Return root ID of the group ID is in (ID itself if in none).'''
+        parent = self.parent
+        while parent.get(ID, ID) != ID:
+            parent[ID] = parent[parent[ID]]  # path halving
+            ID = parent[ID]
+        return ID
+
+    def union(self, ID1, ID2):
+        '''Put the groups of two IDs together, under the larger's root.'''
+        for ID in (ID1, ID2):
+            if ID not in self.parent:
+                self.parent[ID] = ID
+                self.size[ID] = 1
+        root1, root2 = self.find(ID1), self.find(ID2)
+        if root1 == root2:
+            return
+        if self.size[root1] < self.size[root2]:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        self.size[root1] += self.size.pop(root2)
+
+    def group_of(self, ID):
+        '''Return sorted list of IDs in ID's group, or None if in none.'''
+        if ID not in self.parent:
+            return None
+        return self.members[self.find(ID)]
+
+    def ready_groups(self, packages):
+        '''Return dict of root ID -> list of packages (in the order passed
+        in) for each group having any of the packages passed in.'''
+        groups = {}
+        for pkg in packages:
+            if pkg.ID in self.parent:
+                groups.setdefault(self.find(pkg.ID), []).append(pkg)
+        return groups
@@ -0,0 +1,363 @@
+import struct
+import sys
+from array import array
+from math import isnan, nan
+from mmap import mmap, ACCESS_READ, ACCESS_WRITE, ALLOCATIONGRANULARITY
+
+
+class DistanceFile_ValueError(BaseException):
+    pass
+
+
+class DistanceMatrix():
+    '''Symmetric distances between locations numbered 1 to size, in miles.
+
+    Distances are symmetric and zero from a location to itself, so only the
+    upper triangle (without the diagonal) is stored: size*(size-1)/2 numbers
+    in one flat buffer (an array('d') unless another is given), instead of
+    a list of lists of boxed floats. For 10,000 locations that is 400 MB of
+    doubles rather than about 3 GB of Python floats and list slots.
+
+    Use dist(i, j) for a single distance and row(i) to scan all distances
+    from one location (e.g. for nearest neighbors). For older code that
+    expects the 2D list which load_data used to return, a DistanceMatrix
+    also supports that layout:
+        distances[0]      header row: [label, 1, 2, ..., size]
+        distances[i][0]   i, the location number
+        distances[i][j]   distance from location i to location j
+    as well as len, iteration over rows, and slicing.
+
+    Missing distances are NaN; see is_complete.
+    '''
+
+    __slots__ = ('size', 'label', '_data', '_offsets')
+
+    def __init__(self, size, label='', data=None, typecode='d'):
+        '''Create DistanceMatrix for size locations, all distances missing,
+        or backed by data: any indexable buffer of size*(size-1)/2 numbers,
+        row after row of the upper triangle.'''
+        pairs = size * (size - 1) // 2
+        if data is None:
+            data = array(typecode, [nan]) * pairs
+        elif len(data) != pairs:
+            raise ValueError(f'{size} locations need {pairs} distances, '
+                             f'not {len(data)}')
+
+        self.size = size
+        self.label = label
+        self._data = data
+
+        # dist(i, j) for i < j is _data[_offsets[i] + j]; row i of the
+        # triangle starts after rows 1..i-1, which hold size-1, size-2, ...
+        self._offsets = [0] + [(i - 1) * size - (i - 1) * i // 2 - i - 1
+                               for i in range(1, size + 1)]
+
+    @classmethod
+    def from_rows(cls, rows, typecode='d'):
+        '''Return DistanceMatrix from a 2D list laid out like the cleaned
+        distance csv: row 0 and column 0 hold labels, and rows[i][j] holds
+        the distance from i to j as a number, a numeric string, or ''.
+
+        Each pair is taken from whichever of [i][j] and [j][i] is filled in,
+        so a triangular csv is enough. A pair missing from both, or whose two
+        values contradict each other, is left as NaN.
+        '''
+        size = len(rows) - 1
+        matrix = cls(size, rows[0][0], typecode=typecode)
+        data = matrix._data
+
+        index = 0
+        for i in range(1, size + 1):
+            row = rows[i]
+            for j in range(i + 1, size + 1):
+                ij, ji = row[j], rows[j][i]
+                if ij == '':
+                    if ji != '':
+                        data[index] = float(ji)
+                elif ji == '' or float(ij) == float(ji):
+                    data[index] = float(ij)
+                index += 1
+
+        return matrix
+
+    def _index(self, i, j):
+        '''Return index in the flat buffer of the distance between i and j,
+        which must be different location numbers.'''
+        if i > j:
+            i, j = j, i
+        if i < 1 or j > self.size:
+            raise IndexError(f'No distance between locations {i} and {j}')
+        return self._offsets[i] + j
+
+    def dist(self, i, j):
+        '''Return distance between location numbers i and j.'''
+        if i == j:
+            return 0.0
+        return self._data[self._index(i, j)]
+
+    def set_dist(self, i, j, distance):
+        '''Set distance between location numbers i and j (both ways).'''
+        if i == j:
+            raise ValueError('Distance from a location to itself is zero')
+        self._data[self._index(i, j)] = distance
+
+    def row(self, i):
+        '''Return list of distances from location i, indexed by location
+        number: row(i)[j] == dist(i, j), and row(i)[0] is i itself.'''
+        if not 1 <= i <= self.size:
+            raise IndexError(f'No location {i}')
+        data, offsets = self._data, self._offsets
+        above = [data[offsets[k] + i] for k in range(1, i)]
+        start = offsets[i] + i + 1
+        return [i, *above, 0.0, *data[start:start + self.size - i]]
+
+    def is_complete(self):
+        '''Return whether every distance is present (not NaN).'''
+        return not any(map(isnan, self._data))
+
+    def triangle(self):
+        '''Return the upper triangle, row after row, as stored by this class
+        (e.g. for writing it out; see the cache module).'''
+        return self._data
+
+    def __getitem__(self, index):
+        '''Get header row (index 0) or a location's row via [] notation.'''
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index == 0:
+            return [self.label] + list(range(1, self.size + 1))
+        if not 0 < index <= self.size:
+            raise IndexError(f'No location {index}')
+        return DistanceRow(self, index)
+
+    def __len__(self):
+        '''Return number of rows, header row included.'''
+        return self.size + 1
+
+    def __iter__(self):
+        '''Return an iterator over the rows, header row first.'''
+        return (self[i] for i in range(len(self)))
+
+    def __repr__(self):
+        '''Return string representation of the DistanceMatrix.'''
+        return f'DistanceMatrix({self.size} locations)'
+
+
+class DistanceRow():
+    '''One location's row of a DistanceMatrix, as in the old 2D list:
+    row[0] is the location number and row[j] the distance to location j.'''
+
+    __slots__ = ('_matrix', '_num')
+
+    def __init__(self, matrix, location_num):
+        '''Create view of row location_num of matrix.'''
+        self._matrix = matrix
+        self._num = location_num
+
+    def __getitem__(self, index):
+        '''Get location number (index 0) or a distance via [] notation.'''
+        if isinstance(index, slice):
+            return self._matrix.row(self._num)[index]
+        if index < 0:
+            index += len(self)
+        if index == 0:
+            return self._num
+        return self._matrix.dist(self._num, index)
+
+    def __len__(self):
+        '''Return length of the row, location number included.'''
+        return self._matrix.size + 1
+
+    def __iter__(self):
+        '''Return an iterator over the row, location number first.'''
+        return iter(self._matrix.row(self._num))
+
+    def __eq__(self, other):
+        '''A row equals any row or list with the same items.'''
+        if not isinstance(other, (DistanceRow, list)):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self):
+        '''Return string representation of the row.'''
+        return repr(list(self))
+
+
+class MappedDistanceMatrix(DistanceMatrix):
+    '''DistanceMatrix read from a distance file through a memory map, for
+    networks too large to hold in memory (50,000 locations are 10 GB of
+    float32 distances).
+
+    A distance file (see convert_distance_csv in load) holds a header
+    (including the byte order it was written in, as the float32s are
+    native, so a file is refused on a machine of the other byte order),
+    then every row of the matrix in full, row-major float32, starting on a page
+    boundary, then the matrix label and each location's landmark and
+    address. Rows are stored in full, at twice the disk space of a
+    triangle, so that row(i) and dist(i, j) only touch the pages of row i:
+    the operating system loads pages as they are used, and resident memory
+    stays bounded by the rows actually touched. Distances are float32, so
+    good to about 7 significant digits.
+
+    locations is the list of (num, landmark, address) tuples in the file.
+    '''
+
+    __slots__ = ('locations', '_mmap')
+
+    MAGIC = b'PKGDISTS'
+    VERSION = 2
+    BYTE_ORDERS = {'little': 0, 'big': 1}
+    # magic, version, byte order, size, data offset, strings offset and
+    # length
+    header_struct = struct.Struct('<8sHHQQQQ')
+
+    def __init__(self, path, writable=False):
+        '''Open distance file at path, read-only unless writable.'''
+        with open(path, 'r+b' if writable else 'rb') as f:
+            header = f.read(self.header_struct.size)
+            if len(header) != self.header_struct.size:
+                raise DistanceFile_ValueError(f'{path} is not a distance file')
+            (magic, version, byte_order, size, data_offset,
+             strings_offset, strings_length) = self.header_struct.unpack(
+                 header)
+            if magic != self.MAGIC or version != self.VERSION:
+                raise DistanceFile_ValueError(
+                    f'{path} is not a version {self.VERSION} distance file')
+            if byte_order != self.BYTE_ORDERS[sys.byteorder]:
+                raise DistanceFile_ValueError(
+                    f'{path} was written with the other byte order')
+            self._mmap = mmap(f.fileno(), 0,
+                              access=ACCESS_WRITE if writable else ACCESS_READ)
+
+        if len(self._mmap) < strings_offset + strings_length:
+            raise DistanceFile_ValueError(f'{path} is truncated')
+        self.size = size
+        self._data = memoryview(self._mmap)[data_offset:strings_offset].cast(
+            'f')
+
+        strings = unpack_strings(self._mmap[strings_offset:
+                                            strings_offset + strings_length])
+        self.label = strings[0] if strings else ''
+        self.locations = [(num, *strings[2*num - 1:2*num + 1])
+                          for num in range(1, size + 1)
+                          if 2*num < len(strings)]
+
+    @classmethod
+    def create(cls, path, size):
+        '''Create distance file for size locations, every distance missing
+        (NaN) but those from a location to itself, and return it opened for
+        writing. Call save_locations once the distances are set.'''
+        data_offset = -(-cls.header_struct.size // ALLOCATIONGRANULARITY
+                        ) * ALLOCATIONGRANULARITY
+        strings_offset = data_offset + 4 * size * size
+        with open(path, 'wb') as f:
+            f.write(cls.header_struct.pack(
+                cls.MAGIC, cls.VERSION, cls.BYTE_ORDERS[sys.byteorder], size,
+                data_offset, strings_offset, 0))
+            f.write(bytes(data_offset - cls.header_struct.size))
+            for i in range(size):
+                row = array('f', [nan]) * size
+                row[i] = 0.0
+                f.write(row.tobytes())
+        return cls(path, writable=True)
+
+    @classmethod
+    def is_distance_file(cls, path):
+        '''Return whether the file at path starts like a distance file.'''
+        with open(path, 'rb') as f:
+            return f.read(len(cls.MAGIC)) == cls.MAGIC
+
+    def save_locations(self, label, locations):
+        '''Write matrix label and (num, landmark, address) locations at the
+        end of a distance file opened for writing, and flush it to disk.'''
+        strings = [label]
+        for _, landmark, address in locations:
+            strings += [landmark, address]
+        packed = pack_strings(strings)
+
+        _, _, byte_order, _, data_offset, strings_offset, _ = (
+            self.header_struct.unpack_from(self._mmap))
+
+        # a memory map cannot grow while the matrix's view of it exists
+        self._data.release()
+        self._mmap.resize(strings_offset + len(packed))
+        self._mmap[strings_offset:] = packed
+        self._mmap[:self.header_struct.size] = self.header_struct.pack(
+            self.MAGIC, self.VERSION, byte_order, self.size,
+            data_offset, strings_offset, len(packed))
+        self._mmap.flush()
+        self._data = memoryview(self._mmap)[data_offset:strings_offset].cast(
+            'f')
+        self.label = label
+        self.locations = [tuple(location) for location in locations]
+
+    def close(self):
+        '''Close the memory map; the matrix cannot be used afterwards.'''
+        self._data.release()
+        self._mmap.close()
+
+    def _index(self, i, j):
+        '''Return index in the flat buffer of the distance from i to j.'''
+        if not (0 < i <= self.size and 0 < j <= self.size):
+            raise IndexError(f'No distance between locations {i} and {j}')
+        return (i - 1) * self.size + j - 1
+
+    def dist(self, i, j):
+        '''Return distance between location numbers i and j.'''
+        if i == j:
+            return 0.0
+        return self._data[self._index(i, j)]
+
+    def set_dist(self, i, j, distance):
+        '''Set distance between location numbers i and j (both ways).'''
+        if i == j:
+            raise ValueError('Distance from a location to itself is zero')
+        self._data[self._index(i, j)] = distance
+        self._data[self._index(j, i)] = distance
+
+    def row(self, i):
+        '''Return list of distances from location i, indexed by location
+        number: row(i)[j] == dist(i, j), and row(i)[0] is i itself.'''
+        if not 1 <= i <= self.size:
+            raise IndexError(f'No location {i}')
+        start = (i - 1) * self.size
+        return [i, *self._data[start:start + self.size]]
+
+    def triangle(self):
+        '''Return the upper triangle, row after row, like DistanceMatrix.'''
+        triangle = array('d')
+        for i in range(1, self.size):
+            start = (i - 1) * self.size
+            triangle.extend(self._data[start + i:start + self.size])
+        return triangle
+
+    def __repr__(self):
+        '''Return string representation of the MappedDistanceMatrix.'''
+        return f'MappedDistanceMatrix({self.size} locations)'
+
+
+def pack_strings(strings):
+    '''Return bytes holding the count and byte lengths of strings, then the
+    strings themselves, UTF-8.'''
+    encoded = [string.encode() for string in strings]
+    lengths = array('Q', map(len, encoded))
+    return b''.join([struct.pack('<Q', len(lengths)), lengths.tobytes()] +
+                    encoded)
+
+
+def unpack_strings(packed):
+    '''Return list of strings packed by pack_strings.'''
+    if not packed:
+        return []
+    count, = struct.unpack_from('<Q', packed)
+    lengths = array('Q')
+    lengths.frombytes(packed[8:8 + 8 * count])
+    text = bytes(packed[8 + 8 * count:])
+
+    strings, position = [], 0
+    for length in lengths:
+        strings.append(text[position:position + length].decode())
+        position += length
+    return strings
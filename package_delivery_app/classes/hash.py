@@ -12,28 +12,71 @@ class Hash():
         example4 = Hash(['hi', 3])  # adds a key of 'hi' with value 3
         example5 = Hash(('hi', 6))  # adds a key of 'hi' with value 6
         example6 = Hash(a_kwarg=45)  # adds a key of 'a_kwarg' with value 45
+        example7 = Hash.with_capacity(1000)  # room for 1000 keys, no rehash
+        example8 = Hash.from_pairs(pairs)  # presized from (key, value) pairs
+        layout = Hash.shared_layout('a', 'b')  # a template with keys a and b
+        example9 = Hash.from_layout(layout)  # shares the template's keys
 
-    Attributes (Instance variables):
-     - hash_size: all Hash objects start with 50 buckets/slots
-     - props: this stores the hashed values. Initialized with Nones.
+    Hash objects also support the usual mapping operations: len(example),
+    'hello' in example, del example['hello'], example.update(other), and
+    iterating over example.keys(), .values(), .items() (or example itself,
+    which iterates over its keys) without copying anything.
 
-    Note on hash collision: the chaining approach is used.
-      If multiple values have the same hashed index, there will be a list of
-      key-value lists at that index.
-      For the more common case of no collision for a given index, there will be
-      only a single key-value list at an index.
+    Attributes (Instance variables):
+     - hash_size: Hash objects start with just enough slots for the keys
+        they are created with (8 at the least). The size is always a power
+        of two so that an index is just hash & (size - 1).
+     - keys: the key stored in each slot, None for a never-used slot
+     - props: the value stored in each slot. Initialized with Nones.
+     - hashes: the full (32-bit) hash of the key in each slot
+     - count: number of keys in the Hash
+     - used: number of slots that are not empty (keys plus tombstones)
+     - incremental: whether resizing is incremental (see below)
+     - old_keys, old_props, old_hashes: during an incremental resize, the
+        slots being migrated from (otherwise None)
+     - migrated: during an incremental resize, how many old slots have been
+        migrated so far
+     - shared: whether keys and hashes are shared with other Hash objects
+     - version: bumped whenever a key is added or deleted, so iterators can
+        detect that the Hash changed under them
+
+    Note on hash collision: open addressing with linear probing is used.
+      If a key's slot is taken, the next slot is tried, and so on, until the
+      key or an empty slot is found. Deleting a key leaves a 'tombstone' in
+      its slot, so that probing for keys stored after it still works.
 
     Further notes:
-      - Under the hood, hashed keys and their values are stored as nested lists
-      - Hash objects are doubled and rehashed when # items >60% of __props size
+      - Under the hood, keys, values and hashes are three parallel flat lists
+      - Hash objects are doubled and rehashed when # used slots >60% of size
+      - Rehashing normally moves every key at once. A Hash made with
+        incremental=True instead keeps its old slots alongside the new ones
+        and moves a bounded number (_migrate_step) of old slots on each
+        insert or delete, so no single operation pays for the whole rehash.
+        Lookups check the new slots first, then the old ones.
+      - Many small Hash objects that always hold the same keys (the props of
+        every Package, say) can share one layout: from_layout makes a Hash
+        whose keys and hashes lists are the layout's own, so each object only
+        allocates its values. Adding or deleting a key first gives the object
+        private copies of those lists (copy-on-write); setting the value of
+        an existing key never does.
       - The internal _hash method is basic and should not be regarded as secure
+      - Computed key hashes are memoized class-wide in _key_hashes, since
+        the same few keys ('ID', 'state', ...) are looked up over and over
     '''
 
+    __slots__ = ('_hash_size', '_keys', '_props', '_hashes',
+                 '_count', '_used', '_incremental',
+                 '_old_keys', '_old_props', '_old_hashes', '_migrated',
+                 '_shared', '_version')
+
+    _key_hashes = {}
+    _key_hashes_max = 65536  # memo is cleared once it grows past this
+    _tombstone = object()  # marks the slot of a deleted key
+    _migrate_step = 16  # old slots moved per operation in incremental mode
+
     def __init__(self, *args, **kwargs):
         '''Create Hash object.'''
-        self._hash_size = 50
-        self._props = [None] * self._hash_size
-        self._count = 0
+        self._setup(Hash._size_for(len(args) + len(kwargs)))
 
         for k, v in kwargs.items():
             self[k] = v
@@ -45,6 +88,88 @@ class Hash():
             else:
                 self[arg] = None
 
+    @classmethod
+    def with_capacity(cls, capacity, incremental=False):
+        '''Return an empty Hash with room for capacity keys before any
+        rehash is needed.'''
+        hash_obj = cls.__new__(cls)
+        hash_obj._setup(Hash._size_for(capacity), incremental)
+        return hash_obj
+
+    @classmethod
+    def from_pairs(cls, pairs, incremental=False):
+        '''Return a Hash of (key, value) pairs, sized up front so that
+        inserting them never rehashes.'''
+        if not hasattr(pairs, '__len__'):
+            pairs = list(pairs)
+
+        hash_obj = cls.with_capacity(len(pairs), incremental)
+        for key_string, value in pairs:
+            hash_obj[key_string] = value
+        return hash_obj
+
+    @classmethod
+    def shared_layout(cls, *key_strings):
+        '''Return a Hash of key_strings (valued None) to pass to from_layout.
+
+        The layout's keys are shared, so it is never itself given private
+        copies of them either: adding a key to it copies them first.
+        '''
+        layout = cls.from_pairs([(key, None) for key in key_strings])
+        layout._shared = True
+        return layout
+
+    @classmethod
+    def from_layout(cls, layout):
+        '''Return a Hash having the same keys (and values) as layout, sharing
+        its keys and hashes lists instead of allocating new ones.'''
+        hash_obj = cls.__new__(cls)
+        hash_obj._hash_size = layout._hash_size
+        hash_obj._keys = layout._keys
+        hash_obj._props = layout._props[:]
+        hash_obj._hashes = layout._hashes
+        hash_obj._count = layout._count
+        hash_obj._used = layout._used
+        hash_obj._incremental = False
+        hash_obj._old_keys = hash_obj._old_props = hash_obj._old_hashes = None
+        hash_obj._migrated = 0
+        hash_obj._shared = True
+        hash_obj._version = 0
+        return hash_obj
+
+    def _unshare(self):
+        '''Replace shared keys and hashes lists with private copies.'''
+        self._keys = self._keys[:]
+        self._hashes = self._hashes[:]
+        self._shared = False
+
+    @staticmethod
+    def _size_for(capacity):
+        '''Return the smallest size (a power of two, and at least 8) that
+        holds capacity keys while staying under the 60% rehash threshold.'''
+        size = 8
+        while capacity >= 0.6 * size:
+            size *= 2
+        return size
+
+    def _setup(self, size, incremental=False):
+        '''Initialize an empty Hash having size slots.'''
+        self._allocate(size)
+        self._count = 0
+        self._incremental = incremental
+        self._old_keys = self._old_props = self._old_hashes = None
+        self._migrated = 0
+        self._version = 0
+
+    def _allocate(self, size):
+        '''Replace all slots with size empty slots.'''
+        self._hash_size = size
+        self._keys = [None] * size
+        self._props = [None] * size
+        self._hashes = [-1] * size
+        self._used = 0
+        self._shared = False
+
     def get(self, key_string, default=None):
         '''Return property of hash object or default value if key not found.
 
@@ -54,213 +179,381 @@ class Hash():
         if not isinstance(key_string, str):
             raise TypeError(f'Key {key_string} is not a string')
 
-        index = self._hash(key_string)
-        prop = self._props[index]
-
-        # case: None was at that index
-        if prop is None:
-            return default
+        key_hash = Hash._hash_key(key_string)
+        keys, hashes = self._keys, self._hashes
+        mask = self._hash_size - 1
+        index = key_hash & mask
+
+        while True:
+            key = keys[index]
+            if key is None:
+                break
+            if hashes[index] == key_hash and key == key_string:
+                return self._props[index]
+            index = (index + 1) & mask
+
+        if self._old_keys is not None:
+            index = Hash._probe(self._old_keys, self._old_hashes,
+                                key_string, key_hash)
+            if index >= 0:
+                return self._old_props[index]
+        return default
 
-        # case: a list of key-value lists was at that index
-        if isinstance(prop[0], list):
-            for sub_list in prop:
-                if sub_list[0] == key_string:
-                    return sub_list[1]
-            return default
-
-        # case: a single key-value list was at that index
-        if prop[0] == key_string:
-            return prop[1]
-        else:
-            return default
+    @staticmethod
+    def _probe(keys, hashes, key_string, key_hash):
+        '''Return the slot holding key_string in the given keys and hashes,
+        or -1 if it is not present.'''
+        mask = len(keys) - 1
+        index = key_hash & mask
+
+        while True:
+            key = keys[index]
+            if key is None:
+                return -1
+            if hashes[index] == key_hash and key == key_string:
+                return index
+            index = (index + 1) & mask
 
     def _flatten(self):
-        '''Flatten props. This method exists to be called by __repr__.'''
-        flat = []
+        '''Flatten props into a new list of key-value lists.'''
+        return [[key, value] for key, value in self.items()]
 
-        for prop in self._props:
-            if prop is None:
-                continue
+    def _slots(self):
+        '''Yield (keys, props, index) for each slot holding a key: first
+        the current slots, then any old slots not yet migrated.
 
-            if isinstance(prop[0], list):
-                for sub_list in prop:
-                    key_string, value = sub_list[0], sub_list[1]
-                    flat.append([key_string, value])
+        Raises RuntimeError if a key is added or deleted meanwhile.
+        '''
+        version = self._version
+        tombstone = Hash._tombstone
+        tables = [(self._keys, self._props)]
+        if self._old_keys is not None:
+            tables.append((self._old_keys, self._old_props))
+
+        for keys, props in tables:
+            for index, key in enumerate(keys):
+                if self._version != version:
+                    raise RuntimeError('Hash changed size during iteration')
+                if key is not None and key is not tombstone:
+                    yield keys, props, index
+
+    def keys(self):
+        '''Return an iterator over the keys of the hash object.'''
+        return (keys[index] for keys, _, index in self._slots())
+
+    def values(self):
+        '''Return an iterator over the values of the hash object.'''
+        return (props[index] for _, props, index in self._slots())
+
+    def items(self):
+        '''Return an iterator over (key, value) tuples of the hash object.'''
+        return ((keys[index], props[index])
+                for keys, props, index in self._slots())
+
+    def update(self, *others, **kwargs):
+        '''Set every key-value pair given, as a Hash (or anything else with
+        an items method), as an iterable of pairs, or as keyword arguments.
+
+        When the number of pairs is known up front, the slots are grown to
+        fit them all at once rather than doubling repeatedly.
+        '''
+        for other in others:
+            pairs = other.items() if hasattr(other, 'items') else other
+            if hasattr(other, '__len__'):
+                self._reserve(self._count + len(other))
+            for key_string, value in pairs:
+                self[key_string] = value
 
-            else:
-                key_string, value = prop[0], prop[1]
-                flat.append([key_string, value])
+        self._reserve(self._count + len(kwargs))
+        for key_string, value in kwargs.items():
+            self[key_string] = value
 
-        return flat
+    def _reserve(self, capacity):
+        '''Grow the slots, if need be, to hold capacity keys without any
+        further rehash.'''
+        size = Hash._size_for(capacity)
+        if size > self._hash_size:
+            self._rehash(size)
 
-    def _hash(self, key_string, str_size_min=10):
-        '''Hash a key and return index.'''
-        padded = key_string.rjust(str_size_min, key_string[0])
-        return sum([(ord(ch)) ** ((idx % 30) + 5) + 43
-                   for idx, ch in enumerate(padded)]
-                   ) % self._hash_size
+    @classmethod
+    def _hash_key(cls, key_string):
+        '''Return the (memoized) 32-bit hash of a key string.
 
-    def _rehash(self):
-        '''Re-hash all items (called when self._props needs to double).'''
-        copy = self._double()
-        self._count = 0
+        This is FNV-1a over the key's code points followed by a murmur3-style
+        finalizer, so the low bits used for indexing are well mixed. All
+        arithmetic is masked to 32 bits, so no intermediate value grows.
+        '''
+        key_hash = cls._key_hashes.get(key_string)
+        if key_hash is not None:
+            return key_hash
+
+        key_hash = 0x811c9dc5
+        for ch in key_string:
+            key_hash = ((key_hash ^ ord(ch)) * 0x01000193) & 0xffffffff
+
+        key_hash ^= key_hash >> 16
+        key_hash = (key_hash * 0x85ebca6b) & 0xffffffff
+        key_hash ^= key_hash >> 13
+        key_hash = (key_hash * 0xc2b2ae35) & 0xffffffff
+        key_hash ^= key_hash >> 16
+
+        if len(cls._key_hashes) >= cls._key_hashes_max:
+            cls._key_hashes.clear()
+        cls._key_hashes[key_string] = key_hash
+        return key_hash
+
+    def _hash(self, key_string):
+        '''Hash a key and return index (its first slot to probe).'''
+        return Hash._hash_key(key_string) & (self._hash_size - 1)
+
+    def _rehash(self, size=None):
+        '''Re-hash all items into a fresh set of slots.
+
+        Unless a size is given, slots are doubled unless most used slots are
+        tombstones, in which case the size is kept and the tombstones are
+        simply dropped. The current slots become the old slots, which are
+        then migrated all at once, or a step at a time if this Hash is
+        incremental.
+        '''
+        if self._old_keys is not None:  # finish any resize in progress
+            self._migrate(len(self._old_keys))
 
-        for prop in copy:
-            if prop is None:
-                continue
+        if size is None:
+            size = self._hash_size
+            if self._count / size >= 0.3:
+                size *= 2
 
-            if isinstance(prop[0], list):
-                for sub_list in prop:
-                    key_string, value = sub_list[0], sub_list[1]
-                    self[key_string] = value
+        self._version += 1
 
-            else:
-                key_string, value = prop[0], prop[1]
-                self[key_string] = value
+        self._old_keys, self._old_props = self._keys, self._props
+        self._old_hashes = self._hashes
+        self._migrated = 0
+        self._allocate(size)
 
-    def _double(self):
-        '''Double hash object props size and re-hash all keys.
+        self._migrate(Hash._migrate_step if self._incremental
+                      else len(self._old_keys))
 
-        The disregard of the copy module's deepcopy method is intentional,
-        in order to keep this class free of imports.
+    def _migrate(self, step):
+        '''Move the keys in the next step old slots into the current slots.
+
+        Stored hashes are reused, so no key is hashed again. A key is never
+        in both the old and current slots, so no duplicate check is needed.
+        Migrated old slots are left as tombstones, so that the old slots can
+        still be probed for the keys not yet migrated.
         '''
-        copy = Hash._deepcopy(self._props)
+        old_keys, old_props = self._old_keys, self._old_props
+        old_hashes = self._old_hashes
+        keys, props, hashes = self._keys, self._props, self._hashes
+        tombstone = Hash._tombstone
+        mask = self._hash_size - 1
+
+        stop = min(self._migrated + step, len(old_keys))
+        finishing = stop == len(old_keys)
+
+        for old_index in range(self._migrated, stop):
+            key = old_keys[old_index]
+            if key is None or key is tombstone:
+                continue
+
+            key_hash = old_hashes[old_index]
+            index = key_hash & mask
+            while keys[index] is not None and keys[index] is not tombstone:
+                index = (index + 1) & mask
+            if keys[index] is None:
+                self._used += 1
+            keys[index] = key
+            props[index] = old_props[old_index]
+            hashes[index] = key_hash
 
-        self._hash_size *= 2
-        self._props = [None] * self._hash_size
+            if not finishing:
+                old_keys[old_index] = tombstone
+                old_props[old_index] = None
 
-        return copy
+        self._migrated = stop
+        if finishing:
+            self._old_keys = self._old_props = self._old_hashes = None
 
     def _debug_str(self):
         '''Return string representation of hash object useful for debugging.
 
         Whereas str prints self._props as if the underlying data structure
         were (itself) a hash, debug_str shows what Hash objects truly are:
-        nested lists.
+        parallel lists of keys and values ('<deleted>' marks a tombstone).
         '''
-        return f"\nprops: {','.join([str(prop) for prop in self._props])}\n"
+        slots = [str(None) if key is None
+                 else '<deleted>' if key is Hash._tombstone
+                 else str([key, self._props[index]])
+                 for index, key in enumerate(self._keys)]
+        debug_str = f"\nprops: {','.join(slots)}\n"
+
+        if self._old_keys is not None:
+            old_slots = [str(None) if key is None
+                         else '<deleted>' if key is Hash._tombstone
+                         else str([key, self._old_props[index]])
+                         for index, key in enumerate(self._old_keys)]
+            debug_str += (f"old props ({self._migrated} migrated): "
+                          f"{','.join(old_slots)}\n")
+
+        return debug_str
 
     def __getitem__(self, key_string):
         '''Get property of hash object via [] notation.'''
         if not isinstance(key_string, str):
             raise TypeError(f'Key {key_string} is not a string')
 
-        index = self._hash(key_string)
-        prop = self._props[index]
-
-        # case: None was at that index
-        if prop is None:
-            raise KeyError(f'Key {key_string} does not exist in the hash')
-
-        # case: a list of key-value lists was at that index
-        if isinstance(prop[0], list):
-            for sub_list in prop:
-                if sub_list[0] == key_string:
-                    return sub_list[1]
-            raise KeyError(f'Key {key_string} does not exist in the hash')
-
-        # case: a single key-value list was at that index
-        if prop[0] == key_string:
-            return prop[1]
-        else:
-            raise KeyError(f'Key {key_string} does not exist in the hash')
+        key_hash = Hash._hash_key(key_string)
+        keys, hashes = self._keys, self._hashes
+        mask = self._hash_size - 1
+        index = key_hash & mask
+
+        while True:
+            key = keys[index]
+            if key is None:
+                break
+            if hashes[index] == key_hash and key == key_string:
+                return self._props[index]
+            index = (index + 1) & mask
+
+        if self._old_keys is not None:
+            index = Hash._probe(self._old_keys, self._old_hashes,
+                                key_string, key_hash)
+            if index >= 0:
+                return self._old_props[index]
+        raise KeyError(f'Key {key_string} does not exist in the hash')
 
     def __setitem__(self, key_string, value):
         '''Set property of hash object via [] notation.'''
         if not isinstance(key_string, str):
             raise TypeError(f'Key {key_string} is not a string')
 
-        index = self._hash(key_string)
-        prop = self._props[index]
-
-        # case: None was at that index
-        if prop is None:
-            self._props[index] = [key_string, value]
-            self._count += 1
-
-        # case: a list of key-value lists was at that index
-        elif isinstance(prop[0], list):
-            for sub_list in prop:
-                if sub_list[0] == key_string:
-                    sub_list[1] = value
-            # if not found:
-            self._props[index].append([key_string, value])
-            self._count += 1
-
-        # case: a single key-value list was at that index
-        # note: at this point, isinstance(prop, list) must be True
+        key_hash = Hash._hash_key(key_string)
+        keys, hashes = self._keys, self._hashes
+        mask = self._hash_size - 1
+        index = key_hash & mask
+        first_tombstone = -1
+
+        while True:
+            key = keys[index]
+            if key is None:
+                break
+            if hashes[index] == key_hash and key == key_string:
+                self._props[index] = value  # replacing: count is unchanged
+                return
+            if key is Hash._tombstone and first_tombstone < 0:
+                first_tombstone = index
+            index = (index + 1) & mask
+
+        # case: key not yet migrated out of the old slots
+        if self._old_keys is not None:
+            old_index = Hash._probe(self._old_keys, self._old_hashes,
+                                    key_string, key_hash)
+            if old_index >= 0:
+                self._old_props[old_index] = value
+                return
+
+        if self._shared:
+            self._unshare()
+            keys, hashes = self._keys, self._hashes
+
+        # case: key not found, so reuse a tombstone if one was passed
+        if first_tombstone >= 0:
+            index = first_tombstone
         else:
-            if prop[0] == key_string:
-                self._props[index][1] = value
-            else:  # if not found, wrap existing item in a list and append
-                current_resident = self._props[index]
-                self._props[index] = [current_resident]
-                self._props[index].append([key_string, value])
-                self._count += 1
+            self._used += 1
+
+        keys[index] = key_string
+        self._props[index] = value
+        hashes[index] = key_hash
+        self._count += 1
+        self._version += 1
+
+        if self._old_keys is not None:
+            self._migrate(Hash._migrate_step)
 
         # rehash if self._props is getting too full
-        if self._count / self._hash_size >= 0.6:
+        if self._used / self._hash_size >= 0.6:
             self._rehash()
 
-    def __str__(self):
-        '''Return string representation of hash object.'''
-        prop_strings = []
+    def __delitem__(self, key_string):
+        '''Delete property of hash object via del and [] notation.'''
+        if not isinstance(key_string, str):
+            raise TypeError(f'Key {key_string} is not a string')
 
-        for prop in self._props:
-            if prop is None:
-                continue
+        key_hash = Hash._hash_key(key_string)
+        keys, props, hashes = self._keys, self._props, self._hashes
+        index = Hash._probe(keys, hashes, key_string, key_hash)
+
+        if index < 0 and self._old_keys is not None:
+            keys, props = self._old_keys, self._old_props
+            hashes = self._old_hashes
+            index = Hash._probe(keys, hashes, key_string, key_hash)
+
+        if index < 0:
+            raise KeyError(f'Key {key_string} does not exist in the hash')
 
-            if isinstance(prop[0], list):
-                props_from_subl = []
+        if self._shared and keys is self._keys:
+            self._unshare()
+            keys, hashes = self._keys, self._hashes
 
-                for sub_l in prop:
-                    # avoid infinite recursion if a value happens to be 'self'
-                    if sub_l[1] is self:
-                        props_from_subl.append(f'\n\t\t{repr(sub_l[0])}: '
-                                               '"self"')
-                    else:
-                        props_from_subl.append(f'\n\t\t{repr(sub_l[0])}: '
-                                               f'{repr(sub_l[1])}')
+        keys[index] = Hash._tombstone
+        props[index] = None
+        hashes[index] = -1
+        self._count -= 1
+        self._version += 1
 
-                prop_strings.append(
-                  '\n\t{' + ','.join(props_from_subl) + '\n\t}')
+        if self._old_keys is not None:
+            self._migrate(Hash._migrate_step)
 
+    def __str__(self):
+        '''Return string representation of hash object.'''
+        prop_strings = []
+
+        for key, value in self.items():
+            # avoid infinite recursion if a value happens to be 'self'
+            if value is self:
+                prop_strings.append(f'\n\t{repr(key)}: "self"')
             else:
-                # avoid infinite recursion if a value happens to be 'self'
-                if prop[1] is self:
-                    prop_strings.append(f'\n\t{repr(prop[0])}: "self"')
-                else:
-                    prop_strings.append(f'\n\t{repr(prop[0])}: '
-                                        f'{repr(prop[1])}')
+                prop_strings.append(f'\n\t{repr(key)}: {repr(value)}')
 
         return '{' + ','.join(prop_strings) + '\n}'
 
     def __repr__(self):
         '''Return string representation of hash object.'''
-        unpacked = ', '.join(str(x) for x in self._flatten())
+        unpacked = ', '.join(str([key, value])
+                             for key, value in self.items())
         return f'Hash({unpacked})'
 
     def __eq__(self, other):
         '''Compare two hash objects to check if they are equal.
 
-        Two hash objects are equal if they have the same (non-None) props.
+        Two hash objects are equal if they have the same keys, and each key
+        has the same value in both (slot order and size do not matter).
         '''
-        return self._props == other._props
+        if not isinstance(other, Hash):
+            return NotImplemented
+        if self._count != other._count:
+            return False
 
-    @staticmethod
-    def _deepcopy(lst):
-        '''Create a deep copy of a list.
+        missing = object()
+        return all(other.get(key, missing) == value
+                   for key, value in self.items())
 
-        This method was created intentionally to cut out an unneeded import,
-        namely deepcopy from copy.
-        '''
-        result = []
+    def __len__(self):
+        '''Return number of keys in hash object.'''
+        return self._count
 
-        for item in lst:
-            if not isinstance(item, list):
-                result.append(item)
+    def __contains__(self, key_string):
+        '''Return whether key_string is a key of hash object.'''
+        if not isinstance(key_string, str):
+            raise TypeError(f'Key {key_string} is not a string')
 
-            else:
-                result.append(Hash._deepcopy(item))
+        key_hash = Hash._hash_key(key_string)
+        if Hash._probe(self._keys, self._hashes, key_string, key_hash) >= 0:
+            return True
+        return (self._old_keys is not None and
+                Hash._probe(self._old_keys, self._old_hashes,
+                            key_string, key_hash) >= 0)
 
-        return result
+    def __iter__(self):
+        '''Return an iterator over the keys of hash object.'''
+        return self.keys()
@@ -0,0 +1,69 @@
+def abbreviate_directions(street_address):
+    '''Return street address with direction words abbreviated (South -> S).
+
+    Distance and package csv files both get this standard, so that the two
+    sets of addresses are consistent and therefore matchable.
+    '''
+    return (street_address
+            .replace('South', 'S')
+            .replace('North', 'N')
+            .replace('East', 'E')
+            .replace('West', 'W'))
+
+
+def normalize(text):
+    '''Return text in the form in which addresses and landmarks are matched:
+    directions abbreviated, runs of whitespace collapsed, case ignored.'''
+    return ' '.join(abbreviate_directions(text).split()).casefold()
+
+
+class LocationIndex(list):
+    '''A list of Locations that can also look them up by name in O(1).
+
+    It is still just the list of Location namedtuples (num, landmark,
+    address) that load_data has always returned, so it can be iterated and
+    indexed as before, but it is built together with three dictionaries:
+        - by_address: street address plus zip code -> Location
+        - by_address_no_zip: street address alone -> Location
+        - by_landmark: landmark name -> Location
+    whose keys are normalized (see normalize), so that lookups do not care
+    about letter case, extra spaces, or 'South' versus 'S'.
+
+    If two locations share a key, the lower-numbered one is found, just
+    like list.index would find it.
+    '''
+
+    def __init__(self, Locations=()):
+        '''Create LocationIndex from Location namedtuples.'''
+        super().__init__(Locations)
+        self.by_address = {}
+        self.by_address_no_zip = {}
+        self.by_landmark = {}
+
+        for Location in self:
+            # [:-6] lops off the 5 zip digits plus the preceding space
+            self.by_address.setdefault(normalize(Location.address), Location)
+            self.by_address_no_zip.setdefault(
+                normalize(Location.address[:-6]), Location)
+            self.by_landmark.setdefault(normalize(Location.landmark),
+                                        Location)
+
+    def find_address(self, address):
+        '''Return Location at a street address plus zip code, or None.'''
+        return self.by_address.get(normalize(address))
+
+    def find(self, landmark_or_address):
+        '''Return Location having the given landmark, street address plus
+        zip code, or street address alone (checked in that order), or None.
+        '''
+        key = normalize(landmark_or_address)
+        return (self.by_landmark.get(key) or
+                self.by_address.get(key) or
+                self.by_address_no_zip.get(key))
+
+
+def as_location_index(Locations):
+    '''Return Locations as a LocationIndex, building one only if need be.'''
+    if isinstance(Locations, LocationIndex):
+        return Locations
+    return LocationIndex(Locations)
@@ -0,0 +1,63 @@
+from array import array
+from heapq import nsmallest
+
+
+class NeighborIndex():
+    '''Each location's locations sorted nearest-first, for nearest-neighbor
+    queries restricted to a set of eligible locations.
+
+    RouteBuilder.find_nearest used to scan a location's whole distance row
+    and test each location for membership in a list, which is O(n) per
+    check and O(n**2) per query. With a NeighborIndex, a query walks the
+    sorted locations and stops at the first one in the eligible set, so
+    its cost is the number of nearer, ineligible locations skipped.
+
+    A location's sorted row is built (by one sort of its distance row) the
+    first time it is queried, and kept as an array of location numbers:
+    2 bytes per location up to 65,535 locations. Ties in distance go to
+    the lower location number, as min over a distance row would give, and
+    the location itself is in its own row (at distance 0).
+
+    If nearest_count is given, a row keeps only that many nearest
+    locations, which bounds memory for very large matrices; a query which
+    finds none of them eligible falls back to checking each eligible
+    location directly.
+    '''
+
+    def __init__(self, distances, nearest_count=None):
+        '''Create NeighborIndex for a DistanceMatrix.'''
+        self.distances = distances
+        self.nearest_count = nearest_count
+        self.typecode = 'H' if distances.size < 2**16 else 'I'
+        self.rows = {}
+
+    def sorted_row(self, location_num):
+        '''Return array of location numbers sorted by distance from location
+        number passed in (and by location number, for equal distances).'''
+        row = self.rows.get(location_num)
+        if row is None:
+            # index 0 of a distance row is location_num itself, not a distance
+            # (sorting is stable, so equal distances stay in location order)
+            key = self.distances.row(location_num).__getitem__
+            loc_nums = range(1, self.distances.size + 1)
+            if self.nearest_count is None:
+                nearest = sorted(loc_nums, key=key)
+            else:
+                nearest = nsmallest(self.nearest_count, loc_nums, key=key)
+            row = self.rows[location_num] = array(self.typecode, nearest)
+        return row
+
+    def nearest(self, location_num, eligible):
+        '''Return (location number, distance) of the location in eligible
+        (a set of location numbers) nearest to location number passed in,
+        or None if eligible is empty.'''
+        dist = self.distances.dist
+        for loc_num in self.sorted_row(location_num):
+            if loc_num in eligible:
+                return loc_num, dist(location_num, loc_num)
+        if not eligible or self.nearest_count is None:
+            return None
+        loc_num = min(eligible,
+                      key=lambda loc_num: (dist(location_num, loc_num),
+                                           loc_num))
+        return loc_num, dist(location_num, loc_num)
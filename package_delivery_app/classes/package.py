@@ -1,8 +1,9 @@
 import re
 from collections import namedtuple
 from enum import Enum
+from functools import lru_cache
 from .time_custom import *
-from .hash import *
+from .record import Record
 
 
 class PackageSpecialNote_ValueError(BaseException):
@@ -18,7 +19,24 @@ class PkgState(Enum):
     WRONG_DESTINATION = 5
 
 
-class Package():
+class SpecialNote(Record):
+    '''The constraint, if any, parsed from a package's special note.
+
+    At most one of these fields is set; the others stay None.
+    '''
+
+    __slots__ = ('truck_number', 'deliver_with', 'late_arrival',
+                 'wrong_destination')
+
+    def __init__(self):
+        '''Create SpecialNote object with no constraint set.'''
+        self.truck_number = None
+        self.deliver_with = None
+        self.late_arrival = None
+        self.wrong_destination = None
+
+
+class Package(Record):
     '''The Package class provides Package objects.
 
     Attributes (Instance variables):
@@ -33,64 +51,74 @@ class Package():
         - late_arrival
         - wrong_destination
         The first two of these subproperties are used to set initial state.
+    - state: a PkgState
+    - history: list of History_Records
+
+    Attributes are slots (see Record), e.g. package.special_note.truck_number,
+    and can also be reached Hash-style: package.props['special_note'][...].
     '''
 
     History_Record = namedtuple('History_Record', ['state', 'time'])
 
-    def __init__(self, pkg_id, d, w, sn, location):
-        '''Create Package object.'''
-        self.props = Hash(ID=int(pkg_id),
-                          deadline=d,
-                          weight=w,
-                          location=location)
+    __slots__ = ('ID', 'deadline', 'weight', 'location', 'special_note',
+                 'state', 'history')
 
-        self.props['special_note'] = Hash('truck_number',
-                                          'deliver_with',
-                                          'late_arrival',
-                                          'wrong_destination')
-        self.mark_package_special(self.parse_special_note(sn))
+    def __init__(self, pkg_id, d, w, sn, location, parsed_note=None):
+        '''Create Package object.
 
-        self.props['state'] = None
+        parsed_note may be passed if the special note sn was already parsed
+        (see parse_special_notes); otherwise sn is parsed here.
+        '''
+        self.ID = int(pkg_id)
+        self.deadline = d
+        self.weight = w
+        self.location = location
+
+        self.special_note = SpecialNote()
+        if parsed_note is None:
+            parsed_note = self.parse_special_note(sn)
+        self.mark_package_special(parsed_note)
+
+        self.state = None
         self.set_initial_state()
 
-        self.props['history'] = []
+        self.history = []
         self.set_initial_history()
 
     def set_state(self, state_string):
         '''Update state of a package.'''
-        self.props['state'] = PkgState(PkgState[state_string])
+        self.state = PkgState[state_string]
 
     def set_initial_state(self):
         '''Set initial state of package to hub, late, or wrong-destination.'''
-        if self.props['special_note']['late_arrival']:
+        if self.special_note.late_arrival:
             self.set_state('LATE_ARRIVAL')
-        elif self.props['special_note']['wrong_destination']:
+        elif self.special_note.wrong_destination:
             self.set_state('WRONG_DESTINATION')
         else:
             self.set_state('AT_HUB')
 
     def set_initial_history(self):
         '''Set initial history of a package as at-hub at 7:59am.'''
-        self.props['history'].append(
-            Package.History_Record(self.props['state'],
-                                   Time_Custom(7, 59, 00)))
+        self.history.append(
+            Package.History_Record(self.state, Time_Custom(7, 59, 00)))
 
     def add_to_history(self, state_string, time):
         '''Add to history of a package object.'''
-        self.props['history'].append(
-            Package.History_Record(PkgState(PkgState[state_string]), time))
+        self.history.append(
+            Package.History_Record(PkgState[state_string], time))
 
     def history_string(self, delimiter=None):
         '''Return print-statement-friendly history of package.'''
         return f'\n{delimiter}'.join(
             [' at:\t'.join((record.state.name, str(record.time)))
-             for record in self.props['history']])
+             for record in self.history])
 
     def update_late_as_arrived(self, time):
         '''Update a late-arriving package to indicate it is now at the hub.'''
         self.set_state('AT_HUB')
-        self.props['history'].append(
-            Package.History_Record(PkgState(PkgState['AT_HUB']), time))
+        self.history.append(
+            Package.History_Record(PkgState.AT_HUB, time))
 
     def update_wrong_destination_as_corrected(self):
         '''Update a wrong-destination package to indicate destination is now
@@ -99,51 +127,15 @@ class Package():
 
     def update_package_destination(self, updated_destination):
         '''Update location property of package object.'''
-        self.props['location'] = updated_destination
+        self.location = updated_destination
 
     def parse_special_note(self, special_note):
         '''Parse the special note (if any) attached to a package.
 
-        The meaning of a special note is determined by its match to one of the
-        following (caps-insensitive) patterns:
-            1. 'only', followed by 'truck', followed by an integer
-                If matched, ...
-            2. 'delivered with', followed by an integer or comma-separated
-            list of integers
-                If matched, ...
-            3. 'delayed', followed by a time of the form 'h:mm (am|pm)'
-            or 'hh:mm (am|pm)'
-                If matched, ...
-            4. 'wrong address'
-                If matched, ...
-        Assumption: only one pattern will be matched for any given package.
-        If more than one did match, the constraint actually assigned to
-        the package is dictated by the order in which they are checked.
+        See parse_special_note_text, which does the parsing (and remembers
+        notes it has parsed, since the same few notes recur).
         '''
-        truck_number_constraint = truck_regex_match(special_note)
-        co_delivery_constraint = delivery_regex_match(special_note)
-        late_arrival_constraint = arrival_regex_match(special_note)
-        wrong_destination_constraint = destination_regex_match(special_note)
-
-        if truck_number_constraint:
-            truck_num = get_truck_number(special_note)
-            return 'truck_number', truck_num
-        if co_delivery_constraint:
-            package_list = get_packages_to_deliver_with(special_note)
-            return 'deliver_with', package_list
-        if late_arrival_constraint:
-            if not Time_Custom.is_valid_AM_PM_time(special_note):
-                raise PackageSpecialNote_ValueError(
-                    'Time-like value not parseable as an AM/PM time')
-            when = Time_Custom.make_time_from_string(special_note)
-            return 'late_arrival', when
-        if wrong_destination_constraint:
-            return 'wrong_destination', True
-
-        if special_note != '':
-            raise PackageSpecialNote_ValueError(
-                'Special note could not be parsed as a package constraint')
-        return None
+        return parse_special_note_text(special_note)
 
     def mark_package_special(self, parsed_note):
         '''Update package props based off result of parsing special_note.
@@ -153,15 +145,18 @@ class Package():
         '''
         if parsed_note is not None:
             parsed_note_key, parsed_note_value = parsed_note
-            self.props['special_note'][parsed_note_key] = parsed_note_value
+            if parsed_note_key == 'deliver_with':
+                # parsed notes are shared, so each package gets its own list
+                parsed_note_value = list(parsed_note_value)
+            setattr(self.special_note, parsed_note_key, parsed_note_value)
 
     def __str__(self):
         '''Return string representation of a Package object.'''
-        return '\n\t'.join([f"Package ID: {self.props['ID']}",
-                            f"delivery status: {self.props['state']}",
-                            f"destination: {self.props['location'].address}",
-                            f"deadline: {self.props['deadline']}",
-                            f"weight: {self.props['weight']}"])
+        return '\n\t'.join([f"Package ID: {self.ID}",
+                            f"delivery status: {self.state}",
+                            f"destination: {self.location.address}",
+                            f"deadline: {self.deadline}",
+                            f"weight: {self.weight}"])
 
 
 '''
@@ -173,6 +168,94 @@ delivery_pattern = re.compile("(delivered with \d+[, \d+]*)", re.IGNORECASE)
 arrival_pattern = re.compile("(delayed)(.*?)\d\d?:\d\d (am|pm)", re.IGNORECASE)
 destination_pattern = re.compile("wrong address", re.IGNORECASE)
 
+# The four patterns above in one: a branch per constraint, in the order
+# parse_special_note_text gives them priority, found in a single scan of the
+# note (see special_note_match). Each branch has one named group, capturing
+# what its constraint needs, so a match's lastindex is its branch's rank.
+special_note_pattern = re.compile(
+    r"(?P<truck>only.*?truck \d)"
+    r"|delivered with (?P<deliver_with>\d+[, \d+]*)"
+    r"|delayed.*?(?P<arrival>\d\d?:\d\d (?:am|pm))"
+    r"|(?P<wrong_destination>wrong address)",
+    re.IGNORECASE)
+digit_pattern = re.compile(r"\d")
+
+
+def special_note_match(special_note):
+    '''Return the match of special_note_pattern in a special note whose
+    constraint comes first in priority (the earliest, for equal priority),
+    or None if there is none.
+
+    Matches are found left to right in one scan and don't overlap, so in a
+    note with more than one constraint (see parse_special_note_text), one
+    inside another's match is not seen.
+    '''
+    best = None
+    for match in special_note_pattern.finditer(special_note):
+        if best is None or match.lastindex < best.lastindex:
+            best = match
+            if best.lastindex == 1:
+                break
+    return best
+
+
+@lru_cache(maxsize=1024)
+def parse_special_note_text(special_note):
+    '''Return (constraint name, value) parsed from a package special note,
+    or None if the note is empty.
+
+    The meaning of a special note is determined by its match to one of the
+    following (caps-insensitive) patterns:
+        1. 'only', followed by 'truck', followed by an integer
+            If matched, ...
+        2. 'delivered with', followed by an integer or comma-separated
+        list of integers
+            If matched, ...
+        3. 'delayed', followed by a time of the form 'h:mm (am|pm)'
+        or 'hh:mm (am|pm)'
+            If matched, ...
+        4. 'wrong address'
+            If matched, ...
+    Assumption: only one pattern will be matched for any given package.
+    If more than one did match, the constraint actually assigned to
+    the package is dictated by the order in which they are checked.
+
+    One regex (special_note_pattern), searched in a single scan of the note
+    (see special_note_match), classifies it and captures the parts to
+    extract. Results are cached by note text, so must not be
+    changed: a deliver_with value is a tuple (Packages copy it to a list).
+    '''
+    match = special_note_match(special_note)
+
+    if match is None:
+        if special_note != '':
+            raise PackageSpecialNote_ValueError(
+                'Special note could not be parsed as a package constraint')
+        return None
+
+    if match['truck'] is not None:
+        return 'truck_number', get_truck_number(special_note)
+    if match['deliver_with'] is not None:
+        return 'deliver_with', tuple(
+            get_packages_to_deliver_with(match['deliver_with']))
+    if match['arrival'] is not None:
+        if not Time_Custom.is_valid_AM_PM_time(match['arrival']):
+            raise PackageSpecialNote_ValueError(
+                'Time-like value not parseable as an AM/PM time')
+        return 'late_arrival', Time_Custom.make_time_from_string(
+            match['arrival'])
+    return 'wrong_destination', True
+
+
+def parse_special_notes(special_notes):
+    '''Return list of parsed special notes (see parse_special_note_text)
+    for a whole column of special notes, parsing each distinct note once.'''
+    parsed = {}
+    for note in special_notes:
+        if note not in parsed:
+            parsed[note] = parse_special_note_text(note)
+    return [parsed[note] for note in special_notes]
+
 
 def truck_regex_match(note):
     '''Return regex match for a truck-number constraint in a special note.'''
@@ -205,7 +288,7 @@ def validate_truck_number(integers_found):
 
 def get_truck_number(note):
     '''Parse and return truck number from a package special note.'''
-    integers_found = [int(num) for num in filter(str.isdigit, note)]
+    integers_found = [int(num) for num in digit_pattern.findall(note)]
     if not validate_truck_number(integers_found):
         raise PackageSpecialNote_ValueError(
             'Truck-number error in special note: either more than one '
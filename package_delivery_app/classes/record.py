@@ -0,0 +1,108 @@
+class Record():
+    '''Base class for slotted record objects (Package, Truck and so on).
+
+    A record's fields are its __slots__, so records are compact and their
+    fields are read and written as plain attributes, e.g. package.state.
+
+    For code written against the older Hash-backed props, every record
+    also has a props property: a Hash-like view of its fields, so that
+        package.props['state']                          # package.state
+        package.props['special_note']['truck_number']   # nested records
+        package.props['state'] = new_state              # sets package.state
+    all keep working.
+    '''
+
+    __slots__ = ()
+
+    @property
+    def props(self):
+        '''Return a Hash-like view of this record's fields.'''
+        return RecordProps(self)
+
+
+class RecordProps():
+    '''A Hash-like view of the fields of a Record.
+
+    Supports get, [], []=, in, len, iteration, keys, values, items, str,
+    repr and ==, like a Hash. Fields holding a Record are returned as that
+    record's view, so views can be indexed into like nested Hashes.
+    Nothing is copied: reads and writes go straight to the record.
+    '''
+
+    __slots__ = ('_record',)
+
+    def __init__(self, record):
+        '''Create view of record.'''
+        self._record = record
+
+    def _fields(self):
+        '''Return the record's field names.'''
+        return type(self._record).__slots__
+
+    def get(self, key_string, default=None):
+        '''Return field of the record or default value if key not found.'''
+        if not isinstance(key_string, str):
+            raise TypeError(f'Key {key_string} is not a string')
+        if key_string not in self._fields():
+            return default
+        return self[key_string]
+
+    def keys(self):
+        '''Return an iterator over the field names of the record.'''
+        return iter(self._fields())
+
+    def values(self):
+        '''Return an iterator over the field values of the record.'''
+        return (self[key] for key in self._fields())
+
+    def items(self):
+        '''Return an iterator over (field name, value) tuples.'''
+        return ((key, self[key]) for key in self._fields())
+
+    def __getitem__(self, key_string):
+        '''Get field of the record via [] notation.'''
+        if not isinstance(key_string, str):
+            raise TypeError(f'Key {key_string} is not a string')
+        if key_string not in self._fields():
+            raise KeyError(f'Key {key_string} does not exist in the record')
+
+        value = getattr(self._record, key_string)
+        return value.props if isinstance(value, Record) else value
+
+    def __setitem__(self, key_string, value):
+        '''Set field of the record via [] notation.'''
+        if not isinstance(key_string, str):
+            raise TypeError(f'Key {key_string} is not a string')
+        if key_string not in self._fields():
+            raise KeyError(f'Key {key_string} does not exist in the record')
+
+        setattr(self._record, key_string, value)
+
+    def __contains__(self, key_string):
+        '''Return whether key_string is a field of the record.'''
+        return key_string in self._fields()
+
+    def __iter__(self):
+        '''Return an iterator over the field names of the record.'''
+        return self.keys()
+
+    def __len__(self):
+        '''Return number of fields of the record.'''
+        return len(self._fields())
+
+    def __str__(self):
+        '''Return string representation of the record's fields.'''
+        return '{' + ','.join(f'\n\t{repr(key)}: {repr(value)}'
+                              for key, value in self.items()) + '\n}'
+
+    def __repr__(self):
+        '''Return string representation of the record's fields.'''
+        unpacked = ', '.join(str([key, value])
+                             for key, value in self.items())
+        return f'{type(self._record).__name__}.props({unpacked})'
+
+    def __eq__(self, other):
+        '''Two views are equal if their fields and values are equal.'''
+        if not isinstance(other, RecordProps):
+            return NotImplemented
+        return list(self.items()) == list(other.items())
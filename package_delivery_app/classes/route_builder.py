@@ -1,5 +1,10 @@
 from collections import namedtuple
-from .route_helpers import improve_route
+from time import perf_counter
+from .delivery_groups import DeliveryGroups
+from .neighbor_index import NeighborIndex
+from .route_helpers import (anneal_route, exact_route, improve_route,
+                            local_search_route)
+from .travel_times import build_travel_time_matrix
 from .time_custom import Time_Custom
 from .hash import Hash
 
@@ -26,10 +31,26 @@ class RouteBuilder():
         - arrival: a projected arrival time (Time_Custom objec)
 
     * A Location is itself a namedtuple of num, landmark, address.
+
+    Route state
+    -----------
+    Stops are added to the route only by append_stop and insert_stop, which
+    keep these up to date, so that the stop-adding loops never rebuild them
+    from the whole route or all ready packages:
+        - loaded: set of packages in route
+        - visited: set of location numbers in route
+        - left_by_location: location number -> set of ready packages for it
+          that are not yet in route (locations with none are dropped)
+        - unvisited_with_packages: set of location numbers (other than the
+          hub) in left_by_location but not in visited
+        - load_count: number of packages in route
     '''
     Neighbor = namedtuple('Neighbor', ['loc', 'dist'])
     Stop = namedtuple('Stop', ['loc', 'dist', 'pkgs'])
     StopPlus = namedtuple('StopPlus', ['loc', 'dist', 'pkgs', 'arrival'])
+    improvements = ('auto', 'exact', 'window', 'first', 'best')
+    exact_limit = 14  # most stops (besides the hub) 'auto' solves exactly
+    window_size = 7  # stops per segment reordered by 'window'
 
     def __init__(self, route_parameters):
         self.ready_pkgs = route_parameters['available_packages']
@@ -40,8 +61,63 @@ class RouteBuilder():
         self.speed_function = route_parameters['speed_function']
         self.starting_location = route_parameters['starting_location']
         self.leaving_hub_at = route_parameters['leaving_hub_at']
+        self.travel_times = route_parameters.get('travel_times')
+        if self.travel_times is None:
+            self.travel_times = build_travel_time_matrix(self.distances,
+                                                         self.speed_function)
+        self.window_pool = route_parameters.get('window_pool')
+        self.neighbors = route_parameters.get('neighbors')
+        if self.neighbors is None:
+            self.neighbors = NeighborIndex(self.distances)
+        self.delivery_groups = route_parameters.get('delivery_groups')
+        if self.delivery_groups is None:
+            self.delivery_groups = DeliveryGroups(self.ready_pkgs)
+        self.ready_groups = {}
+        self.two_hours_after_leaving = self.leaving_hub_at.plus_minutes(120)
 
         self.route = []
+        self.loaded = set()
+        self.visited = set()
+        self.load_count = 0
+        self.index_ready_packages()
+
+    def index_ready_packages(self):
+        '''Bucket ready packages not yet in route by location number (called
+        again whenever ready_pkgs is replaced).'''
+        self.left_by_location = {}
+        for pkg in self.ready_pkgs:
+            if pkg not in self.loaded:
+                self.left_by_location.setdefault(pkg.location.num,
+                                                 set()).add(pkg)
+        # location 1 is the hub
+        self.unvisited_with_packages = set(
+            loc_num for loc_num in self.left_by_location
+            if loc_num != 1 and loc_num not in self.visited)
+
+    def record_stop(self, stop):
+        '''Update route state for a stop just added to route.'''
+        self.visited.add(stop.loc)
+        self.unvisited_with_packages.discard(stop.loc)
+        for pkg in stop.pkgs:
+            self.loaded.add(pkg)
+            loc_num = pkg.location.num
+            left = self.left_by_location.get(loc_num)
+            if left is not None:
+                left.discard(pkg)
+                if not left:
+                    del self.left_by_location[loc_num]
+                    self.unvisited_with_packages.discard(loc_num)
+        self.load_count = len(self.loaded)
+
+    def append_stop(self, stop):
+        '''Append stop to route.'''
+        self.route.append(stop)
+        self.record_stop(stop)
+
+    def insert_stop(self, index, stop):
+        '''Insert stop into route before index.'''
+        self.route.insert(index, stop)
+        self.record_stop(stop)
 
     def get_locations(self):
         '''Return list of location-numbers/locations currently in route.'''
@@ -55,13 +131,13 @@ class RouteBuilder():
         '''Return packages sorted by closeness to hub.'''
         return sorted(
             pkgs if pkgs else self.get_packages(),
-            key=lambda pkg: self.distances[1][pkg.props['location'].num])
+            key=lambda pkg: self.distances.dist(1, pkg.location.num))
 
     def sort_locs_by_hub_closeness(self, location_nums=None):
         '''Return location-numbers list sorted by closeness to hub.'''
         return sorted(
             location_nums if location_nums else self.get_locations(),
-            key=lambda loc_num: self.distances[1][loc_num])
+            key=lambda loc_num: self.distances.dist(1, loc_num))
 
     def compute_dist(self):
         '''Return total distance of route.'''
@@ -73,8 +149,8 @@ class RouteBuilder():
 
     def display_stop(self, stop):
         '''Display one stop.'''
-        pkgs = ',\t'.join(['Package #' + str(p.props['ID']) for p in
-                           sorted(stop.pkgs, key=lambda p: p.props['ID'])])
+        pkgs = ',\t'.join(['Package #' + str(p.ID) for p in
+                           sorted(stop.pkgs, key=lambda p: p.ID)])
         print(f'Stop {self.route.index(stop)+1}: truck is projected to arrive '
               f'by {str(stop.arrival)} to {stop.loc}, which is {stop.dist} '
               f'miles from the last stop, and has these packages:\n\t{pkgs}')
@@ -98,63 +174,43 @@ class RouteBuilder():
 
     def grouped_deliver_with_constraints(self):
         '''Return list of lists of ready packages, sorted smaller first,
-        each list comprising packages that must be delivered together.'''
-        deliver_withs = [pkg for pkg in self.ready_pkgs
-                         if pkg.props['special_note']['deliver_with']]
-        sets = []
-        for pkg in deliver_withs:
-            IDs = [pkg.props['ID']] + pkg.props['special_note']['deliver_with']
-            IDs = set(IDs)
-            # if this is a subset of a set in sets, skip
-            if any(IDs.issubset(set_) for set_ in sets):
-                continue
-            # if a strict subset of this exists in sets, delete that, add this
-            IDs_subsets = [set_ for set_ in sets if IDs.issuperset(set_)]
-            sets = [set_ for set_ in sets if set_ not in IDs_subsets]
-            sets.append(IDs)
-            # if this overlaps with a set in sets, merge into this and replace
-            # if there are no overlaps, neither IDs nor sets will be changed
-            overlaps = [set_ for set_ in sets if not IDs.isdisjoint(set_)]
-            sets = [set_ for set_ in sets if set_ not in overlaps]
-            IDs = IDs.union(*overlaps)
-            sets.append(IDs)
-
-        pkgs_from_IDs = [[pkg for pkg in self.ready_pkgs
-                          if pkg.props['ID'] in set_]
-                         for set_ in sets]
-        return sorted(pkgs_from_IDs, key=lambda lst: len(lst))
+        each list comprising packages that must be delivered together.
+
+        The groups come from the DeliveryGroups passed in as route parameter
+        'delivery_groups' (or built from ready packages' notes); they are
+        also kept, by root ID, in ready_groups.'''
+        self.ready_groups = self.delivery_groups.ready_groups(self.ready_pkgs)
+        return sorted(self.ready_groups.values(), key=len)
 
     def is_deadline_urgent(self, deadline):
-        '''FILL ME IN.'''
-        two_hours_from_now = Time_Custom.clone(self.leaving_hub_at)
-        two_hours_from_now.add_time(120)
-        return deadline < two_hours_from_now
+        '''Return whether deadline is within 2 hours of leaving the hub.'''
+        return deadline < self.two_hours_after_leaving
 
     def get_most_urgent_packages(self):
         '''Return list of packages left with deadline in 2 hours or less.'''
         return [pkg for pkg in self.ready_pkgs
-                if pkg.props['deadline'] and
-                self.is_deadline_urgent(pkg.props['deadline'])]
+                if pkg.deadline and
+                self.is_deadline_urgent(pkg.deadline)]
 
     def get_truck_constraint_packages(self):
         '''Return list of packages left that must go on this truck.'''
         return [pkg for pkg in self.ready_pkgs
-                if pkg.props['special_note']['truck_number'] and
-                pkg.props['special_note']['truck_number'] == self.truck_num]
+                if pkg.special_note.truck_number and
+                pkg.special_note.truck_number == self.truck_num]
 
     def get_other_deadline_packages(self):
         '''Return list of packages left with deadline over 2 hours from now.'''
         return [pkg for pkg in self.ready_pkgs
-                if pkg.props['deadline'] and
-                not self.is_deadline_urgent(pkg.props['deadline'])]
+                if pkg.deadline and
+                not self.is_deadline_urgent(pkg.deadline)]
 
     def get_packages_on_the_way(self, pkg_load):
         '''Return list of packages destined for same place as any package in
         passed-in list (called before any packages are added to route).'''
-        locations_for_pkg_load = list(set([pkg.props['location'].num
+        locations_for_pkg_load = list(set([pkg.location.num
                                            for pkg in pkg_load]))
         return [pkg for pkg in list(set(self.ready_pkgs) - set(pkg_load))
-                if pkg.props['location'].num in locations_for_pkg_load]
+                if pkg.location.num in locations_for_pkg_load]
 
     def forbid_overfilling_load(self, so_far, more):
         '''Return package-list whose size does not exceed self.max_load, and
@@ -165,87 +221,98 @@ class RouteBuilder():
             more = closer_first[:max_minus_current]
         return list(set(so_far).union(set(more)))
 
-    def forbid_partial_deliver_groups(self, groups, pkgs_to_load):
-        '''Return package-list having no partial deliver-with groups.'''
+    def forbid_partial_deliver_groups(self, pkgs_to_load):
+        '''Return package-list having no partial deliver-with groups (of
+        those found by grouped_deliver_with_constraints).'''
         updated = pkgs_to_load[:]
         for pkg in pkgs_to_load:
-            for deliver_group in groups:
-                if pkg in deliver_group:
-                    together = list(set(updated).union(set(deliver_group)))
-                    if len(together) <= self.max_load:
-                        updated = together
-                    else:
-                        updated.remove(pkg)
+            deliver_group = self.ready_groups.get(
+                self.delivery_groups.find(pkg.ID))
+            if deliver_group is not None and pkg in deliver_group:
+                together = list(set(updated).union(set(deliver_group)))
+                if len(together) <= self.max_load:
+                    updated = together
+                else:
+                    updated.remove(pkg)
         return updated
 
     def packages_left(self):
         '''Return list of packages ready to go not already in route.'''
-        return list(set(self.ready_pkgs) - set(self.get_packages()))
+        return [pkg for left in self.left_by_location.values()
+                for pkg in left]
+
+    def packages_left_for(self, location_num):
+        '''Return list of packages ready to go to a location not already in
+        route.'''
+        return list(self.left_by_location.get(location_num, ()))
 
     def unvisited_stops_with_packages(self):
         '''Return list of unvisited locations at which at least one ready,
         unpicked package needs to be dropped off.'''
-        stops_with_pkgs = list(set([
-            pkg.props['location'].num for pkg in self.packages_left()]))
-        # start at 2 because col 0 isn't distance data, and col 1 is the hub
-        return [loc_num for loc_num in self.distances[0][2:]
-                if loc_num in stops_with_pkgs and
-                loc_num not in self.get_locations()]
+        return sorted(self.unvisited_with_packages)
+
+    def fit_in_load(self, more):
+        '''Return as many of packages in list more (none already in route) as
+        fit in the load, closer to the hub first (see forbid_overfilling_load).
+        '''
+        room = self.max_load - self.load_count
+        if len(more) > room:
+            more = self.sort_pkgs_by_hub_closeness(more)[:max(room, 0)]
+        return more
 
     def find_nearest(self, Stop_or_location_num, location_list=None):
         '''Return nearest neighbor-with-packages to Stop or location-number
-        passed in (restricted to locations in location_list, if passed in).'''
+        passed in (restricted to locations in location_list, if passed in).
+
+        Ties in distance go to the lower location number (see NeighborIndex).
+        '''
         location_num = (Stop_or_location_num.loc
                         if isinstance(Stop_or_location_num, RouteBuilder.Stop)
                         else Stop_or_location_num)
-        starting_from = zip(self.distances[0], self.distances[location_num])
-        eligible_location_nums = (location_list if location_list
-                                  else self.unvisited_stops_with_packages())
-        eligible_neighbors = [RouteBuilder.Neighbor(loc_num, dist)
-                              for (loc_num, dist) in starting_from
-                              if loc_num in eligible_location_nums]
-        return min(eligible_neighbors,
-                   key=lambda neighbor: neighbor.dist)
+        eligible_location_nums = (set(location_list) if location_list
+                                  else self.unvisited_with_packages)
+        nearest = self.neighbors.nearest(location_num, eligible_location_nums)
+        if nearest is None:
+            raise ValueError(f'No eligible neighbor of {location_num} left')
+        return RouteBuilder.Neighbor(*nearest)
 
     def add_first_stop(self):
         '''Add first stop.'''
-        self.route.append(RouteBuilder.Stop(self.starting_location, 0, []))
+        self.append_stop(RouteBuilder.Stop(self.starting_location, 0, []))
 
     def add_final_stop(self):
         '''Add final stop.'''
-        dist = self.distances[self.route[-1].loc][1]  # from previous to hub
-        self.route.append(RouteBuilder.Stop(self.starting_location, dist, []))
+        dist = self.distances.dist(self.route[-1].loc, 1)  # previous to hub
+        self.append_stop(RouteBuilder.Stop(self.starting_location, dist, []))
 
     def get_earliest_deadline_for_stop(self, stop):
         '''Return earliest deadline, if any, for a given stop in the route.'''
-        deadlines = [pkg.props['deadline'] for pkg in stop.pkgs
-                     if pkg.props['deadline']]
+        deadlines = [pkg.deadline for pkg in stop.pkgs
+                     if pkg.deadline]
         return min(deadlines) if len(deadlines) > 0 else None
 
     def Location_from_number(self, num):
         '''Return a Location from a location-number.'''
         return [L for L in self.Locations if L.num == num][0]
 
-    def get_projected_arrival(self, stop):
-        '''Return projected arrival time for a stop on a route.'''
-        index = self.route.index(stop)
-        if index == 0:
+    def get_projected_arrival(self, stop, previous=None):
+        '''Return projected arrival time for a stop on a route, given the
+        StopPlus before it (None if stop is the first stop).'''
+        if previous is None:
             return self.leaving_hub_at
-        previous = self.route[index - 1]
-        avg_speed = self.speed_function(previous.loc, stop.loc)
-        minutes = 60 * (stop.dist / avg_speed)
-        projected_arrival = Time_Custom.clone(previous.arrival)
-        projected_arrival.add_time(minutes)
-        return projected_arrival
+        travel_time = self.travel_times[previous.loc.num][stop.loc]
+        return previous.arrival.plus_seconds(travel_time)
 
     def convert_to_stopplus(self):
         '''Replace each Stop in route with a StopPlus--add projected arrival,
         and replace location number with reference to a Location.'''
+        previous = None
         for index, stop in enumerate(self.route):
             Location = self.Location_from_number(stop.loc)
-            projected_arrival = self.get_projected_arrival(stop)
+            projected_arrival = self.get_projected_arrival(stop, previous)
             self.route[index] = RouteBuilder.StopPlus(
                 Location, stop.dist, stop.pkgs, projected_arrival)
+            previous = self.route[index]
 
     def add_more_deliverwith_groups(self, pkgs_to_load, groups):
         '''Add more deliver-with groups that will fit, smallest first.'''
@@ -256,33 +323,33 @@ class RouteBuilder():
 
         delivwith_pkgs_left = [pkg for group in groups for pkg in group]
         self.ready_pkgs = list(set(self.ready_pkgs) - set(delivwith_pkgs_left))
+        self.index_ready_packages()
 
         return pkgs_to_load
 
     def construct_stops(self, pkgs_to_load):
         '''Construct stops for packages, in nearest-neighbor order (deadline
         packages first, then other packages), and append to route.'''
-        deadline_pkgs = [p for p in pkgs_to_load if p.props['deadline']]
-        locs = list(set([pkg.props['location'].num for pkg in deadline_pkgs]))
+        pkgs_by_location = {}
+        for pkg in pkgs_to_load:
+            pkgs_by_location.setdefault(pkg.location.num, []).append(pkg)
+
+        deadline_pkgs = [p for p in pkgs_to_load if p.deadline]
+        locs = set([pkg.location.num for pkg in deadline_pkgs])
 
         while len(locs) > 0:
             nearest = self.find_nearest(self.route[-1], locs)
-            pkgs_for_stop = [pkg for pkg in pkgs_to_load
-                             if pkg.props['location'].num == nearest.loc]
-            self.route.append(RouteBuilder.Stop(
-                nearest.loc, nearest.dist, pkgs_for_stop))
+            self.append_stop(RouteBuilder.Stop(
+                nearest.loc, nearest.dist, pkgs_by_location[nearest.loc]))
             locs.remove(nearest.loc)
 
-        others = [p for p in pkgs_to_load if not p.props['deadline']]
-        locs = list(set([pkg.props['location'].num for pkg in pkgs_to_load]) -
-                    set([pkg.props['location'].num for pkg in deadline_pkgs]))
+        locs = (set(pkgs_by_location) -
+                set([pkg.location.num for pkg in deadline_pkgs]))
 
         while len(locs) > 0:
             nearest = self.find_nearest(self.route[-1], locs)
-            pkgs_for_stop = [pkg for pkg in pkgs_to_load
-                             if pkg.props['location'].num == nearest.loc]
-            self.route.append(RouteBuilder.Stop(
-                nearest.loc, nearest.dist, pkgs_for_stop))
+            self.append_stop(RouteBuilder.Stop(
+                nearest.loc, nearest.dist, pkgs_by_location[nearest.loc]))
             locs.remove(nearest.loc)
 
     def get_index_of_last_urgent_deadline(self):
@@ -290,8 +357,8 @@ class RouteBuilder():
         index_of_last_urgent = None
         for index, stop in enumerate(self.route):
             for pkg in stop.pkgs:
-                if (pkg.props['deadline'] and
-                        self.is_deadline_urgent(pkg.props['deadline'])):
+                if (pkg.deadline and
+                        self.is_deadline_urgent(pkg.deadline)):
                     index_of_last_urgent = index
         return index_of_last_urgent
 
@@ -300,30 +367,28 @@ class RouteBuilder():
         wouldn't increase distance much (determined by acceptable_increase).'''
         stop_index = self.get_index_of_last_urgent_deadline() or 0
 
-        while (len(self.get_packages()) < self.max_load and
-               len(self.unvisited_stops_with_packages()) > 0):
+        while (self.load_count < self.max_load and
+               len(self.unvisited_with_packages) > 0):
 
-            stop = self.route[stop_index]
-            if stop == self.route[-1]:
+            if stop_index >= len(self.route) - 1:
                 break
+            stop = self.route[stop_index]
 
             nearest = self.find_nearest(stop)
             cur_next = self.route[stop_index + 1]
             if nearest == cur_next:
                 continue
 
-            distance_with_nearest = (self.distances[stop.loc][nearest.loc] +
-                                     self.distances[nearest.loc][cur_next.loc])
+            distance_with_nearest = (
+                self.distances.dist(stop.loc, nearest.loc) +
+                self.distances.dist(nearest.loc, cur_next.loc))
 
             if distance_with_nearest <= acceptable_increase * cur_next.dist:
-                for_here = [pkg for pkg in self.packages_left()
-                            if pkg.props['location'].num == nearest.loc]
-                excess_removed = self.forbid_overfilling_load(
-                    self.get_packages(), for_here)
-                for_here = list(set(excess_removed) - set(self.get_packages()))
+                for_here = self.fit_in_load(
+                    self.packages_left_for(nearest.loc))
 
                 if len(for_here) > 0:
-                    self.route.insert(stop_index + 1, (RouteBuilder.Stop(
+                    self.insert_stop(stop_index + 1, (RouteBuilder.Stop(
                         nearest.loc, nearest.dist, for_here)))
 
             stop_index += 1
@@ -331,22 +396,84 @@ class RouteBuilder():
     def add_stops_at_end(self):
         '''Add stops at end using nearest-neighbors until load is full or
         no more destination stops exist.'''
-        while (len(self.get_packages()) < self.max_load and
-               len(self.unvisited_stops_with_packages()) > 0):
+        while (self.load_count < self.max_load and
+               len(self.unvisited_with_packages) > 0):
 
             nearest = self.find_nearest(self.route[-1])
 
-            more = [pkg for pkg in self.packages_left()
-                    if pkg.props['location'].num == nearest.loc]
-            all_pkgs = self.forbid_overfilling_load(self.get_packages(), more)
-            at_this_stop = list(set(all_pkgs) - set(self.get_packages()))
+            at_this_stop = self.fit_in_load(
+                self.packages_left_for(nearest.loc))
 
             if len(at_this_stop) > 0:
-                self.route.append(RouteBuilder.Stop(
+                self.append_stop(RouteBuilder.Stop(
                     nearest.loc, nearest.dist, at_this_stop))
 
-    def build_route(self):
-        '''Return a delivery route (list of stops).'''
+    def reorder_stops(self, improvement, max_ms=None, seed=None,
+                      max_moves=None):
+        '''Re-order stops on route to get shorter total distance, so long as
+        deadlines wouldn't be missed.
+
+        Given a time budget of max_ms milliseconds and/or max_moves moves,
+        this is done by simulated annealing (see anneal_route, which seed
+        is passed to), which returns the best route found when the budget
+        is used up. Otherwise
+        the given improvement method is used:
+            - 'window': reorder windows of window_size stops
+              (see improve_route; in parallel, given a WindowPool as
+              route parameter 'window_pool')
+            - 'first' or 'best': 2-opt and Or-opt local search over the
+              whole route, making first or best improving moves
+              (see local_search_route)
+            - 'exact': the shortest order that meets deadlines
+              (see exact_route; slow beyond about 14 stops)
+            - 'auto': 'exact' for routes of up to exact_limit stops besides
+              the hub, otherwise 'first'
+        '''
+        stop_deadlines = [(stop.loc, self.get_earliest_deadline_for_stop(stop))
+                          for stop in self.route]
+        stop_deadlines = [sd for sd in stop_deadlines if sd[1]]  # remove Nones
+
+        if max_ms is not None or max_moves is not None:
+            self.route = anneal_route(
+                self.route, self.distances, stop_deadlines, self.travel_times,
+                self.leaving_hub_at, RouteBuilder.Stop, max_ms, seed,
+                max_moves)
+            return
+
+        if improvement == 'auto':
+            improvement = ('exact' if len(self.route) - 2 <= self.exact_limit
+                           else 'first')
+
+        if improvement == 'exact':
+            self.route = exact_route(
+                self.route, self.distances, stop_deadlines, self.travel_times,
+                self.leaving_hub_at, RouteBuilder.Stop)
+        elif improvement == 'window':
+            self.route = improve_route(
+                self.route, self.distances, stop_deadlines, self.travel_times,
+                self.leaving_hub_at, RouteBuilder.Stop, self.window_size,
+                self.window_pool)
+        else:
+            self.route = local_search_route(
+                self.route, self.distances, stop_deadlines, self.travel_times,
+                self.leaving_hub_at, RouteBuilder.Stop, improvement,
+                self.neighbors)
+
+    def build_route(self, improvement='auto', max_ms=None, seed=None,
+                    max_moves=None):
+        '''Return a delivery route (list of stops); see reorder_stops for
+        the ways its stops can be re-ordered at the end.
+
+        If max_ms is given, the route is returned after about that many
+        milliseconds: whatever time building the route leaves is spent
+        re-ordering its stops (with the random seed given), instead of
+        using the improvement method. If max_moves is given, re-ordering
+        stops after that many moves; given max_moves but not max_ms, the
+        same seed gives the same route on every run and machine.
+        '''
+        started = perf_counter()
+        if improvement not in RouteBuilder.improvements:
+            raise ValueError(f'Unknown route improvement {improvement!r}')
         if len(self.ready_pkgs) == 0:
             return []
 
@@ -369,13 +496,13 @@ class RouteBuilder():
             more_to_load += self.get_other_deadline_packages()
         pkgs_to_load = self.forbid_overfilling_load(pkgs_to_load, more_to_load)
 
-        pkgs_to_load = self.forbid_partial_deliver_groups(groups, pkgs_to_load)
+        pkgs_to_load = self.forbid_partial_deliver_groups(pkgs_to_load)
 
         #    II.   Get other packages that would be 'on the way'.
         # Also get any that must be delivered with those.
         more_to_load = self.get_packages_on_the_way(pkgs_to_load)
         pkgs_to_load = self.forbid_overfilling_load(pkgs_to_load, more_to_load)
-        pkgs_to_load = self.forbid_partial_deliver_groups(groups, pkgs_to_load)
+        pkgs_to_load = self.forbid_partial_deliver_groups(pkgs_to_load)
 
         #    III.  Add other deliver-with groups that will fit, smallest-first,
         # then remove packages in remaining groups from consideration. The idea
@@ -403,14 +530,9 @@ class RouteBuilder():
         #    VII.  Re-order stops on route to get shorter total distance,
         # so long as deadlines wouldn't be missed.
         self.add_final_stop()
-
-        stop_deadlines = [(stop.loc, self.get_earliest_deadline_for_stop(stop))
-                          for stop in self.route]
-        stop_deadlines = [sd for sd in stop_deadlines if sd[1]]  # remove Nones
-
-        self.route = improve_route(self.route, self.distances, stop_deadlines,
-                                   self.speed_function, self.leaving_hub_at,
-                                   RouteBuilder.Stop)
+        if max_ms is not None:
+            max_ms = max(0, max_ms - 1000 * (perf_counter() - started))
+        self.reorder_stops(improvement, max_ms, seed, max_moves)
 
         #    VIII. Convert Stops on route to StopPluses and return route
         self.convert_to_stopplus()
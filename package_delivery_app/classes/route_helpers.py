@@ -1,5 +1,12 @@
+import os
+from array import array
 from itertools import permutations
-from .time_custom import Time_Custom
+from math import exp
+from operator import add
+from random import Random
+from time import perf_counter
+from .distance_matrix import DistanceMatrix
+from .neighbor_index import NeighborIndex
 
 
 class ImproveRoute_Min_ValueError(BaseException):
@@ -11,47 +18,55 @@ def update_subroute_distances(subroute, distances):
 
     Receives subroute as list of tuples in which each tuple's indices are
         0 = location-number     1 = distance-from-previous  2 = package-list
-    We are updating the [1] index, distance-from-previous.
+    We are updating the [1] index, distance-from-previous, which is looked
+    up in distances (a DistanceMatrix).
     '''
     for index, stop in enumerate(subroute):
         if index == 0:
             continue
         prev, curr = subroute[index-1][0], stop[0]
-        dist = distances[prev][curr]
+        dist = distances.dist(prev, curr)
         subroute[index] = stop[0], dist, stop[2]
     return subroute
 
 
-def meets_deadlines(partial_route, distances, deadlines, speed, leave_time):
-    '''Return whether a given partial-route meets all package deadlines.
+def deadline_seconds(deadlines, leave_time):
+    '''Return dict of location-number -> seconds after leave_time by which
+    it must be reached, from a list of (location-number, deadline).'''
+    due = {}
+    for loc_num, deadline in deadlines:
+        seconds = deadline.seconds - leave_time.seconds
+        due[loc_num] = min(seconds, due.get(loc_num, seconds))
+    return due
 
-    NOTE: I override speed with 18 (see below).
-    The requirements for which this project built specify that the average
-    speed of a truck is always 18mph, no matter what, and including stops.
-    I built other parts of this program to be flexible via accommodating an
-    actual speed function in the future. However, I did not deem it worth
-    the effort to make this particular function flexible wrt a speed function.
-    '''
-    if deadlines == []:
-        return True
 
-    speed = 18
-    distance_so_far = 0
+def arrival_seconds(route, travel_times):
+    '''Return list of seconds after leaving the first stop at which each
+    stop of route is reached.'''
+    seconds_so_far = 0
+    previous_loc = route[0][0]
+    arrivals = []
+    for stop in route:
+        seconds_so_far += travel_times[previous_loc][stop[0]]
+        previous_loc = stop[0]
+        arrivals.append(seconds_so_far)
+    return arrivals
 
-    for stop in partial_route:
-        distance_so_far += stop[1]  # stop[1] is distance-from-previous-stop
 
-        # stop[0] and d[0] are both location-numbers
-        if stop[0] in [d[0] for d in deadlines]:
-            minutes_to_get_there = 60 * (distance_so_far / speed)
-            projected_arrival = Time_Custom.clone(leave_time)
-            projected_arrival.add_time(minutes_to_get_there)
+def meets_deadlines(partial_route, travel_times, deadlines, leave_time):
+    '''Return whether a given partial-route meets all package deadlines.
 
-            deadline, = [d[1] for d in deadlines if stop[0] == d[0]]
-            if projected_arrival > deadline:
-                return False
+    Travel times (in seconds, see build_travel_time_matrix) already
+    account for the speed between each pair of locations, so this honours
+    whatever speed function they were built with.
+    '''
+    if deadlines == []:
+        return True
 
-    return True
+    due = deadline_seconds(deadlines, leave_time)
+    return all(seconds <= due.get(stop[0], seconds) for stop, seconds
+               in zip(partial_route, arrival_seconds(partial_route,
+                                                     travel_times)))
 
 
 def recreate_namedtuples(route, Stop_namedtuple):
@@ -62,9 +77,105 @@ def recreate_namedtuples(route, Stop_namedtuple):
             for stop_tuple in route]
 
 
-def improve_route(route, distances, deadlines, speed, leave, Stop_namedtuple):
+def search_orderings(locs, start_loc, end_loc, total, seconds, dist,
+                     travel_times, due, prefix=(), limit=float('inf')):
+    '''Return (distance, ordering) for the shortest ordering of locs
+    (location-numbers) between start_loc and end_loc that meets deadlines,
+    where ordering is a tuple of indexes into locs, or None if every
+    ordering misses one; distance and seconds are those at start_loc.
+    Only orderings beginning with the indexes in prefix, and no longer
+    than limit, are searched.
+
+    Orderings are built depth-first, one stop at a time, in the order
+    itertools.permutations would give them (so ties go the same way). A
+    partial ordering is abandoned as soon as a stop in it is late, or when
+    its distance so far plus a lower bound on the rest -- for every stop
+    left, and the end, the shortest leg into it from any stop in the
+    segment -- cannot beat the shortest complete ordering found so far.
+    '''
+    shortest_in = [min(dist(other, loc) for other in
+                       [start_loc] + locs[:k] + locs[k+1:])
+                   for k, loc in enumerate(locs)]
+    bound = sum(shortest_in) + min(dist(other, end_loc)
+                                   for other in (locs or [start_loc]))
+
+    shortest = [limit, None]
+    ordering = []
+    unused = [True] * len(locs)
+    everything = range(len(locs))
+
+    def extend(previous_loc, total, seconds, bound):
+        if len(ordering) == len(locs):
+            seconds += travel_times[previous_loc][end_loc]
+            total += dist(previous_loc, end_loc)
+            if seconds <= due.get(end_loc, seconds) and (
+                    total < shortest[0] or shortest[1] is None and
+                    total <= shortest[0] + 1e-9):
+                shortest[:] = total, tuple(ordering)
+            return
+        depth = len(ordering)
+        for k in (prefix[depth:depth + 1] if depth < len(prefix)
+                  else everything):
+            if not unused[k]:
+                continue
+            loc = locs[k]
+            next_seconds = seconds + travel_times[previous_loc][loc]
+            if next_seconds > due.get(loc, next_seconds):
+                continue
+            next_total = total + dist(previous_loc, loc)
+            next_bound = bound - shortest_in[k]
+            # (a little slack, so float rounding can never prune a tie)
+            if next_total + next_bound > shortest[0] + 1e-9:
+                continue
+            unused[k] = False
+            ordering.append(k)
+            extend(loc, next_total, next_seconds, next_bound)
+            ordering.pop()
+            unused[k] = True
+
+    extend(start_loc, total, seconds, bound)
+    return None if shortest[1] is None else tuple(shortest)
+
+
+def shortest_ordering(route, index, end, start_seconds, distances, due,
+                      travel_times, pool=None):
+    '''Return (distance, ordering) for the shortest ordering of the stops
+    strictly between route[index] and route[end] that meets deadlines, or
+    None if every ordering misses one; distance includes route[index].dist.
+    See search_orderings, and WindowPool for the search in parallel.
+
+    The current ordering, if it meets deadlines, bounds the search from the
+    start (the shortest can only be as long as it).
+    '''
+    middle = route[index+1:end]
+    locs = [stop[0] for stop in middle]
+    limit, seconds = route[index][1], start_seconds
+    previous_loc = route[index][0]
+    for stop in route[index+1:end+1]:
+        seconds += travel_times[previous_loc][stop[0]]
+        if seconds > due.get(stop[0], seconds):
+            limit = float('inf')
+            break
+        limit += distances.dist(previous_loc, stop[0])
+        previous_loc = stop[0]
+
+    args = (locs, route[index][0], route[end][0], route[index][1],
+            start_seconds)
+    if pool is not None and len(middle) >= pool.min_stops:
+        found = pool.search_orderings(*args, travel_times, due, limit)
+    else:
+        found = search_orderings(*args, distances.dist, travel_times, due,
+                                 limit=limit)
+    if found is None:
+        return None
+    return found[0], tuple(middle[k] for k in found[1])
+
+
+def improve_route(route, distances, deadlines, travel_times, leave,
+                  Stop_namedtuple, window_size=7, pool=None):
     '''Reorder the ordering of stops in segments (or subroutes) of size 7
-    whenever a shorter segment distance can be found by reordering.
+    (or window_size) whenever a shorter segment distance can be found by
+    reordering.
 
     Why 7? Please read on. (tl;dr to balance runtime and optimality).
     * For a segment of size n, check every possible permutation of
@@ -80,41 +191,580 @@ def improve_route(route, distances, deadlines, speed, leave, Stop_namedtuple):
     where m = total route length.
     * For n=7, (n-2)! = 5! = 120, which is not so bad. It's very fast to
     compute one route distance and computing 120 isn't so bad either.
+    * Orderings are checked for deadlines incrementally: the arrival time
+    at the segment's start is known from the route so far (and the route up
+    to it is already known to meet its deadlines), so only the segment's
+    own stops are walked. And they are not all checked: see
+    shortest_ordering, whose pruning makes windows of 10 or 11 affordable.
+    * With a WindowPool passed in as pool, each large window is searched by
+    its processes in parallel.
     '''
     if len(route) <= 3:
         return route
 
-    n = 7
+    n = window_size
+    due = deadline_seconds(deadlines, leave)
+    arrivals = arrival_seconds(route, travel_times)
 
     # Why "- n + 1?" Example: a route of size n+1 has two subroutes of size n
     for index in range(len(route) - n + 1):
         end = min(index + n - 1, len(route) - 1)  # route size can be < n
 
-        # note that 'end' is used, not end-1, because slice-ends are exclusive
-        new_orderings = list(permutations(route[index+1:end]))
+        # the segment's start is the only stop before it not yet checked
+        start_loc = route[index][0]
+        start_seconds = arrivals[index]
+        if start_seconds > due.get(start_loc, start_seconds):
+            raise ImproveRoute_Min_ValueError('No route exists that would '
+                                              'meet all remaining deadlines.')
+
+        shortest = shortest_ordering(route, index, end, start_seconds,
+                                     distances, due, travel_times, pool)
+        if shortest is None:
+            raise ImproveRoute_Min_ValueError('No route exists that would '
+                                              'meet all remaining deadlines.')
 
         # a full subroute for distance calculation must include start and end
-        subroutes = [[route[index], *ordering, route[end]]
-                     for ordering in new_orderings]
+        subroute = update_subroute_distances(
+            [route[index], *shortest[1], route[end]], distances)
+        route = route[:index] + subroute + route[end+1:]
+        arrivals[index:end+1] = arrival_seconds(subroute, travel_times)
+        for position in range(index, end + 1):
+            arrivals[position] += start_seconds
 
-        with_updated_distances = [update_subroute_distances(
-                                    subroute, distances)
-                                  for subroute in subroutes]
+    return recreate_namedtuples(route, Stop_namedtuple)
 
-        with_none_late = [subroute for subroute in with_updated_distances
-                          if meets_deadlines(route[:index] + list(subroute),
-                                             distances, deadlines,
-                                             speed, leave)]
 
-        with_distance_sums = [(subroute, sum([x[1] for x in subroute]))
-                              for subroute in with_none_late]
+def route_neighbor_candidates(route, neighbors, neighbor_count):
+    '''Return, for each stop index of route, a list of the indexes of up to
+    neighbor_count nearest other stops (never the final stop), walking the
+    NeighborIndex's sorted rows and keeping only locations on the route.'''
+    stops_at = {}
+    for index, stop in enumerate(route[:-1]):
+        stops_at.setdefault(stop[0], []).append(index)
 
-        if not len(with_distance_sums) > 0:
-            raise ImproveRoute_Min_ValueError('No route exists that would '
-                                              'meet all remaining deadlines.')
-        shortest = min(with_distance_sums,
-                       key=lambda candidate_route: candidate_route[1])
+    candidates = []
+    for index, stop in enumerate(route):
+        nearest = []
+        for loc_num in neighbors.sorted_row(stop[0]):
+            nearest += [other for other in stops_at.get(loc_num, ())
+                        if other != index]
+            if len(nearest) >= neighbor_count:
+                break
+        candidates.append(nearest[:neighbor_count])
+    return candidates
 
-        route = route[:index] + list(shortest[0]) + route[end+1:]
 
-    return recreate_namedtuples(route, Stop_namedtuple)
+def moved_segment(order, start, length, after, reverse):
+    '''Return order with the length stops from position start moved to
+    just after stop after (and reversed, if reverse).'''
+    segment = order[start:start + length]
+    if reverse:
+        segment.reverse()
+    rest = order[:start] + order[start + length:]
+    insert_at = rest.index(after) + 1
+    return rest[:insert_at] + segment + rest[insert_at:]
+
+
+def local_search_route(route, distances, deadlines, travel_times, leave,
+                       Stop_namedtuple, mode='first', neighbors=None,
+                       neighbor_count=8):
+    '''Reorder stops by 2-opt and Or-opt moves for as long as any move makes
+    the route shorter without missing a deadline; return the new route.
+
+    Unlike improve_route, a stop can move anywhere on the route, so the
+    whole route is improved rather than windows of it:
+    * 2-opt reverses a stretch of the route, replacing two of its legs.
+    * Or-opt moves a run of 1 to 3 stops (either way round) elsewhere.
+    The first and last stops (the hub) stay put. Distances are symmetric,
+    so the change in length a move makes is found in O(1) from the legs it
+    replaces; only moves that make the route shorter are then checked for
+    deadlines, from the first stop they change onward, stopping at the
+    first deadline missed.
+
+    Moves are only tried between a stop and its neighbor_count nearest
+    stops on the route (found via the NeighborIndex neighbors, built from
+    distances if not passed in), so each pass over the route is linear in
+    its length. With mode 'first', each improving move is made as soon as
+    it is found; with mode 'best', each pass makes only the best move.
+
+    If the route passed in misses deadlines, moves which reduce the total
+    time by which deadlines are missed are made first, and the
+    ImproveRoute_Min_ValueError is raised if the route still misses any.
+    '''
+    if mode not in ('first', 'best'):
+        raise ValueError(f"mode must be 'first' or 'best', not {mode!r}")
+    if len(route) <= 3:
+        return route
+    if neighbors is None:
+        neighbors = NeighborIndex(distances)
+
+    n = len(route)
+    locs = [stop[0] for stop in route]
+    due = deadline_seconds(deadlines, leave)
+    candidates = route_neighbor_candidates(route, neighbors, neighbor_count)
+    dist = distances.dist
+
+    def D(stop1, stop2):
+        return dist(locs[stop1], locs[stop2])
+
+    # order holds stop indexes; at[k] is the seconds after leaving and
+    # late[k] the seconds by which deadlines are missed, up to position k
+    order = list(range(n))
+    position = at = late = None
+
+    def update_state():
+        nonlocal position, at, late
+        position = [0] * n
+        at, late = [0] * n, [0] * n
+        seconds = missed = 0
+        previous = locs[0]
+        for k, stop in enumerate(order):
+            position[stop] = k
+            seconds += travel_times[previous][locs[stop]]
+            previous = locs[stop]
+            deadline = due.get(previous)
+            if deadline is not None and seconds > deadline:
+                missed += seconds - deadline
+            at[k], late[k] = seconds, missed
+
+    def lateness(new_order, start):
+        '''Return seconds by which new_order (same as order before start)
+        misses deadlines, or None if more than order does.'''
+        seconds, missed = at[start - 1], late[start - 1]
+        previous = locs[new_order[start - 1]]
+        limit = late[-1]
+        for k in range(start, n):
+            loc_num = locs[new_order[k]]
+            seconds += travel_times[previous][loc_num]
+            previous = loc_num
+            deadline = due.get(loc_num)
+            if deadline is not None and seconds > deadline:
+                missed += seconds - deadline
+                if missed > limit:
+                    return None
+        return missed
+
+    def moves_at(i):
+        '''Yield (change in distance, first position changed, function
+        returning the new order) for moves involving the stop at i.'''
+        a, b = order[i - 1], order[i]
+        # 2-opt: new leg a-c, reversing b..c (c after b)
+        for c in candidates[a]:
+            j = position[c]
+            if i < j <= n - 2:
+                e = order[j + 1]
+                yield (D(a, c) + D(b, e) - D(a, b) - D(c, e), i,
+                       lambda i=i, j=j: (order[:i] + order[i:j + 1][::-1] +
+                                         order[j + 1:]))
+        # 2-opt: new leg c-b, reversing c..a (c before a)
+        for c in candidates[b]:
+            j = position[c]
+            if 1 <= j < i - 1:
+                r = order[j - 1]
+                yield (D(r, a) + D(c, b) - D(r, c) - D(a, b), j,
+                       lambda i=i, j=j: (order[:j] + order[j:i][::-1] +
+                                         order[i:]))
+        # Or-opt: move the run of stops starting at b next to c
+        for length in (1, 2, 3):
+            if i + length > n - 1:
+                break
+            first, last = b, order[i + length - 1]
+            after = order[i + length]
+            removed = D(a, first) + D(last, after) - D(a, after)
+            for c in candidates[first]:
+                p = position[c]
+                if i - 1 <= p <= i + length - 1:
+                    continue
+                q = order[p + 1]
+                yield (D(c, first) + D(last, q) - D(c, q) - removed,
+                       min(i, p + 1),
+                       lambda i=i, length=length, c=c: moved_segment(
+                           order, i, length, c, False))
+                if p >= 1 and p != i + length:
+                    r = order[p - 1]
+                    yield (D(r, last) + D(first, c) - D(r, c) - removed,
+                           min(i, p),
+                           lambda i=i, length=length, r=r: moved_segment(
+                               order, i, length, r, True))
+
+    def accepted(delta, start, make_order):
+        '''Return (seconds late, new order) if a move is an improvement.'''
+        if late[-1] == 0 and delta > -1e-9:
+            return None
+        new_order = make_order()
+        missed = lateness(new_order, start)
+        if missed is None or (missed == late[-1] and delta > -1e-9):
+            return None
+        return missed, new_order
+
+    update_state()
+    improved = True
+    while improved:
+        improved = False
+        if mode == 'first':
+            for i in range(1, n - 1):
+                for move in moves_at(i):
+                    result = accepted(*move)
+                    if result is not None:
+                        order = result[1]
+                        update_state()
+                        improved = True
+                        break
+        else:
+            # shortest first, so that new orders are only made (and checked
+            # for deadlines) until the first acceptable one, if none are late
+            moves = sorted((move for i in range(1, n - 1)
+                            for move in moves_at(i)),
+                           key=lambda move: move[0])
+            best = None
+            for move in moves:
+                result = accepted(*move)
+                if result is not None and (best is None or
+                                           (result[0], move[0]) < best[:2]):
+                    best = result[0], move[0], result[1]
+                    if late[-1] == 0:
+                        break
+            if best is not None:
+                order = best[2]
+                update_state()
+                improved = True
+
+    if late[-1] > 0:
+        raise ImproveRoute_Min_ValueError('No route exists that would '
+                                          'meet all remaining deadlines.')
+
+    new_route = update_subroute_distances([route[stop] for stop in order],
+                                          distances)
+    return recreate_namedtuples(new_route, Stop_namedtuple)
+
+
+def exact_route(route, distances, deadlines, travel_times, leave,
+                Stop_namedtuple):
+    '''Return the shortest reordering of route's stops (keeping the first
+    and last) that meets all deadlines, found by Held-Karp dynamic
+    programming; raise ImproveRoute_Min_ValueError if there is none.
+
+    For each set of stops visited after the first, and each stop that set
+    could end at, the ways of getting there are built from those of the
+    set without that stop, which (being a smaller number) was built
+    earlier. An ending stop reached after its deadline is never stored, so
+    hopeless states are pruned as soon as they appear. This is
+    O(2**m * m**2) for m stops in between (times the labels kept per
+    state, below), and doubles per extra stop; see RouteBuilder.exact_limit
+    and benchmark_exact_routes.
+
+    Travel times are rounded per leg (see build_travel_time_matrix), so a
+    shorter way to a stop can arrive later than a longer one, and only the
+    longer one might go on to meet a later deadline. So, given deadlines,
+    each set and ending stop keeps every (distance, arrival) label that no
+    other label beats on both, shortest first; without deadlines arrivals
+    don't matter and only the shortest is kept.
+
+    A set's labels are kept in four arrays, grouped by ending stop: the
+    ending stop, distance, seconds after leaving, and the index of the
+    label it came from among the labels of the set without its ending
+    stop. Sets never reached get no arrays.
+    '''
+    if len(route) <= 3:
+        return route
+
+    first, middle, last = route[0][0], route[1:-1], route[-1][0]
+    m = len(middle)
+    locs = [stop[0] for stop in middle]
+    dist = distances.dist
+    due_by_loc = deadline_seconds(deadlines, leave)
+    timed = bool(due_by_loc)
+    due = [due_by_loc.get(loc_num, float('inf')) for loc_num in locs]
+    # legs into each stop k, indexed by the stop before it
+    leg_to = [[dist(a, b) for a in locs] for b in locs]
+    leg_time_to = [[travel_times[a][b] if timed else 0 for a in locs]
+                   for b in locs]
+
+    ends = [None] * (1 << m)
+    miles = [None] * (1 << m)
+    seconds = [None] * (1 << m)
+    came_from = [None] * (1 << m)
+
+    for subset in range(1, 1 << m):
+        subset_ends, subset_miles = array('B'), array('d')
+        subset_seconds, subset_came_from = array('q'), array('I')
+        for k in range(m):
+            if not subset >> k & 1:
+                continue
+            rest = subset ^ 1 << k
+            if rest == 0:
+                arrival = travel_times[first][locs[k]] if timed else 0
+                labels = ([(dist(first, locs[k]), arrival, 0)]
+                          if arrival <= due[k] else [])
+            elif ends[rest] is None:
+                continue
+            elif not timed:
+                # one label per ending stop; ties go to the lower index
+                legs = map(leg_to[k].__getitem__, ends[rest])
+                labels = [min(zip(map(add, miles[rest], legs),
+                                  seconds[rest], range(len(miles[rest]))))]
+            else:
+                legs = map(leg_to[k].__getitem__, ends[rest])
+                leg_times = map(leg_time_to[k].__getitem__, ends[rest])
+                due_k = due[k]
+                labels = [label for label in zip(
+                              map(add, miles[rest], legs),
+                              map(add, seconds[rest], leg_times),
+                              range(len(miles[rest])))
+                          if label[1] <= due_k]
+                if labels:
+                    # the shortest, then any longer ones arriving earlier
+                    shortest = min(labels)
+                    labels = [shortest] + sorted(
+                        label for label in labels if label[1] < shortest[1])
+            earliest = float('inf')
+            for total, arrival, index in labels:
+                if arrival < earliest:
+                    earliest = arrival
+                    subset_ends.append(k)
+                    subset_miles.append(total)
+                    subset_seconds.append(arrival)
+                    subset_came_from.append(index)
+        if subset_ends:
+            ends[subset], miles[subset] = subset_ends, subset_miles
+            seconds[subset], came_from[subset] = (subset_seconds,
+                                                  subset_came_from)
+
+    everything = (1 << m) - 1
+    if ends[everything] is None:
+        raise ImproveRoute_Min_ValueError('No route exists that would '
+                                          'meet all remaining deadlines.')
+    # the first label of each ending stop is its shortest
+    firsts = [index for index, end in enumerate(ends[everything])
+              if index == 0 or ends[everything][index - 1] != end]
+    index = min(firsts, key=lambda index: (
+        miles[everything][index] + dist(locs[ends[everything][index]], last)))
+
+    order, subset = [], everything
+    while subset:
+        end = ends[subset][index]
+        order.append(end)
+        subset, index = subset ^ 1 << end, came_from[subset][index]
+    order.reverse()
+
+    new_route = update_subroute_distances(
+        [route[0]] + [middle[k] for k in order] + [route[-1]], distances)
+    return recreate_namedtuples(new_route, Stop_namedtuple)
+
+
+def anneal_route(route, distances, deadlines, travel_times, leave,
+                 Stop_namedtuple, max_ms, seed=None, max_moves=None):
+    '''Reorder stops by simulated annealing for max_ms milliseconds and/or
+    max_moves moves (whichever runs out sooner; one of them must be given);
+    return the shortest route found that meets all deadlines.
+
+    This is an anytime search, for when a route is needed within a time
+    budget: it can be stopped whenever, and the route passed in (if it
+    meets deadlines) is the first best-so-far. Each move is a random 2-opt
+    reversal or Or-opt move of 1 to 3 stops (see local_search_route),
+    scored by the change in distance plus a mile per minute by which
+    deadlines are missed, so that the search can pass through, and climb
+    out of, late routes. Worse moves are accepted with a probability that
+    falls as the temperature cools, from about a tenth of an average leg
+    to near zero as the budget is used up.
+
+    Moves are drawn from Random(seed), so runs with the same seed make the
+    same moves; given max_moves, cooling follows the moves made, not the
+    clock, so such a run returns the same route each time, on any machine
+    (as long as it is not cut short by max_ms, so pass max_ms=None for
+    that). ImproveRoute_Min_ValueError is raised if
+    no route found meets all deadlines.
+    '''
+    started = perf_counter()
+    n = len(route)
+    if n <= 3:
+        return route
+
+    locs = [stop[0] for stop in route]
+    due = deadline_seconds(deadlines, leave)
+    dist = distances.dist
+    random = Random(seed)
+    late_penalty = 1 / 60  # miles per second late
+
+    def D(stop1, stop2):
+        return dist(locs[stop1], locs[stop2])
+
+    def lateness(order):
+        '''Return seconds by which order misses deadlines.'''
+        seconds = missed = 0
+        previous = locs[order[0]]
+        for stop in order:
+            seconds += travel_times[previous][locs[stop]]
+            previous = locs[stop]
+            if seconds > due.get(previous, seconds):
+                missed += seconds - due[previous]
+        return missed
+
+    order = list(range(n))
+    miles = sum(D(a, b) for a, b in zip(order, order[1:]))
+    missed = lateness(order) if due else 0
+    best = (miles, order) if missed == 0 else None
+
+    temperature = start_temperature = 0.1 * miles / (n - 1) or 1.0
+    final_temperature = start_temperature / 1000
+    if max_ms is None and max_moves is None:
+        raise ValueError('anneal_route needs max_ms or max_moves')
+    budget = float('inf') if max_ms is None else max_ms / 1000
+    moves = 0
+    while max_moves is None or moves < max_moves:
+        if moves % 64 == 0:
+            elapsed = perf_counter() - started
+            if elapsed >= budget:
+                break
+            progress = (moves / max_moves if max_moves is not None
+                        else elapsed / budget)
+            temperature = (start_temperature *
+                           (final_temperature / start_temperature) ** progress)
+        moves += 1
+
+        if random.random() < 0.5:
+            # 2-opt: reverse order[i..j]
+            i, j = sorted(random.sample(range(1, n - 1), 2))
+            a, b, c, e = order[i - 1], order[i], order[j], order[j + 1]
+            delta = D(a, c) + D(b, e) - D(a, b) - D(c, e)
+            new_order = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+        else:
+            # Or-opt: move a run of 1 to 3 stops to between two others
+            length = min(random.randint(1, 3), n - 3)
+            i = random.randint(1, n - 1 - length)
+            first, last = order[i], order[i + length - 1]
+            before, after = order[i - 1], order[i + length]
+            rest = order[:i] + order[i + length:]
+            p = random.randint(0, len(rest) - 2)
+            if p == i - 1:
+                continue
+            c, q = rest[p], rest[p + 1]
+            segment = order[i:i + length]
+            if random.random() < 0.5:
+                segment.reverse()
+                first, last = last, first
+            delta = (D(c, first) + D(last, q) - D(c, q) -
+                     (D(before, order[i]) + D(order[i + length - 1], after) -
+                      D(before, after)))
+            new_order = rest[:p + 1] + segment + rest[p + 1:]
+
+        new_missed = lateness(new_order) if due else 0
+        change = delta + late_penalty * (new_missed - missed)
+        if change <= 0 or random.random() < exp(-change / temperature):
+            order, miles, missed = new_order, miles + delta, new_missed
+            if missed == 0 and (best is None or miles < best[0] - 1e-9):
+                best = miles, order
+
+    if best is None:
+        raise ImproveRoute_Min_ValueError('No route exists that would '
+                                          'meet all remaining deadlines.')
+    new_route = update_subroute_distances([route[stop] for stop in best[1]],
+                                          distances)
+    return recreate_namedtuples(new_route, Stop_namedtuple)
+
+
+# the shared distances of a WindowPool process (see attach_distances)
+pool_distances = None
+
+
+def attach_distances(shared_name, size):
+    '''Give this WindowPool process the pool's distances, as a
+    DistanceMatrix over the shared memory block, without copying them.'''
+    from multiprocessing.shared_memory import SharedMemory
+    global pool_distances
+    shared = SharedMemory(shared_name)
+    triangle = shared.buf[:8 * size * (size - 1) // 2].cast('d')
+    pool_distances = shared, DistanceMatrix(size, data=triangle)
+
+
+def search_window_part(locs, start_loc, end_loc, total, seconds,
+                       travel_times, due, prefix, limit):
+    '''Run search_orderings in a WindowPool process, on its distances.'''
+    return search_orderings(locs, start_loc, end_loc, total, seconds,
+                            pool_distances[1].dist, travel_times, due, prefix,
+                            limit)
+
+
+class WindowPool():
+    '''A pool of processes that search improve_route's windows in parallel.
+
+    The distances are copied once into a multiprocessing.shared_memory
+    block, which every process maps as its own DistanceMatrix, so no task
+    carries them. A window's orderings are split by their first stop (or
+    first two, given more workers than stops), one task per split in the
+    order permutations would give, and each task carries only the window's
+    own travel times and deadlines. Windows of
+    fewer than min_stops stops between start and end are searched here, as
+    they are too small to be worth sending out.
+
+    If the processes or shared memory can't be had on this platform (or
+    Python: shared memory is new in 3.8), every window is searched here
+    instead. Use it as a context manager, or call
+    close, to stop the processes and free the shared memory:
+
+        with WindowPool(distances, workers=8) as pool:
+            improve_route(..., window_size=10, pool=pool)
+    '''
+
+    def __init__(self, distances, workers=None, min_stops=7):
+        '''Create pool of workers (default: one per CPU) for distances.'''
+        self.distances = distances
+        self.workers = workers or os.cpu_count() or 1
+        self.min_stops = min_stops
+        self.shared = self.executor = None
+        triangle = array('d', distances.triangle())
+        try:
+            from concurrent.futures import ProcessPoolExecutor
+            from multiprocessing.shared_memory import SharedMemory
+            self.shared = SharedMemory(create=True,
+                                       size=max(8 * len(triangle), 1))
+            self.shared.buf[:8 * len(triangle)] = triangle.tobytes()
+            self.executor = ProcessPoolExecutor(
+                self.workers, initializer=attach_distances,
+                initargs=(self.shared.name, distances.size))
+        except (OSError, NotImplementedError, ImportError, TypeError):
+            # TypeError: ProcessPoolExecutor takes an initializer from 3.7 on
+            self.close()
+
+    def search_orderings(self, locs, start_loc, end_loc, total, seconds,
+                         travel_times, due, limit=float('inf')):
+        '''Return what search_orderings would, searching in parallel.'''
+        if self.executor is None or len(locs) < 2:
+            return search_orderings(locs, start_loc, end_loc, total, seconds,
+                                    self.distances.dist, travel_times, due,
+                                    limit=limit)
+
+        window = [start_loc, end_loc, *locs]
+        window_times = {a: {b: travel_times[a][b] for b in window}
+                        for a in window}
+        window_due = {loc: due[loc] for loc in window if loc in due}
+        # split by first stop, or by first two if that leaves workers idle
+        prefix_length = 1 if len(locs) >= self.workers else 2
+        parts = [self.executor.submit(
+                     search_window_part, locs, start_loc, end_loc, total,
+                     seconds, window_times, window_due, prefix, limit)
+                 for prefix in permutations(range(len(locs)), prefix_length)]
+
+        shortest = None
+        for part in parts:  # in permutations order, so ties go the same way
+            found = part.result()
+            if found is not None and (shortest is None or
+                                      found[0] < shortest[0]):
+                shortest = found
+        return shortest
+
+    def close(self):
+        '''Stop the processes and free the shared memory.'''
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self.shared is not None:
+            self.shared.close()
+            self.shared.unlink()
+            self.shared = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -7,59 +7,69 @@ class Time_Custom:
     Objects are military time (no AM/PM) and do not have fractional seconds.
     Example usage:
         given:  Time_Custom(13,15,27)
-        add:    33.5 minutes
+        add:    33.5 minutes, via plus_minutes
         result: Time_Custom(13,48,57)
+
+    Under the hood a time is a single integer, seconds since midnight, so
+    comparing two times is comparing two integers. Times are immutable:
+    plus_minutes and plus_seconds return a new time rather than changing
+    this one. Since they are immutable, times are also hashable and can be
+    used as dictionary keys or in sets.
     '''
 
+    __slots__ = ('_seconds',)
+
     digit_regex = re.compile("(\d{1,2}):(\d{2}) (am|pm)", re.IGNORECASE)
 
     def __init__(self, hour, minute, second):
         '''Create Time_Custom object.'''
-        self.hour = hour
-        self.minute = minute
-        self.second = second
+        object.__setattr__(self, '_seconds',
+                           3600 * hour + 60 * minute + second)
+
+    @classmethod
+    def from_seconds(cls, seconds):
+        '''Return a Time_Custom object that is seconds after midnight.'''
+        time_obj = cls.__new__(cls)
+        object.__setattr__(time_obj, '_seconds', seconds)
+        return time_obj
+
+    @property
+    def seconds(self):
+        '''Seconds since midnight.'''
+        return self._seconds
 
-    def add_time(self, minutes):
-        '''Advance the "clock" of a Time_Custom object by adding minutes.
+    @property
+    def hour(self):
+        return self._seconds // 3600
 
-        Input is restricted to a (positive number of) minutes.
+    @property
+    def minute(self):
+        return self._seconds // 60 % 60
 
+    @property
+    def second(self):
+        return self._seconds % 60
+
+    def plus_minutes(self, minutes):
+        '''Return the time a (non-negative) number of minutes after this one.
+
+        Fractions of a minute are rounded to the nearest second.
         This function assumes only that the travel time between any two
         destinations does not exceed 16 hours.
         '''
-        if minutes < 1 or minutes > 960:
+        if minutes < 0 or minutes > 960:
             raise ValueError('Ineligible number of minutes passed')
-        else:
-            h, m, s = Time_Custom.decompose(minutes)
-            h, m, s = (h + self.hour), (m + self.minute), (s + self.second)
-            m, s = Time_Custom.adjust_seconds(m, s)
-            h, m = Time_Custom.adjust_minutes(h, m)
-            self.hour, self.minute, self.second = h, m, s
-
-    @staticmethod
-    def decompose(minutes_to_add):
-        '''Break down minutes-to-add into hours, minutes and seconds.'''
-        h = int(minutes_to_add / 60)
-        m = int(minutes_to_add - 60 * h)
-        s = round(60 * (minutes_to_add % 1))
-        return h, m, s
-
-    @staticmethod
-    def adjust_minutes(h, m):
-        '''Adjust any number of seconds > 60 by rolling over into minutes.'''
-        hours_overflow = int((m - (m % 60)) / 60)
-        return h + hours_overflow, m - 60 * hours_overflow
-
-    @staticmethod
-    def adjust_seconds(m, s):
-        '''Adjust any number of minutes > 60 by rolling over into hours.'''
-        minutes_overflow = int((s - (s % 60)) / 60)
-        return m + minutes_overflow, s - 60 * minutes_overflow
+        return Time_Custom.from_seconds(self._seconds + round(60 * minutes))
+
+    def plus_seconds(self, seconds):
+        '''Return the time a whole number of seconds after this one.'''
+        return Time_Custom.from_seconds(self._seconds + seconds)
 
     @classmethod
     def clone(cls, time_obj):
-        '''Return a clone of a time-object.'''
-        return Time_Custom(time_obj.hour, time_obj.minute, time_obj.second)
+        '''Return a clone of a time-object. Times are immutable, so this is
+        the time-object itself.'''
+        return time_obj
 
     @classmethod
     def is_valid_AM_PM_time(cls, time_string):
@@ -96,57 +106,55 @@ class Time_Custom:
         '''Return string representation of a Time_Custom object.'''
         return f'{self.hour:02}:{self.minute:02}:{self.second:02}'
 
+    def __repr__(self):
+        '''Return string representation of a Time_Custom object.'''
+        return f'Time_Custom({self.hour}, {self.minute}, {self.second})'
+
+    def __setattr__(self, name, value):
+        '''Refuse to change a Time_Custom object.'''
+        raise AttributeError('Time_Custom objects are immutable')
+
+    def __reduce__(self):
+        '''Pickle (and copy) a Time_Custom object as its seconds.'''
+        return Time_Custom.from_seconds, (self._seconds,)
+
+    def __hash__(self):
+        '''Return hash of a Time_Custom object.'''
+        return hash(self._seconds)
+
     def __eq__(self, other):
-        '''Return whether one time is == another. Assumes inputs are times.'''
+        '''Return whether one time is == another. A time is never equal to
+        something that is not a time.'''
         if not isinstance(other, Time_Custom):
-            raise ValueError('Right-hand side of == not a Time_Custom object')
-        elif (self.hour == other.hour and
-              self.minute == other.minute and
-              self.second == other.second):
-            return True
-        else:
-            return False
+            return NotImplemented
+        return self._seconds == other._seconds
 
     def __ne__(self, other):
-        '''Return whether one time is != another. Assumes inputs are times.'''
-        return not self == other
+        '''Return whether one time is != another.'''
+        if not isinstance(other, Time_Custom):
+            return NotImplemented
+        return self._seconds != other._seconds
 
     def __lt__(self, other):
         '''Return whether one time is < another. Assumes inputs are times.'''
         if not isinstance(other, Time_Custom):
             raise ValueError('Right-hand side of < not a Time_Custom object')
-        else:
-            if self.hour < other.hour:
-                return True
-            elif (self.hour == other.hour and
-                  self.minute < other.minute):
-                return True
-            elif (self.minute == other.minute and
-                  self.second < other.second):
-                return True
-            else:
-                return False
+        return self._seconds < other._seconds
 
     def __gt__(self, other):
         '''Return whether one time is > another. Assumes inputs are times.'''
         if not isinstance(other, Time_Custom):
             raise ValueError('Right-hand side of > not a Time_Custom object')
-        else:
-            if self.hour > other.hour:
-                return True
-            elif (self.hour == other.hour and
-                  self.minute > other.minute):
-                return True
-            elif (self.minute == other.minute and
-                  self.second > other.second):
-                return True
-            else:
-                return False
+        return self._seconds > other._seconds
 
     def __le__(self, other):
         '''Return whether one time is <= another. Assumes inputs are times.'''
-        return self == other or self < other
+        if not isinstance(other, Time_Custom):
+            raise ValueError('Right-hand side of <= not a Time_Custom object')
+        return self._seconds <= other._seconds
 
     def __ge__(self, other):
         '''Return whether one time is >= another. Assumes inputs are times.'''
-        return self == other or self > other
+        if not isinstance(other, Time_Custom):
+            raise ValueError('Right-hand side of >= not a Time_Custom object')
+        return self._seconds >= other._seconds
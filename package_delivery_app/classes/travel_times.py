@@ -0,0 +1,56 @@
+from array import array
+from .distance_matrix import MappedDistanceMatrix
+
+
+class TravelTimeRows(dict):
+    '''Travel times between locations, computed a row at a time when a row
+    is first used: travel_times[i][j] as with build_travel_time_matrix.
+
+    For a MappedDistanceMatrix, whose rows are only read as needed, so that
+    travel times too only take memory for the locations actually visited.
+    '''
+
+    def __init__(self, distances, speed_function):
+        '''Create TravelTimeRows for distances and speed_function.'''
+        super().__init__()
+        self.distances = distances
+        self.speed_function = speed_function
+
+    def __missing__(self, from_num):
+        '''Compute, keep and return the row of travel times from from_num.'''
+        if from_num == 0:
+            return self.distances[0]
+        row = array('q', [from_num])
+        row.extend(round(3600 * dist / self.speed_function(from_num, to_num))
+                   for to_num, dist in enumerate(
+                       self.distances.row(from_num)[1:], 1))
+        self[from_num] = row
+        return row
+
+
+def build_travel_time_matrix(distances, speed_function):
+    '''Return 2D list of travel times, in whole seconds, between locations.
+
+    The result is laid out just like distances (location numbers in row 0
+    and column 0), so travel_times[i][j] is the time to drive from location
+    i to location j at the speed that speed_function(i, j) gives, in mph.
+    Building it once lets route-building look up a travel time instead of
+    computing one from a distance and a speed at every stop.
+
+    For a MappedDistanceMatrix the rows are built lazily (see TravelTimeRows)
+    rather than all at once, which would defeat the memory map.
+    '''
+    if isinstance(distances, MappedDistanceMatrix):
+        return TravelTimeRows(distances, speed_function)
+
+    location_nums = distances[0][1:]
+    travel_times = [distances[0][:]]
+
+    for row in distances[1:]:
+        from_num = row[0]
+        travel_times.append(
+            [from_num] +
+            [round(3600 * dist / speed_function(from_num, to_num))
+             for to_num, dist in zip(location_nums, row[1:])])
+
+    return travel_times
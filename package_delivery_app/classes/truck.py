@@ -1,8 +1,9 @@
 from .time_custom import *
 from .package import *
+from .record import Record
 
 
-class Truck():
+class Truck(Record):
     '''This class creates Truck objects.
 
     Class Attributes:
@@ -19,6 +20,9 @@ class Truck():
      - packages: list of packages currently on the truck
      - mileage_for_day: mileage for the day
 
+    Attributes are slots (see Record), e.g. truck.time, and can also be
+    reached Hash-style, e.g. truck.props['time'].
+
     Trucks, when they are at the hub, are capable of seeing whether any
     late-arrival packages have arrived and updating such packages, and they
     are also capable (or rather, you can suppose their drivers are capable) of
@@ -31,27 +35,28 @@ class Truck():
     starting_location = 1  # location 1 is the hub
     first_delivery_time = Time_Custom(8, 00, 00)
 
+    __slots__ = ('ID', 'location', 'time', 'packages', 'mileage_for_day')
+
     def __init__(self):
         '''Create Truck object.'''
-        self.props = Hash(ID=Truck.id_counter,
-                          location=Truck.starting_location,
-                          time=Truck.first_delivery_time,
-                          packages=[],
-                          mileage_for_day=0)
+        self.ID = Truck.id_counter
+        self.location = Truck.starting_location
+        self.time = Truck.first_delivery_time
+        self.packages = []
+        self.mileage_for_day = 0
 
         Truck.id_counter += 1
 
     def update_late_packages(self, all_packages):
         '''Update all late-arriving packages that are now at the hub.'''
         late_arrivals = [pkg for pkg in all_packages
-                         if pkg.props['special_note']['late_arrival']
-                         is not None]
+                         if pkg.special_note.late_arrival is not None]
 
         for pkg in late_arrivals:
-            anticipated_arrival = pkg.props['special_note']['late_arrival']
+            anticipated_arrival = pkg.special_note.late_arrival
 
-            if (self.props['time'] > anticipated_arrival and
-                    pkg.props['state'].name == 'LATE_ARRIVAL'):
+            if (self.time > anticipated_arrival and
+                    pkg.state is PkgState.LATE_ARRIVAL):
 
                 # anticipated_arrival will be used in the new History_Record,
                 # which means we implicitly assume late arrivals arrive
@@ -62,18 +67,18 @@ class Truck():
         '''Update all packages that had a known wrong-destination at start of day
         but which have now been corrected, i.e., which can now be delivered.'''
         wrong_destin_pkgs = [p for p in all_packages
-                             if p.props['state'].name == 'WRONG_DESTINATION']
+                             if p.state is PkgState.WRONG_DESTINATION]
 
         for pkg in wrong_destin_pkgs:
             # A destination-correction can indicate that the correct address
             # will be know later so we must exclude corrections not known yet.
             knowable_corrections = [c for c in destination_corrections
                                     if c.time is None or
-                                    self.props['time'] >= c.time]
+                                    self.time >= c.time]
 
-            if pkg.props['ID'] in [c.pkg_id for c in knowable_corrections]:
+            if pkg.ID in [c.pkg_id for c in knowable_corrections]:
                 updated_destination, = [c for c in knowable_corrections
-                                        if c.pkg_id == pkg.props['ID']]
+                                        if c.pkg_id == pkg.ID]
 
                 if updated_destination.location is not None:
                     pkg.update_package_destination(
@@ -85,21 +90,17 @@ class Truck():
         packages that have (respectively) arrived or been corrected.'''
         self.update_late_packages(all_packages)
         self.update_corrected_packages(all_packages, destination_corrections)
-        at_hub = [pkg for pkg in all_packages
-                  if pkg.props['state'].name == 'AT_HUB']
-
-        ID = self.props['ID']
-
-        can_go = [pkg for pkg in all_packages
-                  if (pkg.props['special_note']['truck_number'] is None or
-                      pkg.props['special_note']['truck_number'] == ID)]
+        ID = self.ID
+        at_hub = PkgState.AT_HUB
 
         return [pkg for pkg in all_packages
-                if pkg in at_hub and pkg in can_go]
+                if pkg.state is at_hub and
+                (pkg.special_note.truck_number is None or
+                 pkg.special_note.truck_number == ID)]
 
     def load(self, pkg_load):
         '''Load truck with packages.'''
-        self.props['packages'] = pkg_load
+        self.packages = pkg_load
 
     def get_mileage_for_day(self):
         '''Find and return actual mileage truck has traveled today.
@@ -108,7 +109,7 @@ class Truck():
         but could easily be extended in the future to account for "real life",
         for example if a truck was forced to take a detour.
         '''
-        return self.props['mileage_for_day']
+        return self.mileage_for_day
 
     def deliver(self, route):
         '''Deliver packages on truck.
@@ -123,21 +124,20 @@ class Truck():
             - arrival: a Time_Custom object (projected arrival, not actual)
         '''
         for stop in route:
-            self.props['location'] = stop.loc
-            self.props['time'] = stop.arrival
-            self.props['packages'] = list(
-                set(self.props['packages']) - set(stop.pkgs))
-            self.props['mileage_for_day'] += stop.dist
+            self.location = stop.loc
+            self.time = stop.arrival
+            self.packages = list(set(self.packages) - set(stop.pkgs))
+            self.mileage_for_day += stop.dist
 
             for pkg in stop.pkgs:
                 pkg.set_state('DELIVERED')
-                pkg.add_to_history('DELIVERED', self.props['time'])
+                pkg.add_to_history('DELIVERED', self.time)
 
     def __str__(self):
         '''Return string representation of Truck object.'''
-        package_list = '\n\t'.join([str(pk) for pk in self.props['packages']])
-        return (f"Truck with ID: {self.props['ID']}; location: "
-                f"{self.props['location']}; time: {str(self.props['time'])};"
+        package_list = '\n\t'.join([str(pk) for pk in self.packages])
+        return (f"Truck with ID: {self.ID}; location: "
+                f"{self.location}; time: {str(self.time)};"
                 f" with these packages: \n\t{package_list}")
 
     @classmethod
@@ -3,6 +3,7 @@ from os import path
 from collections import namedtuple
 from .classes.time_custom import Time_Custom
 from .classes.package import Package
+from .classes.location_index import as_location_index
 
 
 def say_hello():
@@ -211,10 +212,7 @@ def give_user_correction_instructions():
 
 
 def validate_user_correction_information(input_string, Locations):
-    '''Validate user-supplied destination-correction information.
-
-    Note the -6: This lops off the 5 zip digits plus the preceding space.
-    '''
+    '''Validate user-supplied destination-correction information.'''
     user_input = input_string.split(',')
     if len(user_input) != 2:
         return False
@@ -225,15 +223,10 @@ def validate_user_correction_information(input_string, Locations):
 
     digit_regex = re.search("(\d{1,2}):(\d{2})", time_or_location)
 
-    landmarks = [loc.landmark for loc in Locations]
-    street_addresses = [loc.address for loc in Locations]
-    street_addresses_no_zip = [loc.address[:-6] for loc in Locations]
-
     return (user_input[0].isdigit() and   # first part an integer
             (digit_regex or               # second part a time
-             time_or_location in landmarks or     # or second part a location
-             time_or_location in street_addresses or
-             time_or_location in street_addresses_no_zip))
+             # or second part a landmark, or street address with or without zip
+             as_location_index(Locations).find(time_or_location) is not None))
 
 
 def get_valid_correction_item_or_quit(Locations):
@@ -275,27 +268,14 @@ def get_time_or_location_from_string(time_or_location, Locations):
     '''Extract the time or the location supplied by user for a correction;
     if user supplies both (unexpected), only the address is extracted.
 
-    Note the -6: This lops off the 5 zip digits plus the preceding space.
+    A location may be given as a landmark, or as a street address with or
+    without its zip code (see LocationIndex.find).
     '''
     time_or_location = time_or_location.strip()
 
-    landmarks = [loc.landmark for loc in Locations]
-    if time_or_location in landmarks:
-        index_of_match = landmarks.index(time_or_location)
-        # this trick works because list comprehensions retain order
-        return Locations[index_of_match]
-
-    street_addresses = [loc.address for loc in Locations]
-    if time_or_location in street_addresses:
-        index_of_match = street_addresses.index(time_or_location)
-        # this trick works because list comprehensions retain order
-        return Locations[index_of_match]
-
-    street_addresses_no_zip = [loc.address[:-6] for loc in Locations]
-    if time_or_location in street_addresses_no_zip:
-        index_of_match = street_addresses_no_zip.index(time_or_location)
-        # this trick works because list comprehensions retain order
-        return Locations[index_of_match]
+    location = as_location_index(Locations).find(time_or_location)
+    if location is not None:
+        return location
 
     digit_regex = re.search("(\d{1,2}):(\d{2})", time_or_location)
     if digit_regex:
@@ -1,8 +1,24 @@
 import csv
+import gzip
+import os
 import re
+from array import array
 from collections import namedtuple
-from .classes.package import Package
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from math import isnan
+try:
+    import numpy
+except ImportError:  # optional: distances are then filled in pure Python
+    numpy = None
+from .classes.package import (Package, PackageSpecialNote_ValueError,
+                              parse_special_note_text, parse_special_notes)
 from .classes.time_custom import Time_Custom
+from .classes.distance_matrix import DistanceMatrix, MappedDistanceMatrix
+from .classes.travel_times import TravelTimeRows, build_travel_time_matrix
+from .classes.location_index import (LocationIndex, as_location_index,
+                                     abbreviate_directions)
+from .cache import read_cache, write_cache
 
 
 class DistanceCsv_ValueError(BaseException):
@@ -13,6 +29,31 @@ class PackageCsv_ValueError(BaseException):
     pass
 
 
+Location = namedtuple('Location', ['num', 'landmark', 'address'])
+PackageRowError = namedtuple('PackageRowError',
+                             ['line_number', 'row', 'message'])
+PackageChunk = namedtuple('PackageChunk', ['packages', 'notes', 'errors'])
+PreparedPackageRow = namedtuple('PreparedPackageRow', [
+    'line_number', 'row', 'deadline', 'parsed_note', 'message'])
+
+
+def is_gzipped(csv_file):
+    '''Return whether the file at csv_file is gzip-compressed.'''
+    with open(csv_file, 'rb') as f:
+        return f.read(2) == b'\x1f\x8b'
+
+
+def open_csv(csv_file, binary=False):
+    '''Open csv file for reading as text (or bytes, if binary),
+    decompressing it if gzipped.'''
+    if binary:
+        return gzip.open(csv_file) if is_gzipped(csv_file) else \
+            open(csv_file, 'rb')
+    if is_gzipped(csv_file):
+        return gzip.open(csv_file, 'rt', newline='')
+    return open(csv_file, newline='')
+
+
 def read_distance_csv(csv_file):
     '''Return list-of-lists representation of the contents of passed-in csv.
 
@@ -28,7 +69,7 @@ def read_distance_csv(csv_file):
     of the input csv. This is simply the format that the user provides.
     '''
     csv_data = []
-    with open(csv_file) as csvFile:
+    with open_csv(csv_file) as csvFile:
         csvReader = csv.reader(csvFile)
         for row in csvReader:
             if row[0] != '':
@@ -48,11 +89,7 @@ def clean_address_data(column_one, column_two):
 
     # Package addresses will have the same standard for direction abbreviation
     # so that the two sets of addresses are consistent and therefore matchable
-    street_address = (street_address
-                      .replace('South', 'S')
-                      .replace('North', 'N')
-                      .replace('East', 'E')
-                      .replace('West', 'W'))
+    street_address = abbreviate_directions(street_address)
 
     return landmark, street_address
 
@@ -76,17 +113,14 @@ def populate_locations(location_data, Location_constructor):
 
 
 def clean_distance_data(csv_data):
-    '''Remove redundant column, use location numbers instead of names,
-    and convert distance data (a mix of integer and string) to floats.
+    '''Remove redundant column and use location numbers instead of names.
+
+    Distances are left as strings; fill_distance_data converts them to
+    floats, once for each pair of locations.
     '''
     for row_index, row in enumerate(csv_data):
         del row[1]
 
-        for col_index, datum in enumerate(row):
-            if row_index != 0 and col_index != 0:
-                if datum != '':
-                    csv_data[row_index][col_index] = float(datum)
-
         # row_index will be used for location numbers
         if row_index != 0:
             row[0] = row_index
@@ -98,37 +132,186 @@ def clean_distance_data(csv_data):
             csv_data[0][col_index] = col_index
 
 
-def fill_distance_data(data):
-    '''Fill in distance data where the missing pieces of data can be inferred.
-
-    If cell at [i,j] is missing, but [j,i] is known, fill [i,j] with [j,i],
-    and vice versa. Skip when neither or both are empty.
-    '''
-    for row_index, row in enumerate(data):
-        for col_index, distance in enumerate(row):
-            ij = data[row_index][col_index]
-            ji = data[col_index][row_index]
-
-            if ij == '' and ji != '':
-                data[row_index][col_index] = data[col_index][row_index]
+def fill_distance_data(data, use_numpy=None):
+    '''Return DistanceMatrix of cleaned distance data, filling in distances
+    where the missing pieces of data can be inferred.
 
-            elif ji == '' and ij != '':
-                data[col_index][row_index] = data[row_index][col_index]
+    If cell at [i,j] is missing, but [j,i] is known, [i,j] is [j,i], and
+    vice versa. Only one triangle of the data is walked, since the matrix
+    stores each pair once; a pair that is missing from both cells, or whose
+    cells contradict each other, is left missing (NaN).
 
+    If NumPy is installed (and use_numpy is not False), the work is done in
+    bulk by fill_distance_data_numpy instead, with the same result.
+    '''
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    if use_numpy:
+        return fill_distance_data_numpy(data)
+    return DistanceMatrix.from_rows(data)
+
+
+def fill_distance_data_numpy(data):
+    '''Return DistanceMatrix of cleaned distance data, as fill_distance_data
+    does, using NumPy: each row of the numeric block is converted once, in
+    bulk, then missing cells are filled from the transpose with one masked
+    operation, and contradicting pairs found with another.'''
+    if numpy is None:
+        raise ImportError('NumPy is not installed')
+
+    size = len(data) - 1
+    block = numpy.empty((size, size))
+    for index, row in enumerate(data[1:]):
+        block[index] = numpy.array([cell if cell != '' else 'nan'
+                                    for cell in row[1:size + 1]], dtype=float)
+
+    missing = numpy.isnan(block)
+    filled = numpy.where(missing, block.T, block)
+    filled[~missing & ~missing.T & (block != block.T)] = numpy.nan
+
+    triangle = array('d')
+    triangle.frombytes(filled[numpy.triu_indices(size, 1)].tobytes())
+    return DistanceMatrix(size, data[0][0], data=triangle)
+
+
+def validate_distance_data(distances, use_numpy=None):
+    '''Validate distance data is both present and non-contradicting.
+
+    Contradicting pairs were left missing by fill_distance_data, and each
+    pair is stored once, so this checks that no distance is missing: in one
+    bulk NumPy operation if NumPy is installed (and use_numpy is not False).
+    '''
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    if use_numpy:
+        return not numpy.isnan(numpy.asarray(distances.triangle())).any()
+    return distances.is_complete()
+
+
+def convert_distance_csv(distance_csv, distance_file):
+    '''Convert a distance csv to a distance file, which load_data accepts
+    in place of the csv and reads through a memory map (see
+    MappedDistanceMatrix), for networks too large to hold in memory.
+
+    The csv is read one row at a time, so neither it nor the matrix has to
+    fit in memory. Each distance is filled in from whichever of [i,j] and
+    [j,i] is present, as fill_distance_data does; contradicting or absent
+    distances, and rows or columns beyond the header's locations, raise
+    DistanceCsv_ValueError. The file is written under a temporary name and
+    renamed once complete, so a failed conversion leaves no distance file
+    behind. Returns the distance file, opened for reading.
+    '''
+    temporary_path = f'{distance_file}.{os.getpid()}.tmp'
+    try:
+        write_distance_file(distance_csv, temporary_path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+    os.replace(temporary_path, distance_file)
 
-def validate_distance_data(data):
-    '''Validate distance data is both present and non-contradicting.'''
-    for row_index, row in enumerate(data):
-        for col_index, distance in enumerate(row):
-            ij = data[row_index][col_index]
-            ji = data[col_index][row_index]
+    return MappedDistanceMatrix(distance_file)
 
-            if ij is None and ji is None:
-                return False
-            if ij != ji:
-                return False
 
-    return True
+def write_distance_file(distance_csv, distance_file):
+    '''Write the distance file for a distance csv (see
+    convert_distance_csv), closing its memory map even if the csv is bad.
+    '''
+    distances = None
+    try:
+        with open_csv(distance_csv) as csvFile:
+            rows = (row for row in csv.reader(csvFile) if row[0] != '')
+            header = next(rows)
+            distances = MappedDistanceMatrix.create(distance_file,
+                                                    len(header) - 2)
+            float32 = array('f', [0.0])  # to compare distances as stored
+
+            locations = []
+            for i, row in enumerate(rows, 1):
+                if i > distances.size or len(row) - 2 > distances.size:
+                    raise DistanceCsv_ValueError(
+                        f'Row {i} is beyond the {distances.size} locations '
+                        'in the header')
+                landmark, street_address = clean_address_data(row[0], row[1])
+                locations.append((i, landmark, street_address))
+
+                for j, datum in enumerate(row[2:], 1):
+                    if datum == '' or i == j:
+                        continue
+                    float32[0] = float(datum)
+                    known = distances.dist(i, j)
+                    if isnan(known):
+                        distances.set_dist(i, j, float32[0])
+                    elif known != float32[0]:
+                        raise DistanceCsv_ValueError(
+                            f'Distances between locations {i} and {j} '
+                            'contradict each other')
+
+        if len(locations) != distances.size or not distances.is_complete():
+            raise DistanceCsv_ValueError(
+                'One or more distance values are absent')
+        distances.save_locations(header[0], locations)
+    finally:
+        if distances is not None:
+            distances.close()
+
+
+def count_newlines(binary_file, size):
+    '''Read size bytes of binary_file; return how many newlines they hold.'''
+    count = 0
+    while size > 0:
+        chunk = binary_file.read(min(size, 2**20))
+        if not chunk:
+            break
+        count += chunk.count(b'\n')
+        size -= len(chunk)
+    return count
+
+
+def read_package_rows(csv_file, start=0, stop=None):
+    '''Yield (line number, row) for each package row of the csv, reading it
+    one row at a time; see read_package_csv for the expected columns. The
+    line number is that of the row's first line in the file.
+
+    If start or stop is given, only rows whose first line starts within
+    that byte range of the (uncompressed) csv are read, so that a large csv
+    can be split between workers (see package_csv_ranges). The csv is
+    split only at line starts, so a quoted note spanning several lines must
+    not have a line that starts with a digit.
+    '''
+    with open_csv(csv_file, binary=True) as csvFile:
+        first_line = 1
+        if start > 0:
+            # skip to the first line starting at or after start
+            first_line += count_newlines(csvFile, start - 1)
+            first_line += csvFile.readline().endswith(b'\n')
+        position = csvFile.tell()
+
+        def decoded_lines():
+            nonlocal position
+            for line in csvFile:
+                position += len(line)
+                yield line.decode()
+
+        csvReader = csv.reader(decoded_lines())
+        line_number = first_line
+        while stop is None or position < stop:
+            row = next(csvReader, None)
+            if row is None:
+                return
+            if row and row[0].isdigit():
+                yield line_number, row
+            line_number = first_line + csvReader.line_num
+
+
+def package_csv_ranges(package_csv, parts):
+    '''Return list of (start, stop) byte ranges splitting the package csv
+    into parts for read_package_rows; a gzipped csv is not split.'''
+    if parts <= 1 or is_gzipped(package_csv):
+        return [(0, None)]
+    size = os.path.getsize(package_csv)
+    bounds = [size * part // parts for part in range(parts)] + [None]
+    return list(zip(bounds, bounds[1:]))
 
 
 def read_package_csv(csv_file):
@@ -145,50 +328,50 @@ def read_package_csv(csv_file):
         - Mass (weight in kg)
         - Special Notes
             Note: The plural is a misnomor--only one special note is permitted
+    The csv may be gzipped.
     '''
-    csv_data = []
-    with open(csv_file) as csvFile:
-        csvReader = csv.reader(csvFile)
-        for row in csvReader:
-            if row[0].isdigit():
-                csv_data.append(row)
-    return csv_data
+    return [row for _, row in read_package_rows(csv_file)]
+
+
+def clean_package_row(row):
+    '''Clean one row of package data preliminarily to initializing a package
+    object.'''
+    # if deadline is 'EOD' or end of day, it can be ignored
+    if row[5] == 'EOD':
+        row[5] = None
+
+    # Distance addresses have the same standard for direction abbreviation
+    # so that the two sets of addresses are consistent and thus matchable
+    row[1] = abbreviate_directions(row[1])
+
+    # only the first eight columns have data
+    del row[8:]
 
 
 def clean_package_data(csv_data):
     '''Clean package data preliminarily to initializing package objects.'''
     for row in csv_data:
-        # if deadline is 'EOD' or end of day, it can be ignored
-        if row[5] == 'EOD':
-            row[5] = None
-
-        # Distance addresses have the same standard for direction abbreviation
-        # so that the two sets of addresses are consistent and thus matchable
-        row[1] = (row[1]
-                  .replace('South', 'S')
-                  .replace('North', 'N')
-                  .replace('East', 'E')
-                  .replace('West', 'W'))
-
-        # only the first eight columns have data
-        del row[8:]
+        clean_package_row(row)
 
 
 def validate_package_address_data(package_data, location_namedtuples):
     '''Validate all package address data matches a location address.'''
-    location_addresses = [loc[2] for loc in location_namedtuples]
+    Locations = as_location_index(location_namedtuples)
     for row in package_data:
-        package_address = f'{row[1]} {row[4]}'  # street address plus zip code
-        if package_address not in location_addresses:
+        if get_one_package_destination(row, Locations) is None:
             return False
     return True
 
 
 def get_one_package_destination(pkg_row, location_namedtuples):
-    '''Return the location named-tuple matching a package's destination.'''
+    '''Return the location named-tuple matching a package's destination.
+
+    Pass a LocationIndex (as load_data does) when calling this per package;
+    a plain list of Locations is indexed anew on every call.
+    '''
     package_address = f'{pkg_row[1]} {pkg_row[4]}'  # street address plus zip
-    location_addresses = [loc[2] for loc in location_namedtuples]
-    return location_namedtuples[location_addresses.index(package_address)]
+    return as_location_index(location_namedtuples).find_address(
+        package_address)
 
 
 def validate_package_deadline_times(package_data):
@@ -204,54 +387,236 @@ def validate_package_deadline_times(package_data):
     return True
 
 
-def populate_packages(package_data, location_namedtuples):
-    '''Return list of Package objects based on package data from the csv.'''
-    all_packages = []
-    for package_row in package_data:
-        destination = get_one_package_destination(package_row,
-                                                  location_namedtuples)
-        deadline = package_row[5]
-        if deadline is not None:
-            deadline = Time_Custom.make_time_from_string(package_row[5])
+def make_package(package_row, location_namedtuples, parsed_note=None):
+    '''Return Package object from one cleaned row of package data (and its
+    special note, if already parsed).'''
+    destination = get_one_package_destination(package_row,
+                                              location_namedtuples)
+    deadline = package_row[5]
+    if deadline is not None:
+        deadline = Time_Custom.make_time_from_string(package_row[5])
 
-        data_to_use = [package_row[0], deadline] + package_row[6:8]
-        new_package = Package(*data_to_use, destination)
-        all_packages.append(new_package)
-    return all_packages
+    data_to_use = [package_row[0], deadline] + package_row[6:8]
+    return Package(*data_to_use, destination, parsed_note)
 
 
-def load_data(distance_csv, package_csv):
-    '''Populate packages list, distances 2D list, Locations namedtuple list.
+def populate_packages(package_data, location_namedtuples):
+    '''Return list of Package objects based on package data from the csv.'''
+    location_namedtuples = as_location_index(location_namedtuples)
+    parsed_notes = parse_special_notes([row[7] for row in package_data])
+    return [make_package(package_row, location_namedtuples, parsed_note)
+            for package_row, parsed_note in zip(package_data, parsed_notes)]
+
+
+def prepare_package_row(line_number, row):
+    '''Return PreparedPackageRow: the row cleaned, with its deadline and
+    special note parsed, or with a message saying why it cannot become a
+    Package. This is all the work that does not need the Locations.'''
+    deadline = parsed_note = None
+    if len(row) < 8:
+        message = f'Expected 8 columns but found {len(row)}'
+    else:
+        clean_package_row(row)
+        message = None
+        try:
+            if row[5] is not None:
+                if not Time_Custom.is_valid_AM_PM_time(row[5]):
+                    raise ValueError(f'Deadline {row[5]} could not be parsed '
+                                     'as a valid AM/PM time')
+                deadline = Time_Custom.make_time_from_string(row[5])
+            parsed_note = parse_special_note_text(row[7])
+        except (PackageSpecialNote_ValueError, ValueError) as error:
+            message = str(error)
+    return PreparedPackageRow(line_number, row, deadline, parsed_note, message)
+
+
+def prepare_package_rows(package_csv, start=0, stop=None):
+    '''Return list of PreparedPackageRows for the package rows of the csv
+    (within a byte range, see read_package_rows). Run by load_data's
+    workers, so it must stay a module-level function.'''
+    rows = read_package_rows(package_csv, start, stop)
+    return [prepare_package_row(line_number, row)
+            for line_number, row in rows]
+
+
+def resolve_package_row(prepared, Locations):
+    '''Return Package from a PreparedPackageRow, finding its destination
+    among Locations, or PackageRowError if it cannot become a Package.'''
+    line_number, row, deadline, parsed_note, message = prepared
+    if message is None:
+        destination = get_one_package_destination(row, Locations)
+        if destination is not None:
+            return Package(row[0], deadline, row[6], row[7], destination,
+                           parsed_note)
+        message = (f'Address {row[1]} {row[4]} does not match any location '
+                   'from distances csv')
+    return PackageRowError(line_number, row, message)
+
+
+def stream_packages(package_csv, location_namedtuples):
+    '''Yield (Package, special note) for each package row of the csv, or
+    (PackageRowError, None) for a row that cannot become a Package, reading,
+    cleaning, validating and constructing one row at a time.
+
+    A PackageRowError holds the row's line number, the row and a message.
+    The csv may be gzipped; a bad row does not stop the rows after it.
+    '''
+    Locations = as_location_index(location_namedtuples)
+    for line_number, row in read_package_rows(package_csv):
+        result = resolve_package_row(prepare_package_row(line_number, row),
+                                     Locations)
+        yield result, (None if isinstance(result, PackageRowError) else row[7])
+
+
+def stream_package_chunks(package_csv, location_namedtuples,
+                          chunk_size=1000):
+    '''Yield PackageChunks of up to chunk_size rows of the package csv, so
+    that memory used by rows in flight is bounded by chunk_size however
+    large the file is (see stream_packages).
+
+    A PackageChunk holds the packages made from its rows, the special note
+    of each of those packages (Packages keep only the parsed note), and a
+    PackageRowError for each row that could not become a package.
+    '''
+    results = stream_packages(package_csv, location_namedtuples)
+    while True:
+        chunk = PackageChunk([], [], [])
+        for result, note in islice(results, chunk_size):
+            if isinstance(result, PackageRowError):
+                chunk.errors.append(result)
+            else:
+                chunk.packages.append(result)
+                chunk.notes.append(note)
+        if not (chunk.packages or chunk.errors):
+            return
+        yield chunk
+
+
+def describe_package_row_errors(errors, limit=10):
+    '''Return message listing (up to limit) package row errors by line.'''
+    lines = [f'\tline {error.line_number}: {error.message}'
+             for error in errors[:limit]]
+    if len(errors) > limit:
+        lines.append(f'\t... and {len(errors) - limit} more')
+    return '\n'.join([f'{len(errors)} package row(s) could not be loaded:']
+                      + lines)
+
+
+def load_data(distance_csv, package_csv, cache_path=None, parallel=None,
+              package_workers=1):
+    '''Populate packages list, distances matrix, Locations namedtuple list.
+
+    If cache_path is given, the data is read from the binary cache there if
+    it is up to date with both csv files (see cache module); otherwise it is
+    loaded from the csv files and then written to the cache for next time.
+
+    distance_csv may also be a distance file made by convert_distance_csv,
+    in which case distances is a MappedDistanceMatrix of that file.
 
     Data definition:
+    distances is a DistanceMatrix: use distances.dist(i, j) for the distance
+    between location numbers i and j (it also supports distances[i][j]).
     A Location is a namedtuple of location-number, landmark, street address.
+    Locations is returned as a LocationIndex: a list of Locations which can
+    also find a Location by address or landmark (used again by the cli).
+
+    Packages are streamed from the package csv (see stream_package_chunks);
+    if any rows are bad, PackageCsv_ValueError lists them by line number.
+
+    If parallel is 'threads' or 'processes', the package csv is instead
+    split into package_workers byte ranges (see package_csv_ranges) whose
+    rows are read, cleaned and parsed by a pool of that kind while the
+    distances are loaded here; their destinations are then found in
+    Locations here. Packages and errors come out in the same order as with
+    parallel=None. Processes only pay off for large csv files on a machine
+    with cores to spare, since each part's rows are pickled back.
     '''
     distances, Locations, packages = [], [], []
 
-    Location = namedtuple('Location', ['num', 'landmark', 'address'])
-
-    distances = read_distance_csv(distance_csv)
-
-    # Locations must be populated before clean_distance_data removes addresses
-    location_data = get_location_data(distances)
-    Locations = populate_locations(location_data, Location)
-    clean_distance_data(distances)
-    fill_distance_data(distances)
+    if parallel not in (None, 'threads', 'processes'):
+        raise ValueError(f"parallel must be None, 'threads' or 'processes', "
+                         f"not {parallel!r}")
+
+    if cache_path is not None:
+        cached = read_cache(cache_path, distance_csv, package_csv, Location)
+        if cached is not None:
+            return cached
+
+    pool = prepared_parts = None
+    if parallel is not None:
+        Executor = (ThreadPoolExecutor if parallel == 'threads' else
+                    ProcessPoolExecutor)
+        ranges = package_csv_ranges(package_csv, package_workers)
+        pool = Executor(max_workers=len(ranges))
+        prepared_parts = [pool.submit(prepare_package_rows, package_csv, *part)
+                          for part in ranges]
+
+    try:
+        distances, Locations = load_distances(distance_csv)
+        if prepared_parts is None:
+            package_notes, errors = [], []
+            for chunk in stream_package_chunks(package_csv, Locations):
+                packages += chunk.packages
+                if cache_path is not None:
+                    package_notes += chunk.notes
+                errors += chunk.errors
+        else:
+            packages, package_notes, errors = resolve_package_parts(
+                prepared_parts, Locations)
+    finally:
+        if pool is not None:
+            # parts not yet started are dropped if loading failed
+            for part in prepared_parts:
+                part.cancel()
+            pool.shutdown()
+
+    if errors:
+        raise PackageCsv_ValueError(describe_package_row_errors(errors))
+
+    if cache_path is not None:
+        write_cache(cache_path, distance_csv, package_csv, distances,
+                    Locations, packages, package_notes)
 
-    if not validate_distance_data(distances):
-        raise DistanceCsv_ValueError('One or more distance values are absent '
-                                     'or contradict other values in the file')
-
-    package_data = read_package_csv(package_csv)
-    clean_package_data(package_data)
-
-    if not validate_package_address_data(package_data, Locations):
-        raise PackageCsv_ValueError('One or more package addresses does not '
-                                    'match any location from distances csv')
-    if not validate_package_deadline_times(package_data):
-        raise PackageCsv_ValueError('One or more package deadlines could not '
-                                    'be parsed as a valid AM/PM time')
+    return distances, Locations, packages
 
-    packages = populate_packages(package_data, Locations)
 
-    return distances, Locations, packages
+def resolve_package_parts(prepared_parts, Locations):
+    '''Return (packages, special notes, PackageRowErrors) from futures of
+    lists of PreparedPackageRows, taken in order (see resolve_package_row).
+    '''
+    packages, package_notes, errors = [], [], []
+    for part in prepared_parts:
+        for prepared in part.result():
+            result = resolve_package_row(prepared, Locations)
+            if isinstance(result, PackageRowError):
+                errors.append(result)
+            else:
+                packages.append(result)
+                package_notes.append(prepared.row[7])
+    return packages, package_notes, errors
+
+
+def load_distances(distance_csv):
+    '''Return (distances, Locations) from distance csv or distance file;
+    see load_data.'''
+    if MappedDistanceMatrix.is_distance_file(distance_csv):
+        # already filled and validated by convert_distance_csv
+        distances = MappedDistanceMatrix(distance_csv)
+        Locations = LocationIndex(populate_locations(distances.locations,
+                                                     Location))
+    else:
+        distances = read_distance_csv(distance_csv)
+
+        # Locations must be populated before clean_distance_data removes
+        # addresses
+        location_data = get_location_data(distances)
+        Locations = LocationIndex(populate_locations(location_data, Location))
+        clean_distance_data(distances)
+        distances = fill_distance_data(distances)
+
+        if not validate_distance_data(distances):
+            raise DistanceCsv_ValueError('One or more distance values are '
+                                         'absent or contradict other values '
+                                         'in the file')
+
+    return distances, Locations
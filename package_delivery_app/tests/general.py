@@ -1,9 +1,64 @@
 from .specific_tests.algorithms_tests import test_algorithms
+from .specific_tests.cache_tests import test_cache
+from .specific_tests.distance_tests import test_distances
 from .specific_tests.hash_tests import test_hashes
+from .specific_tests.ingestion_tests import test_ingestion
+from .specific_tests.location_tests import test_locations
 from .specific_tests.regex_tests import test_regexes
+from .specific_tests.record_tests import test_records
+from .specific_tests.time_tests import test_times
+from .specific_tests.benchmark_tests import (benchmark_hash_lookups,
+                                             benchmark_hash_storage,
+                                             benchmark_hash_resizing,
+                                             benchmark_package_memory,
+                                             benchmark_distance_storage,
+                                             benchmark_distance_filling,
+                                             benchmark_mapped_distances,
+                                             benchmark_load_times,
+                                             benchmark_cache_startup,
+                                             benchmark_parallel_loading,
+                                             benchmark_special_notes,
+                                             benchmark_nearest_neighbors,
+                                             benchmark_route_building,
+                                             benchmark_route_improvement,
+                                             benchmark_window_sizes,
+                                             benchmark_parallel_windows,
+                                             benchmark_exact_routes,
+                                             benchmark_anytime_routes,
+                                             benchmark_delivery_groups,
+                                             benchmark_simulation)
 
 
 def test():
     test_algorithms()
+    test_cache()
+    test_distances()
     test_hashes()
+    test_ingestion()
+    test_locations()
     test_regexes()
+    test_records()
+    test_times()
+
+
+def benchmark():
+    benchmark_hash_lookups()
+    benchmark_hash_storage()
+    benchmark_hash_resizing()
+    benchmark_package_memory()
+    benchmark_distance_storage()
+    benchmark_distance_filling()
+    benchmark_mapped_distances()
+    benchmark_load_times()
+    benchmark_cache_startup()
+    benchmark_parallel_loading()
+    benchmark_special_notes()
+    benchmark_nearest_neighbors()
+    benchmark_route_building()
+    benchmark_route_improvement()
+    benchmark_window_sizes()
+    benchmark_parallel_windows()
+    benchmark_exact_routes()
+    benchmark_anytime_routes()
+    benchmark_delivery_groups()
+    benchmark_simulation()
@@ -1,5 +1,297 @@
+import sys
+from itertools import permutations
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from ...classes.hash import Hash
 from ...classes.package import *
+from ...classes.delivery_groups import DeliveryGroups
+from ...classes.distance_matrix import DistanceMatrix
+from ...classes.neighbor_index import NeighborIndex
+from ...classes.route_builder import RouteBuilder
+from ...classes.route_helpers import *
+from ...classes.travel_times import build_travel_time_matrix
+from ...classes.truck import Truck
+from ...load import load_data
+from ..synthetic_data import write_input_files
 
 
 def test_algorithms():
-    pass
+    # a hub (1) and three locations, laid out like load_data's distances
+    distances = [['', 1, 2, 3, 4],
+                 [1, 0.0, 3.0, 6.0, 9.0],
+                 [2, 3.0, 0.0, 3.0, 6.0],
+                 [3, 6.0, 3.0, 0.0, 3.0],
+                 [4, 9.0, 6.0, 3.0, 0.0]]
+    leave = Time_Custom(8, 0, 0)
+
+    # 1
+    # travel times are whole seconds, laid out like distances, and honour
+    # the speed function (here: twice as fast out of the hub)
+    travel_times = build_travel_time_matrix(
+        distances, lambda i, j: 36 if i == 1 else 18)
+    assert travel_times[0] == distances[0]
+    assert travel_times[1][2] == 300 and travel_times[2][1] == 600
+    assert travel_times[3][3] == 0
+
+    # 2
+    # meets_deadlines projects arrivals from the travel times
+    route = [(1, 0, []), (2, 3.0, []), (3, 3.0, []), (4, 3.0, [])]
+    assert meets_deadlines(route, travel_times, [(4, Time_Custom(8, 30, 0))],
+                           leave)
+    assert not meets_deadlines(route, travel_times,
+                               [(4, Time_Custom(8, 24, 59))], leave)
+
+    # 3
+    # a NeighborIndex finds the nearest eligible location, breaking ties in
+    # distance by location number, and (if rows are cut short) falls back
+    # to checking the eligible locations themselves
+    matrix = DistanceMatrix.from_rows(distances)
+    for neighbors in (NeighborIndex(matrix), NeighborIndex(matrix, 2)):
+        assert neighbors.nearest(2, {1, 3, 4}) == (1, 3.0)
+        assert neighbors.nearest(2, {3, 4}) == (3, 3.0)
+        assert neighbors.nearest(1, {4}) == (4, 9.0)
+        assert neighbors.nearest(3, {3, 4}) == (3, 0.0)
+        assert neighbors.nearest(3, set()) is None
+    assert list(NeighborIndex(matrix).sorted_row(3)) == [3, 2, 4, 1]
+    assert list(NeighborIndex(matrix, 2).sorted_row(3)) == [3, 2]
+
+    # 4
+    # 2-opt / Or-opt local search and the exact solver untangle a route,
+    # meet deadlines (even if the route passed in misses them), and raise
+    # if they can't be met
+    Stop = RouteBuilder.Stop
+    times = build_travel_time_matrix(distances, lambda i, j: 18)
+    by_8_10 = [(2, Time_Custom(8, 10, 0))]
+    improvers = [
+        lambda *args: local_search_route(*args, 'first'),
+        lambda *args: local_search_route(*args, 'best'),
+        exact_route]
+    for improver in improvers:
+        tangled = [Stop(1, 0, []), Stop(3, 6.0, []), Stop(2, 3.0, []),
+                   Stop(4, 6.0, []), Stop(1, 9.0, [])]
+        untangled = improver(tangled, matrix, [], times, leave, Stop)
+        assert sum(stop.dist for stop in untangled) == 18.0
+        assert untangled[0] == tangled[0] and untangled[-1].loc == 1
+
+        late = [Stop(1, 0, []), Stop(4, 9.0, []), Stop(3, 3.0, []),
+                Stop(2, 3.0, []), Stop(1, 3.0, [])]
+        on_time = improver(late, matrix, by_8_10, times, leave, Stop)
+        assert [stop.loc for stop in on_time] == [1, 2, 3, 4, 1]
+        assert [stop.dist for stop in on_time] == [0, 3.0, 3.0, 3.0, 9.0]
+        assert isinstance(on_time[1], Stop)
+
+        try:
+            improver(late, matrix, [(4, Time_Custom(8, 5, 0))], times,
+                     leave, Stop)
+            raise AssertionError('expected an ImproveRoute_Min_ValueError')
+        except ImproveRoute_Min_ValueError:
+            pass
+    # annealing, too, though ties between equally short routes may go
+    # either way
+    on_time = anneal_route(late, matrix, by_8_10, times, leave, Stop, 1000,
+                           seed=0, max_moves=2000)
+    assert sum(stop.dist for stop in on_time) == 18.0
+    assert meets_deadlines(on_time, times, by_8_10, leave)
+
+    # 5
+    # the exact solver's routes are as short as the shortest permutation
+    # which meets deadlines
+    with TemporaryDirectory() as directory:
+        larger, _, _ = load_data(*write_input_files(directory, 12, 1))
+    times = build_travel_time_matrix(larger, lambda i, j: 18)
+    route = update_subroute_distances(
+        [Stop(loc_num, 0, []) for loc_num in (1, 9, 4, 11, 6, 2, 12, 7, 1)],
+        larger)
+    for deadlines in ([], [(12, Time_Custom(8, 30, 0)),
+                           (6, Time_Custom(9, 0, 0))]):
+        shortest = min(
+            sum(stop[1] for stop in candidate) for candidate in (
+                update_subroute_distances([route[0], *ordering, route[-1]],
+                                          larger)
+                for ordering in permutations(route[1:-1]))
+            if meets_deadlines(candidate, times, deadlines, leave))
+        exact = exact_route(route, larger, deadlines, times, leave, Stop)
+        assert abs(sum(stop.dist for stop in exact) - shortest) < 1e-9
+        assert meets_deadlines(exact, times, deadlines, leave)
+    # even where a shorter way to a stop gets there later (here, because
+    # speeds differ by road), and only the longer way meets a deadline
+    speeds = {(1, 6): 40, (1, 10): 40, (1, 12): 40, (2, 6): 10, (2, 10): 10,
+              (5, 6): 10, (5, 10): 10, (10, 12): 10, (2, 5): 40, (2, 7): 40,
+              (5, 7): 40, (6, 7): 40, (6, 10): 40, (6, 12): 40, (7, 10): 40,
+              (1, 2): 25, (2, 12): 25, (5, 12): 25}
+    times = build_travel_time_matrix(
+        larger, lambda i, j: speeds.get((min(i, j), max(i, j)), 18))
+    route = update_subroute_distances(
+        [Stop(loc_num, 0, []) for loc_num in (1, 6, 5, 12, 7, 2, 10, 1)],
+        larger)
+    deadlines = [(5, leave.plus_seconds(3917)),
+                 (12, leave.plus_seconds(1678)),
+                 (6, leave.plus_seconds(1513))]
+    shortest = min(
+        sum(stop[1] for stop in candidate) for candidate in (
+            update_subroute_distances([route[0], *ordering, route[-1]],
+                                      larger)
+            for ordering in permutations(route[1:-1]))
+        if meets_deadlines(candidate, times, deadlines, leave))
+    exact = exact_route(route, larger, deadlines, times, leave, Stop)
+    assert abs(sum(stop.dist for stop in exact) - shortest) < 1e-9
+
+    # 6
+    # RouteBuilder's incrementally kept route state matches its route
+    with TemporaryDirectory() as directory:
+        distances, Locations, packages = load_data(
+            *write_input_files(directory, 40, 200))
+    ready = [pkg for pkg in packages if not pkg.special_note.truck_number]
+    for improvement in RouteBuilder.improvements:
+        builder = RouteBuilder(Hash(
+            ['available_packages', ready],
+            ['distances', distances],
+            ['max_load', 40],
+            ['truck_number', 1],
+            ['Locations', Locations],
+            ['speed_function', Truck.speed_function],
+            ['starting_location', 1],
+            ['leaving_hub_at', Time_Custom(9, 0, 0)]))
+        route = builder.build_route(improvement)
+        loaded = builder.get_packages()
+        assert builder.loaded == set(loaded)
+        assert builder.load_count == len(loaded) <= 40
+        assert builder.visited == set(stop.loc.num for stop in route)
+        assert (set(builder.packages_left()) ==
+                set(builder.ready_pkgs) - set(loaded))
+        assert builder.unvisited_stops_with_packages() == sorted(set(
+            pkg.location.num for pkg in builder.packages_left()
+            if pkg.location.num not in builder.visited))
+
+    # 7
+    # improve_route checks deadlines from each segment's start onward only,
+    # yet never returns a route that misses one
+    times = build_travel_time_matrix(larger, lambda i, j: 18)
+    route = update_subroute_distances(
+        [Stop(loc_num, 0, []) for loc_num in (1, 9, 4, 11, 6, 2, 12, 7, 3,
+                                              10, 1)], larger)
+    arrivals = arrival_seconds(route, times)
+    assert arrivals[0] == 0 and arrivals[2] == arrivals[1] + times[9][4]
+    deadlines = [(stop[0], leave.plus_seconds(seconds)) for stop, seconds
+                 in zip(route[2:-1:2], arrivals[2:-1:2])]
+    assert deadline_seconds(deadlines + [(4, leave)], leave)[4] == 0
+    improved = improve_route(route, larger, deadlines, times, leave, Stop)
+    assert meets_deadlines(improved, times, deadlines, leave)
+    assert (sum(stop.dist for stop in improved) <=
+            sum(stop[1] for stop in route))
+    # a window as long as the route finds the shortest route outright
+    whole = improve_route(route, larger, deadlines, times, leave, Stop,
+                          len(route))
+    exact = exact_route(route, larger, deadlines, times, leave, Stop)
+    assert abs(sum(stop.dist for stop in whole) -
+               sum(stop.dist for stop in exact)) < 1e-9
+    # and a WindowPool's processes find just what improve_route finds alone
+    with WindowPool(larger, workers=2, min_stops=2) as pool:
+        assert improve_route(route, larger, deadlines, times, leave, Stop, 9,
+                             pool) == improve_route(route, larger, deadlines,
+                                                    times, leave, Stop, 9)
+        assert pool.executor is not None
+    assert pool.executor is None and pool.shared is None
+    # without shared memory (before Python 3.8), windows are searched here
+    shared_memory = sys.modules.get('multiprocessing.shared_memory')
+    sys.modules['multiprocessing.shared_memory'] = None  # fails to import
+    try:
+        with WindowPool(larger, workers=2, min_stops=2) as pool:
+            assert pool.executor is None and pool.shared is None
+            assert improve_route(route, larger, deadlines, times, leave,
+                                 Stop, 9, pool) == improve_route(
+                route, larger, deadlines, times, leave, Stop, 9)
+    finally:
+        if shared_memory is None:
+            del sys.modules['multiprocessing.shared_memory']
+        else:
+            sys.modules['multiprocessing.shared_memory'] = shared_memory
+    try:
+        improve_route(route, larger, [(12, leave)], times, leave, Stop)
+        raise AssertionError('expected an ImproveRoute_Min_ValueError')
+    except ImproveRoute_Min_ValueError:
+        pass
+
+    # 8
+    # annealing returns the best route found that meets deadlines, never a
+    # longer one than it was given; a run of max_moves moves with a given
+    # seed makes the same route every time
+    runs = [anneal_route(route, larger, deadlines, times, leave, Stop, 10000,
+                         seed=5, max_moves=3000) for _ in range(2)]
+    assert runs[0] == runs[1]
+    assert meets_deadlines(runs[0], times, deadlines, leave)
+    assert (sum(stop.dist for stop in runs[0]) <=
+            sum(stop[1] for stop in route))
+    assert runs[0][0] == route[0] and runs[0][-1].loc == 1
+    try:
+        anneal_route(route, larger, [(12, leave)], times, leave, Stop, 50,
+                     seed=5)
+        raise AssertionError('expected an ImproveRoute_Min_ValueError')
+    except ImproveRoute_Min_ValueError:
+        pass
+    # and build_route, given a time budget, returns within about that time
+    builder = RouteBuilder(Hash(
+        ['available_packages', ready],
+        ['distances', distances],
+        ['max_load', 40],
+        ['truck_number', 1],
+        ['Locations', Locations],
+        ['speed_function', Truck.speed_function],
+        ['starting_location', 1],
+        ['leaving_hub_at', Time_Custom(9, 0, 0)]))
+    started = perf_counter()
+    route = builder.build_route(max_ms=100, seed=1)
+    assert perf_counter() - started < 1.0
+    assert builder.visited == set(stop.loc.num for stop in route)
+    # and given a number of moves instead, the same route for the same seed
+    routes = []
+    for _ in range(2):
+        builder = RouteBuilder(Hash(
+            ['available_packages', ready],
+            ['distances', distances],
+            ['max_load', 40],
+            ['truck_number', 1],
+            ['Locations', Locations],
+            ['speed_function', Truck.speed_function],
+            ['starting_location', 1],
+            ['leaving_hub_at', Time_Custom(9, 0, 0)]))
+        routes.append(builder.build_route(seed=1, max_moves=3000))
+    assert routes[0] == routes[1]
+
+    # 9
+    # DeliveryGroups joins packages noted to be delivered together, and
+    # groups sharing a package (here 13, 15, 19, 20 by way of 15 and 19;
+    # 30 names 31, which is not a package), and RouteBuilder keeps groups
+    # whole when it can
+    notes = {13: '', 14: 'Must be delivered with 15, 19',
+             16: 'Must be delivered with 13, 19', 20: 'Must be delivered '
+             'with 13, 15', 21: '', 30: 'Must be delivered with 31'}
+    grouped = [Package(ID, None, '5', note, Locations[ID % 40])
+               for ID, note in notes.items()]
+    groups = DeliveryGroups(grouped)
+    assert groups.group_of(19) == [13, 14, 15, 16, 19, 20]
+    assert groups.find(13) == groups.find(20) != groups.find(30)
+    assert groups.group_of(31) == [30, 31]
+    assert groups.group_of(21) is None and groups.find(21) == 21
+    assert ([[pkg.ID for pkg in group] for group
+             in groups.ready_groups(grouped).values()] ==
+            [[13, 14, 16, 20], [30]])
+
+    builder = RouteBuilder(Hash(
+        ['available_packages', grouped],
+        ['distances', distances],
+        ['max_load', 16],
+        ['truck_number', 1],
+        ['Locations', Locations],
+        ['speed_function', Truck.speed_function],
+        ['delivery_groups', groups],
+        ['starting_location', 1],
+        ['leaving_hub_at', Time_Custom(9, 0, 0)]))
+    assert ([[pkg.ID for pkg in group] for group
+             in builder.grouped_deliver_with_constraints()] ==
+            [[30], [13, 14, 16, 20]])
+    assert (sorted(pkg.ID for pkg in builder.forbid_partial_deliver_groups(
+                grouped[:2])) == [13, 14, 16, 20])
+    builder.max_load = 3
+    assert ([pkg.ID for pkg in builder.forbid_partial_deliver_groups(
+                grouped[:2])] == [])
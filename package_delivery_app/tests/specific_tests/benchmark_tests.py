@@ -0,0 +1,759 @@
+import os
+import random
+import tracemalloc
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from timeit import timeit
+from ...classes.hash import *
+from ...classes.distance_matrix import DistanceMatrix, MappedDistanceMatrix
+from ...classes.neighbor_index import NeighborIndex
+from ...classes.package import *
+from ...load import (load_data, read_distance_csv, clean_distance_data,
+                     fill_distance_data, validate_distance_data,
+                     convert_distance_csv, numpy)
+from ..synthetic_data import write_input_files
+
+
+class LegacyHash():
+    '''The original Hash engine (exponentiation-based _hash, chained lists
+    of key-value lists), trimmed to what the benchmarks below need. It is
+    kept only so that the current engine has something to be measured
+    against.'''
+
+    def __init__(self, *args):
+        self._hash_size = 50
+        self._props = [None] * self._hash_size
+        self._count = 0
+
+        for arg in args:
+            if isinstance(arg, (list, tuple)) and len(arg) == 2:
+                self[arg[0]] = arg[1]
+            else:
+                self[arg] = None
+
+    def _hash(self, key_string, str_size_min=10):
+        '''Hash a key and return index.'''
+        padded = key_string.rjust(str_size_min, key_string[0])
+        return sum([(ord(ch)) ** ((idx % 30) + 5) + 43
+                   for idx, ch in enumerate(padded)]
+                   ) % self._hash_size
+
+    def __getitem__(self, key_string):
+        prop = self._props[self._hash(key_string)]
+        if prop is None:
+            raise KeyError(key_string)
+        if isinstance(prop[0], list):
+            for sub_list in prop:
+                if sub_list[0] == key_string:
+                    return sub_list[1]
+            raise KeyError(key_string)
+        if prop[0] == key_string:
+            return prop[1]
+        raise KeyError(key_string)
+
+    def __setitem__(self, key_string, value):
+        index = self._hash(key_string)
+        prop = self._props[index]
+        if prop is None:
+            self._props[index] = [key_string, value]
+            self._count += 1
+        elif isinstance(prop[0], list):
+            for sub_list in prop:
+                if sub_list[0] == key_string:
+                    sub_list[1] = value
+            self._props[index].append([key_string, value])
+            self._count += 1
+        elif prop[0] == key_string:
+            prop[1] = value
+        else:
+            self._props[index] = [prop, [key_string, value]]
+            self._count += 1
+
+        if self._count / self._hash_size >= 0.6:
+            old = [pair for prop in self._props if prop is not None
+                   for pair in (prop if isinstance(prop[0], list)
+                                else [prop])]
+            self._hash_size *= 2
+            self._props = [None] * self._hash_size
+            self._count = 0
+            for key_string, value in old:
+                self[key_string] = value
+
+
+def time_lookups(hash_class, keys, repeat):
+    '''Return seconds taken to look up every key in keys, repeat times.'''
+    table = hash_class(*[[key, index] for index, key in enumerate(keys)])
+
+    def lookup_all():
+        for key in keys:
+            table[key]
+
+    return timeit(lookup_all, number=repeat)
+
+
+def benchmark_hash_lookups(repeat=2000):
+    '''Compare lookup throughput of the current and the legacy Hash engines,
+    using the keys of a Package's props as the workload.'''
+    keys = ['ID', 'deadline', 'weight', 'location', 'special_note', 'state',
+            'history', 'truck_number', 'deliver_with', 'late_arrival',
+            'wrong_destination']
+    lookups = len(keys) * repeat
+
+    print('Hash lookups per second:')
+    for hash_class in (LegacyHash, Hash):
+        seconds = time_lookups(hash_class, keys, repeat)
+        print(f'\t{hash_class.__name__:<12}{lookups / seconds:>14,.0f}')
+
+
+def time_inserts(hash_class, keys):
+    '''Return seconds taken to insert every key in keys into a new table.'''
+    def insert_all():
+        table = hash_class()
+        for index, key in enumerate(keys):
+            table[key] = index
+
+    return timeit(insert_all, number=1)
+
+
+def traced_bytes(build):
+    '''Return bytes still allocated by whatever build() returns.'''
+    tracemalloc.start()
+    kept = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def benchmark_hash_storage(large_size=20000, small_count=2000):
+    '''Compare the chained (legacy) and open-addressing (current) storage:
+    insert and lookup throughput on one large table, and memory held by
+    one large table and by many Package-sized (7-key) tables.'''
+    keys = [f'package-{n}' for n in range(large_size)]
+    small_keys = ['ID', 'deadline', 'weight', 'location', 'special_note',
+                  'state', 'history']
+
+    print(f'Hash storage, {large_size:,} keys / {small_count:,} small tables:')
+    for hash_class in (LegacyHash, Hash):
+        insert_seconds = time_inserts(hash_class, keys)
+        lookup_seconds = time_lookups(hash_class, keys, 1)
+        large_bytes = traced_bytes(lambda: hash_class(*keys))
+        small_bytes = traced_bytes(lambda: [hash_class(*small_keys)
+                                            for _ in range(small_count)])
+        print(f'\t{hash_class.__name__:<12}'
+              f'inserts/s {large_size / insert_seconds:>11,.0f}   '
+              f'lookups/s {large_size / lookup_seconds:>11,.0f}   '
+              f'large {large_bytes / 1024:>8,.0f} KiB   '
+              f'small {small_bytes / small_count:>6,.0f} B each')
+
+
+def slowest_insert(table, keys):
+    '''Return seconds taken by the slowest single insert of keys.'''
+    slowest = 0
+    for index, key in enumerate(keys):
+        start = perf_counter()
+        table[key] = index
+        slowest = max(slowest, perf_counter() - start)
+    return slowest
+
+
+def benchmark_hash_resizing(size=200000):
+    '''Compare the worst-case latency of a single insert while filling a
+    Hash that starts small, rehashing all at once or incrementally, and
+    one that was presized with with_capacity.'''
+    keys = [f'package-{n}' for n in range(size)]
+    tables = (('all at once', Hash()),
+              ('incremental', Hash.with_capacity(0, incremental=True)),
+              ('presized', Hash.with_capacity(size)))
+
+    print(f'Slowest single insert while inserting {size:,} keys:')
+    for name, table in tables:
+        print(f'\t{name:<12}{1000 * slowest_insert(table, keys):>8.2f} ms')
+
+
+def benchmark_package_memory(sizes=(1000, 10000, 100000),
+                             number_of_locations=100):
+    '''Report memory held after loading N packages, and the peak while
+    loading them, measured with tracemalloc.'''
+    print('Memory used by load_data:')
+    with TemporaryDirectory() as directory:
+        for size in sizes:
+            distance_csv, package_csv = write_input_files(
+                directory, number_of_locations, size)
+
+            tracemalloc.start()
+            loaded = load_data(distance_csv, package_csv)
+            held, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del loaded
+
+            print(f'\t{size:>9,} packages: held {held / 2**20:>8.1f} MiB '
+                  f'({held / size:>6,.0f} B per package), '
+                  f'peak {peak / 2**20:>8.1f} MiB')
+
+
+def benchmark_distance_storage(sizes=(100, 1000, 2000)):
+    '''Compare memory held by distances stored as a 2D list of floats (as
+    load_data used to return them) and as a DistanceMatrix, and time the
+    cleaning and filling of a distance csv into a DistanceMatrix.'''
+    print('Distances between N locations:')
+    with TemporaryDirectory() as directory:
+        for size in sizes:
+            distance_csv, _ = write_input_files(directory, size, 1)
+            csv_data = read_distance_csv(distance_csv)
+
+            start = perf_counter()
+            clean_distance_data(csv_data)
+            distances = fill_distance_data(csv_data)
+            seconds = perf_counter() - start
+
+            list_bytes = traced_bytes(lambda: [list(row) for row in distances])
+            matrix_bytes = traced_bytes(
+                lambda: DistanceMatrix(size, data=distances._data[:]))
+            print(f'\t{size:>6,} locations: 2D list '
+                  f'{list_bytes / 2**20:>8.1f} MiB, DistanceMatrix '
+                  f'{matrix_bytes / 2**20:>8.1f} MiB, '
+                  f'clean + fill {seconds:>6.2f} s')
+
+
+def benchmark_distance_filling(sizes=(1000, 5000, 10000)):
+    '''Time filling and validating cleaned distance data in pure Python
+    and, if NumPy is installed, with NumPy.'''
+    paths = (False, True) if numpy is not None else (False,)
+    print('fill_distance_data + validate_distance_data:')
+    with TemporaryDirectory() as directory:
+        for size in sizes:
+            distance_csv, _ = write_input_files(directory, size, 1)
+            csv_data = read_distance_csv(distance_csv)
+            clean_distance_data(csv_data)
+            os.remove(distance_csv)
+
+            for use_numpy in paths:
+                start = perf_counter()
+                distances = fill_distance_data(csv_data, use_numpy)
+                assert validate_distance_data(distances, use_numpy)
+                seconds = perf_counter() - start
+                del distances
+                print(f'\t{size:>6,} locations, '
+                      f'{"NumPy" if use_numpy else "pure Python":<12}'
+                      f'{seconds:>7.2f} s')
+            del csv_data
+
+
+def resident_bytes():
+    '''Return resident memory of this process, or 0 where unavailable.'''
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def benchmark_mapped_distances(sizes=(1000, 3000), rows_touched=50):
+    '''Convert distance csv files to distance files, then compare the size
+    of a distance file with the memory it takes (resident memory as
+    reported by /proc, on Linux) once memory-mapped and scanned a few rows,
+    and with what a DistanceMatrix holds in memory.'''
+    print(f'Distance files, {rows_touched} rows scanned:')
+    with TemporaryDirectory() as directory:
+        for size in sizes:
+            distance_csv, _ = write_input_files(directory, size, 1)
+            distance_file = f'{directory}/distances_{size}.bin'
+            start = perf_counter()
+            convert_distance_csv(distance_csv, distance_file).close()
+            seconds = perf_counter() - start
+
+            before = resident_bytes()
+            distances = MappedDistanceMatrix(distance_file)
+            for i in range(1, size + 1, size // rows_touched):
+                min(distances.row(i)[1:])
+            mapped_bytes = resident_bytes() - before
+            in_memory_bytes = 8 * len(distances.triangle())
+            distances.close()
+
+            print(f'\t{size:>6,} locations: converted in {seconds:>5.2f} s, '
+                  f'file {os.path.getsize(distance_file) / 2**20:>6.1f} MiB, '
+                  f'mapped +{mapped_bytes / 2**20:>5.1f} MiB resident, '
+                  f'DistanceMatrix {in_memory_bytes / 2**20:>5.1f} MiB')
+
+
+def benchmark_load_times(sizes=((100, 10000), (200, 20000), (1000, 20000),
+                                (1000, 50000))):
+    '''Time load_data at growing numbers of locations and packages; with
+    addresses looked up in a LocationIndex, it should grow about linearly
+    with packages and with the size of the distance table.'''
+    print('load_data on synthetic csv files:')
+    with TemporaryDirectory() as directory:
+        for number_of_locations, number_of_packages in sizes:
+            distance_csv, package_csv = write_input_files(
+                directory, number_of_locations, number_of_packages)
+
+            start = perf_counter()
+            load_data(distance_csv, package_csv)
+            seconds = perf_counter() - start
+            print(f'\t{number_of_locations:>6,} locations, '
+                  f'{number_of_packages:>7,} packages: {seconds:>6.2f} s')
+
+
+def benchmark_cache_startup(sizes=((100, 10000), (1000, 20000),
+                                   (1000, 50000))):
+    '''Time load_data without a cache, on a cold start that also writes
+    the cache, and on a warm start that reads it back.'''
+    print('load_data startup, csv only / cold cache / warm cache:')
+    with TemporaryDirectory() as directory:
+        for number_of_locations, number_of_packages in sizes:
+            distance_csv, package_csv = write_input_files(
+                directory, number_of_locations, number_of_packages)
+            cache_path = f'{directory}/inputs.cache'
+
+            timings = []
+            for use_cache in (None, cache_path, cache_path):
+                start = perf_counter()
+                load_data(distance_csv, package_csv, use_cache)
+                timings.append(perf_counter() - start)
+            os.remove(cache_path)
+
+            print(f'\t{number_of_locations:>6,} locations, '
+                  f'{number_of_packages:>7,} packages: '
+                  + ' / '.join(f'{seconds:>5.2f} s' for seconds in timings))
+
+
+def benchmark_parallel_loading(sizes=((1000, 50000), (2000, 100000)),
+                               workers=os.cpu_count() or 1):
+    '''Time load_data sequentially and with the package csv read by a pool
+    of threads or of processes while the distances load; only processes
+    can overlap the two, and only given spare cores.'''
+    print(f'load_data, sequential / threads / processes ({workers} '
+          'package workers):')
+    with TemporaryDirectory() as directory:
+        for number_of_locations, number_of_packages in sizes:
+            distance_csv, package_csv = write_input_files(
+                directory, number_of_locations, number_of_packages)
+
+            timings = []
+            for parallel in (None, 'threads', 'processes'):
+                start = perf_counter()
+                load_data(distance_csv, package_csv, parallel=parallel,
+                          package_workers=workers)
+                timings.append(perf_counter() - start)
+
+            print(f'\t{number_of_locations:>6,} locations, '
+                  f'{number_of_packages:>7,} packages: '
+                  + ' / '.join(f'{seconds:>5.2f} s' for seconds in timings))
+
+
+def legacy_parse_special_note(special_note):
+    '''The original special-note parser (four separate regex searches, then
+    another scan to extract), kept only to measure the current one against.'''
+    truck_number_constraint = truck_regex_match(special_note)
+    co_delivery_constraint = delivery_regex_match(special_note)
+    late_arrival_constraint = arrival_regex_match(special_note)
+    wrong_destination_constraint = destination_regex_match(special_note)
+
+    if truck_number_constraint:
+        integers_found = [int(num) for num in filter(str.isdigit,
+                                                     special_note)]
+        return 'truck_number', integers_found[0]
+    if co_delivery_constraint:
+        return 'deliver_with', get_packages_to_deliver_with(special_note)
+    if late_arrival_constraint:
+        if not Time_Custom.is_valid_AM_PM_time(special_note):
+            raise PackageSpecialNote_ValueError(
+                'Time-like value not parseable as an AM/PM time')
+        return 'late_arrival', Time_Custom.make_time_from_string(special_note)
+    if wrong_destination_constraint:
+        return 'wrong_destination', True
+    return None
+
+
+def benchmark_special_notes(size=100000):
+    '''Time parsing a column of special notes (mostly empty, the rest a
+    few repeated notes, as in real package files) with the original
+    parser, the combined regex uncached, cached, and as a batch.'''
+    repeated = ['Can only be on truck 2', 'Must be delivered with 13, 15, 19',
+                'Delayed on flight---will not arrive to depot until 9:05 am',
+                'Wrong address listed']
+    notes = [repeated[n % 4] if n % 5 == 0 else '' for n in range(size)]
+    uncached = parse_special_note_text.__wrapped__
+
+    def cached():
+        parse_special_note_text.cache_clear()
+        return [parse_special_note_text(note) for note in notes]
+
+    print(f'Parsing {size:,} special notes:')
+    for name, parse_all in (
+            ('original', lambda: [legacy_parse_special_note(note)
+                                  for note in notes]),
+            ('one regex', lambda: [uncached(note) for note in notes]),
+            ('cached', cached),
+            ('batch', lambda: parse_special_notes(notes))):
+        print(f'\t{name:<12}{timeit(parse_all, number=1):>7.3f} s')
+
+
+def legacy_nearest(distances, location_num, eligible_location_nums):
+    '''The original RouteBuilder.find_nearest scan: the whole distance row,
+    with membership checked in a list.'''
+    return min([(loc_num, dist) for loc_num, dist
+                in enumerate(distances.row(location_num))
+                if loc_num in eligible_location_nums],
+               key=lambda neighbor: neighbor[1])
+
+
+def nearest_neighbor_tour(distances, nearest):
+    '''Return a nearest-neighbor tour of all locations from the hub, where
+    nearest(location number, unvisited location numbers) gives the next.'''
+    tour = [1]
+    unvisited = list(range(2, distances.size + 1))
+    while unvisited:
+        tour.append(nearest(tour[-1], unvisited)[0])
+        unvisited.remove(tour[-1])
+    return tour
+
+
+def benchmark_nearest_neighbors(sizes=(100, 300, 1000, 3000),
+                                legacy_limit=300):
+    '''Time a nearest-neighbor tour of every location, finding each next
+    stop by the original row scan (up to legacy_limit locations, as it is
+    cubic) and with a NeighborIndex queried with a set.'''
+    print('Nearest-neighbor tour of N locations, row scan / NeighborIndex:')
+    with TemporaryDirectory() as directory:
+        for size in sizes:
+            distance_csv, package_csv = write_input_files(directory, size, 1)
+            distances, _, _ = load_data(distance_csv, package_csv)
+
+            legacy = '     -    '
+            if size <= legacy_limit:
+                start = perf_counter()
+                expected = nearest_neighbor_tour(
+                    distances, lambda loc_num, unvisited: legacy_nearest(
+                        distances, loc_num, unvisited))
+                legacy = f'{perf_counter() - start:>7.2f} s'
+
+            start = perf_counter()
+            neighbors = NeighborIndex(distances)
+            tour = nearest_neighbor_tour(
+                distances, lambda loc_num, unvisited: neighbors.nearest(
+                    loc_num, set(unvisited)))
+            seconds = perf_counter() - start
+            assert size > legacy_limit or tour == expected
+            print(f'\t{size:>6,} locations: {legacy} / {seconds:>7.2f} s')
+
+
+def benchmark_route_building(sizes=(50, 500, 2000, 5000),
+                             max_loads=(16, 200), number_of_locations=1000):
+    '''Time RouteBuilder.build_route for one 8 AM truck as the number of
+    packages ready at the hub grows, at the real truck capacity and at a
+    larger one (which makes the stop-adding loops run longer). Packages
+    with deadlines are left out, as a large load of them cannot all be
+    delivered in time.'''
+    from ...classes.route_builder import RouteBuilder
+    from ...classes.truck import Truck
+    from ...load import build_travel_time_matrix
+
+    print('build_route for N ready packages, max load '
+          + ' / '.join(map(str, max_loads)) + ':')
+    with TemporaryDirectory() as directory:
+        distance_csv, package_csv = write_input_files(
+            directory, number_of_locations, max(sizes))
+        distances, Locations, packages = load_data(distance_csv, package_csv)
+        travel_times = build_travel_time_matrix(distances,
+                                                Truck.speed_function)
+        neighbors = NeighborIndex(distances)
+        Truck.id_counter = 1
+        ready = [pkg for pkg in Truck().get_available_packages(packages, [])
+                 if pkg.deadline is None]
+
+        for size in sizes:
+            timings = []
+            for max_load in max_loads:
+                route_parameters = Hash(
+                    ['available_packages', ready[:size]],
+                    ['distances', distances],
+                    ['max_load', max_load],
+                    ['truck_number', 1],
+                    ['Locations', Locations],
+                    ['speed_function', Truck.speed_function],
+                    ['travel_times', travel_times],
+                    ['neighbors', neighbors],
+                    ['starting_location', Truck.starting_location],
+                    ['leaving_hub_at', Truck.first_delivery_time])
+                start = perf_counter()
+                RouteBuilder(route_parameters).build_route()
+                timings.append(perf_counter() - start)
+            print(f'\t{size:>6,} packages: '
+                  + ' / '.join(f'{seconds:>6.3f} s' for seconds in timings))
+
+
+def random_route(distances, size, seed=0):
+    '''Return a route (list of RouteBuilder Stops) from the hub through size
+    locations picked at random, in random order, and back.'''
+    from ...classes.route_builder import RouteBuilder
+    from ...classes.route_helpers import update_subroute_distances
+
+    loc_nums = random.Random(seed).sample(range(2, distances.size + 1), size)
+    route = update_subroute_distances(
+        [RouteBuilder.Stop(loc_num, 0, []) for loc_num in [1, *loc_nums, 1]],
+        distances)
+    return [RouteBuilder.Stop(*stop) for stop in route]
+
+
+def benchmark_route_improvement(sizes=(16, 50, 200, 800), best_limit=200,
+                                number_of_locations=1000):
+    '''Time and compare route lengths after improving random routes by
+    windows of 7 (improve_route) and by first- and best-improvement 2-opt
+    and Or-opt (local_search_route, best only up to best_limit stops).'''
+    from ...classes.route_builder import RouteBuilder
+    from ...classes.route_helpers import improve_route, local_search_route
+    from ...classes.truck import Truck
+    from ...load import build_travel_time_matrix
+
+    print('Improving a random route of N stops, window / first / best:')
+    with TemporaryDirectory() as directory:
+        distances, _, _ = load_data(
+            *write_input_files(directory, number_of_locations, 1))
+    travel_times = build_travel_time_matrix(distances, Truck.speed_function)
+    neighbors = NeighborIndex(distances)
+    leave = Truck.first_delivery_time
+
+    for size in sizes:
+        route = random_route(distances, size)
+        results = []
+        for improvement in ('window', 'first', 'best'):
+            if improvement == 'best' and size > best_limit:
+                results.append('        -        ')
+                continue
+            start = perf_counter()
+            if improvement == 'window':
+                improved = improve_route(route, distances, [], travel_times,
+                                         leave, RouteBuilder.Stop)
+            else:
+                improved = local_search_route(
+                    route, distances, [], travel_times, leave,
+                    RouteBuilder.Stop, improvement, neighbors)
+            seconds = perf_counter() - start
+            miles = sum(stop.dist for stop in improved)
+            results.append(f'{miles:>7,.0f} mi {seconds:>5.2f} s')
+        miles = sum(stop.dist for stop in route)
+        print(f'\t{size:>5,} stops ({miles:>7,.0f} mi): '
+              + ' / '.join(results))
+
+
+def benchmark_window_sizes(window_sizes=(7, 8, 9, 10, 11), size=60,
+                           number_of_locations=1000):
+    '''Time improve_route on a random route at growing window sizes; the
+    branch-and-bound search keeps 10 or 11 near the cost of 7.'''
+    from ...classes.route_builder import RouteBuilder
+    from ...classes.route_helpers import improve_route
+    from ...classes.truck import Truck
+    from ...load import build_travel_time_matrix
+
+    print(f'improve_route on a random route of {size} stops, by window size:')
+    with TemporaryDirectory() as directory:
+        distances, _, _ = load_data(
+            *write_input_files(directory, number_of_locations, 1))
+    travel_times = build_travel_time_matrix(distances, Truck.speed_function)
+    leave = Truck.first_delivery_time
+    route = random_route(distances, size)
+
+    for window_size in window_sizes:
+        start = perf_counter()
+        improved = improve_route(route, distances, [], travel_times, leave,
+                                 RouteBuilder.Stop, window_size)
+        seconds = perf_counter() - start
+        miles = sum(stop.dist for stop in improved)
+        print(f'\t{window_size:>3} stops: {miles:>6,.0f} mi {seconds:>6.2f} s')
+
+
+def benchmark_parallel_windows(workers=(2, 4, 8, 16), window_size=11,
+                               size=40, number_of_locations=1000):
+    '''Time improve_route at a large window size alone and with WindowPools
+    of growing numbers of processes; the speedup is bounded by the number
+    of cores, and by the pruning that the split search loses.'''
+    from ...classes.route_builder import RouteBuilder
+    from ...classes.route_helpers import improve_route, WindowPool
+    from ...classes.truck import Truck
+    from ...load import build_travel_time_matrix
+
+    print(f'improve_route, window of {window_size} on {size} stops, by '
+          f'worker processes ({os.cpu_count()} CPUs):')
+    with TemporaryDirectory() as directory:
+        distances, _, _ = load_data(
+            *write_input_files(directory, number_of_locations, 1))
+    travel_times = build_travel_time_matrix(distances, Truck.speed_function)
+    leave = Truck.first_delivery_time
+    route = random_route(distances, size)
+
+    start = perf_counter()
+    expected = improve_route(route, distances, [], travel_times, leave,
+                             RouteBuilder.Stop, window_size)
+    alone = perf_counter() - start
+    print(f'\t  1 (no pool): {alone:>6.2f} s')
+
+    for count in workers:
+        with WindowPool(distances, count) as pool:
+            start = perf_counter()
+            improved = improve_route(route, distances, [], travel_times,
+                                     leave, RouteBuilder.Stop, window_size,
+                                     pool)
+            seconds = perf_counter() - start
+        assert improved == expected
+        print(f'\t{count:>3} processes: {seconds:>6.2f} s '
+              f'({alone / seconds:.1f}x)')
+
+
+def benchmark_exact_routes(sizes=(6, 8, 10, 12, 14, 15, 16),
+                           number_of_locations=1000):
+    '''Time the exact (Held-Karp) solver on random routes of growing
+    length, up to a full truckload (Truck.max_packages stops), without and
+    with deadlines, next to the window search. Each stop past
+    RouteBuilder.exact_limit about doubles the time.'''
+    from ...classes.route_builder import RouteBuilder
+    from ...classes.route_helpers import exact_route, improve_route
+    from ...classes.truck import Truck
+    from ...load import build_travel_time_matrix
+
+    print('Random route of N stops, window / exact / exact with deadlines:')
+    with TemporaryDirectory() as directory:
+        distances, _, _ = load_data(
+            *write_input_files(directory, number_of_locations, 1))
+    travel_times = build_travel_time_matrix(distances, Truck.speed_function)
+    leave = Truck.first_delivery_time
+
+    for size in sizes:
+        route = random_route(distances, size)
+        # a deadline at every third stop, met by the window search's order
+        windowed = improve_route(route, distances, [], travel_times, leave,
+                                 RouteBuilder.Stop)
+        arrivals = [0]
+        for stop, next_stop in zip(windowed, windowed[1:]):
+            arrivals.append(arrivals[-1] +
+                            travel_times[stop.loc][next_stop.loc])
+        deadlines = [(stop.loc, leave.plus_seconds(arrival)) for stop, arrival
+                     in list(zip(windowed, arrivals))[1:-1:3]]
+
+        results = [f'{sum(stop.dist for stop in windowed):>5,.0f} mi']
+        for stop_deadlines in ([], deadlines):
+            start = perf_counter()
+            exact = exact_route(route, distances, stop_deadlines,
+                                travel_times, leave, RouteBuilder.Stop)
+            seconds = perf_counter() - start
+            results.append(f'{sum(stop.dist for stop in exact):>5,.0f} mi '
+                           f'{seconds:>6.3f} s')
+        print(f'\t{size:>3} stops: ' + ' / '.join(results))
+
+
+def benchmark_anytime_routes(budgets=(10, 50, 200, 1000),
+                             sizes=(16, 50, 200), number_of_locations=1000):
+    '''Compare route lengths after annealing random routes for growing
+    time budgets (anneal_route) with first-improvement local search.'''
+    from ...classes.route_builder import RouteBuilder
+    from ...classes.route_helpers import anneal_route, local_search_route
+    from ...classes.truck import Truck
+    from ...load import build_travel_time_matrix
+
+    print('Annealing a random route of N stops for '
+          + ' / '.join(f'{budget} ms' for budget in budgets)
+          + ', and first-improvement search:')
+    with TemporaryDirectory() as directory:
+        distances, _, _ = load_data(
+            *write_input_files(directory, number_of_locations, 1))
+    travel_times = build_travel_time_matrix(distances, Truck.speed_function)
+    neighbors = NeighborIndex(distances)
+    leave = Truck.first_delivery_time
+
+    for size in sizes:
+        route = random_route(distances, size)
+        results = []
+        for budget in budgets:
+            annealed = anneal_route(route, distances, [], travel_times, leave,
+                                    RouteBuilder.Stop, budget, seed=0)
+            results.append(f'{sum(stop.dist for stop in annealed):>7,.0f} mi')
+        start = perf_counter()
+        improved = local_search_route(route, distances, [], travel_times,
+                                      leave, RouteBuilder.Stop, 'first',
+                                      neighbors)
+        seconds = perf_counter() - start
+        results.append(f'{sum(stop.dist for stop in improved):>7,.0f} mi '
+                       f'{seconds:>5.2f} s')
+        miles = sum(stop.dist for stop in route)
+        print(f'\t{size:>5,} stops ({miles:>7,.0f} mi): '
+              + ' / '.join(results))
+
+
+def legacy_grouped_deliver_with(ready_pkgs):
+    '''The original RouteBuilder.grouped_deliver_with_constraints: groups
+    merged by set comparisons with every group so far, then filled by a
+    scan of all ready packages per group.'''
+    sets = []
+    for pkg in ready_pkgs:
+        if not pkg.special_note.deliver_with:
+            continue
+        IDs = set([pkg.ID] + pkg.special_note.deliver_with)
+        if any(IDs.issubset(set_) for set_ in sets):
+            continue
+        IDs_subsets = [set_ for set_ in sets if IDs.issuperset(set_)]
+        sets = [set_ for set_ in sets if set_ not in IDs_subsets]
+        sets.append(IDs)
+        overlaps = [set_ for set_ in sets if not IDs.isdisjoint(set_)]
+        sets = [set_ for set_ in sets if set_ not in overlaps]
+        sets.append(IDs.union(*overlaps))
+    return sorted([[pkg for pkg in ready_pkgs if pkg.ID in set_]
+                   for set_ in sets], key=len)
+
+
+def benchmark_delivery_groups(sizes=(300, 1000, 3000, 6000)):
+    '''Time grouping packages that must be delivered together (all
+    in groups of three, some of them chained together) the original
+    way and with DeliveryGroups, built once and then per route.'''
+    from ...classes.delivery_groups import DeliveryGroups
+
+    print('Grouping N packages, original / union-find build / per route:')
+    for size in sizes:
+        packages = []
+        for ID in range(1, size + 1):
+            # IDs 1, 4, 7... name the next two; 10, 19, 28... also name the
+            # ID 9 before them, joining their groups into chains
+            note = None
+            if ID % 3 == 1:
+                with_IDs = (ID + 1, ID + 2)
+                if ID % 9 == 1 and ID > 9:
+                    with_IDs += (ID - 9,)
+                note = 'deliver_with', with_IDs
+            packages.append(Package(ID, None, '5', '', None, note))
+        groups = DeliveryGroups(packages)
+        assert (sorted(sorted(pkg.ID for pkg in group) for group
+                       in legacy_grouped_deliver_with(packages)) ==
+                sorted(sorted(pkg.ID for pkg in group) for group
+                       in groups.ready_groups(packages).values()))
+        results = [timeit(lambda: legacy_grouped_deliver_with(packages),
+                          number=1),
+                   timeit(lambda: DeliveryGroups(packages), number=1),
+                   timeit(lambda: sorted(groups.ready_groups(packages)
+                                         .values(), key=len), number=1)]
+        print(f'\t{size:>6,} packages: '
+              + ' / '.join(f'{seconds:>7.4f} s' for seconds in results))
+
+
+def benchmark_simulation(sizes=(1000, 10000), number_of_locations=100):
+    '''Time a full run of the program without its questions: loading the
+    csv files, then building routes and delivering every package.'''
+    # imported here because __main__ itself imports the tests package
+    from ...__main__ import deliver_packages
+
+    print('Full simulated runs (load_data + deliver_packages):')
+    with TemporaryDirectory() as directory:
+        for size in sizes:
+            distance_csv, package_csv = write_input_files(
+                directory, number_of_locations, size)
+
+            start = perf_counter()
+            distances, Locations, packages = load_data(distance_csv,
+                                                       package_csv)
+            loaded = perf_counter()
+            trucks = deliver_packages(distances, Locations, packages, [])
+            finished = perf_counter()
+
+            miles = sum(truck.mileage_for_day for truck in trucks)
+            print(f'\t{size:>9,} packages: load {loaded - start:>7.2f} s, '
+                  f'deliver {finished - loaded:>8.2f} s '
+                  f'({miles:,.1f} miles)')
@@ -0,0 +1,95 @@
+import os
+from collections import namedtuple
+from tempfile import TemporaryDirectory
+from mmap import mmap
+from ... import cache as cache_module
+from ...cache import *
+from ...load import load_data
+from ..synthetic_data import write_input_files
+
+
+def package_fields(packages):
+    return [(pkg.ID, pkg.deadline, pkg.weight, pkg.location, pkg.state,
+             pkg.special_note.truck_number, pkg.special_note.deliver_with,
+             pkg.special_note.late_arrival)
+            for pkg in packages]
+
+
+def test_cache():
+    Location = namedtuple('Location', ['num', 'landmark', 'address'])
+
+    with TemporaryDirectory() as directory:
+        distance_csv, package_csv = write_input_files(directory, 30, 60)
+        cache_path = f'{directory}/inputs.cache'
+
+        # 1
+        # the first load writes the cache, later loads read it back as is
+        cold = load_data(distance_csv, package_csv, cache_path)
+        warm = read_cache(cache_path, distance_csv, package_csv, Location)
+        assert warm is not None
+        assert list(warm[0]) == list(cold[0])
+        assert warm[0].label == cold[0].label
+        assert warm[1] == cold[1] and warm[1].find('Landmark 2').num == 2
+        assert package_fields(warm[2]) == package_fields(cold[2])
+        reloaded = load_data(distance_csv, package_csv, cache_path)
+        assert package_fields(reloaded[2]) == package_fields(cold[2])
+
+        # 2
+        # touching a csv without changing it keeps the cache (by sha256)
+        os.utime(package_csv, ns=(0, 0))
+        assert read_cache(cache_path, distance_csv, package_csv,
+                          Location) is not None
+
+        # 3
+        # changing a csv makes the cache stale, and the next load rewrites it
+        with open(package_csv) as f:
+            lines = f.readlines()
+        with open(package_csv, 'w') as f:
+            f.writelines(lines[:-1])
+        assert read_cache(cache_path, distance_csv, package_csv,
+                          Location) is None
+        assert len(load_data(distance_csv, package_csv, cache_path)[2]) == 59
+        assert len(read_cache(cache_path, distance_csv, package_csv,
+                              Location)[2]) == 59
+
+        # 4
+        # a missing, foreign, older, truncated or corrupt cache is simply
+        # not used
+        assert read_cache(f'{directory}/none', distance_csv, package_csv,
+                          Location) is None
+        with open(cache_path, 'rb') as f:
+            contents = f.read()
+        landmark = contents.index(b'Landmark 2')
+        table_length = header_struct.size - 8  # offset of its field
+        tables = header_struct.unpack_from(contents)[-2]
+        broken_caches = (
+            b'not a cache' + contents[11:],
+            contents[:8] + b'\x00\x00' + contents[10:],
+            contents[:-5],
+            b'',
+            # a string that is not UTF-8
+            contents[:landmark] + b'\xff' + contents[landmark + 1:],
+            # a table block too short for its own counts
+            contents[:table_length] + (4).to_bytes(8, 'little') +
+            contents[table_length + 8:],
+            # table counts that don't fit in the table block
+            contents[:tables] + bytes([255]) * 16 + contents[tables + 16:])
+
+        # and any memory map of it is closed, so the file can be replaced
+        mapped_caches = []
+
+        class TrackedMmap(mmap):
+            def __init__(self, *args, **kwargs):
+                mapped_caches.append(self)
+
+        cache_module.mmap = TrackedMmap
+        try:
+            for broken in broken_caches:
+                with open(cache_path, 'wb') as f:
+                    f.write(broken)
+                assert read_cache(cache_path, distance_csv, package_csv,
+                                  Location) is None
+        finally:
+            cache_module.mmap = mmap
+        assert len(mapped_caches) == 3
+        assert all(mapped.closed for mapped in mapped_caches)
@@ -0,0 +1,152 @@
+import os
+from math import isnan
+from tempfile import TemporaryDirectory
+from ...classes.distance_matrix import *
+from ...load import *
+from ...load import numpy
+from ..synthetic_data import write_input_files
+
+
+def test_distances():
+    # a triangular csv after clean_distance_data: strings, '' where missing
+    rows = [['MILES', 1, 2, 3, 4],
+            [1, '0', '', '', ''],
+            [2, '3.5', '0', '', ''],
+            [3, '6', '3', '0', ''],
+            [4, '9', '6', '2.25', '0']]
+
+    # 1
+    # each pair is stored once and read either way round
+    distances = fill_distance_data(rows)
+    assert distances.size == 4 and len(distances._data) == 6
+    assert distances.dist(1, 2) == distances.dist(2, 1) == 3.5
+    assert distances.dist(3, 4) == 2.25 and distances.dist(3, 3) == 0.0
+    assert validate_distance_data(distances)
+
+    # 2
+    # rows are indexed by location number, starting with the number itself
+    assert distances.row(1) == [1, 0.0, 3.5, 6.0, 9.0]
+    assert distances.row(3) == [3, 6.0, 3.0, 0.0, 2.25]
+    assert distances.row(4) == [4, 9.0, 6.0, 2.25, 0.0]
+
+    # 3
+    # the old 2D-list layout still works: header row, labels, [i][j]
+    assert distances[0] == ['MILES', 1, 2, 3, 4]
+    assert distances[2][0] == 2 and distances[2][4] == 6.0
+    assert distances[-1] == [4, 9.0, 6.0, 2.25, 0.0]
+    assert distances[3][1:] == [6.0, 3.0, 0.0, 2.25]
+    assert len(distances) == 5 and len(distances[1]) == 5
+    assert [row[0] for row in distances[1:]] == [1, 2, 3, 4]
+
+    # 4
+    # pairs missing both ways, or contradicting, are missing (NaN)
+    rows[3][2] = ''
+    rows[4][1] = '8'
+    rows[1][4] = '9'
+    distances = DistanceMatrix.from_rows(rows)
+    assert isnan(distances.dist(2, 3)) and isnan(distances.dist(1, 4))
+    assert not validate_distance_data(distances)
+    distances.set_dist(3, 2, 3.0)
+    distances.set_dist(1, 4, 8.0)
+    assert validate_distance_data(distances) and distances.dist(4, 1) == 8.0
+
+    # 5
+    # with NumPy, where it is installed, pairs are filled and checked in
+    # bulk, with the same result; without it, asking for NumPy fails
+    rows[3][2], rows[1][4] = '3', '8'
+    if numpy is not None:
+        for use_numpy in (False, True):
+            distances = fill_distance_data(rows, use_numpy)
+            assert list(distances._data) == [3.5, 6.0, 8.0, 3.0, 6.0, 2.25]
+            assert validate_distance_data(distances, use_numpy)
+        rows[1][4] = '9'
+        assert not validate_distance_data(fill_distance_data(rows, True),
+                                          True)
+    else:
+        try:
+            fill_distance_data(rows, use_numpy=True)
+            raise AssertionError('expected an ImportError')
+        except ImportError:
+            pass
+
+    # 6
+    # locations out of range are errors, not someone else's distance
+    for i, j in ((0, 2), (2, 5), (5, 5)):
+        try:
+            distances.dist(i, j) if i != j else distances.row(i)
+            raise AssertionError('expected an IndexError')
+        except IndexError:
+            pass
+
+    # 7
+    # a distance csv converted to a distance file loads through a memory
+    # map, with the same locations and (float32) distances
+    with TemporaryDirectory() as directory:
+        distance_csv, package_csv = write_input_files(directory, 30, 40)
+        distance_file = f'{directory}/distances.bin'
+        mapped = convert_distance_csv(distance_csv, distance_file)
+        loaded, Locations, packages = load_data(distance_csv, package_csv)
+        assert mapped.size == 30 and mapped.label == loaded.label
+        assert mapped.locations == [tuple(loc) for loc in Locations]
+        assert all(abs(mapped.dist(i, j) - loaded.dist(i, j)) < 1e-5
+                   for i in range(1, 31) for j in range(1, 31))
+        assert mapped.row(7)[7] == 0.0 and mapped[7][0] == 7
+        assert len(mapped.triangle()) == len(loaded.triangle())
+
+        from_file = load_data(distance_file, package_csv)
+        assert isinstance(from_file[0], MappedDistanceMatrix)
+        assert from_file[1] == Locations and len(from_file[2]) == 40
+
+        # travel times from a mapped matrix are built a row at a time
+        travel_times = build_travel_time_matrix(mapped, lambda i, j: 18)
+        assert len(travel_times) == 0 and travel_times[3][3] == 0
+        assert travel_times[3][5] == round(200 * mapped.dist(3, 5))
+        assert list(travel_times) == [3]
+
+        # 8
+        # contradicting csv distances are caught by the converter, and a
+        # file that is not a distance file is refused
+        with open(distance_csv) as f:
+            text = f.read()
+        with open(distance_csv, 'w') as f:
+            f.write(text.replace(',0.0,', ',0.0,12345.6,', 1))
+        try:
+            convert_distance_csv(distance_csv, distance_file)
+            raise AssertionError('expected a DistanceCsv_ValueError')
+        except DistanceCsv_ValueError:
+            pass
+        try:
+            MappedDistanceMatrix(distance_csv)
+            raise AssertionError('expected a DistanceFile_ValueError')
+        except DistanceFile_ValueError:
+            pass
+        # a failed conversion leaves the earlier distance file as it was,
+        # and no temporary file
+        kept = MappedDistanceMatrix(distance_file)
+        assert kept.size == 30
+        kept.close()
+        assert not [name for name in os.listdir(directory)
+                    if name.endswith('.tmp')]
+
+        # so does a row beyond the locations in the header
+        with open(distance_csv, 'w') as f:
+            f.write(text + text.splitlines()[-1] + '\n')
+        try:
+            convert_distance_csv(distance_csv, distance_file)
+            raise AssertionError('expected a DistanceCsv_ValueError')
+        except DistanceCsv_ValueError:
+            pass
+        assert not [name for name in os.listdir(directory)
+                    if name.endswith('.tmp')]
+
+        # and a distance file of the other byte order is refused
+        with open(distance_file, 'r+b') as f:
+            f.seek(10)  # after magic (8 bytes) and version (2 bytes)
+            order = f.read(1)[0]
+            f.seek(10)
+            f.write(bytes([1 - order]))
+        try:
+            MappedDistanceMatrix(distance_file)
+            raise AssertionError('expected a DistanceFile_ValueError')
+        except DistanceFile_ValueError:
+            pass
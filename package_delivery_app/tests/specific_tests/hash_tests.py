@@ -159,14 +159,6 @@ def test_hashes():
     # hash_eight = Hash(('hey', 4))
     # print(hash_eight._debug_str())
 
-    # 21 PASS
-    # deepcopy method works
-    # b = [[[3,4],[5],6],[7,[8,9]],10]
-    # b_ = Hash._deepcopy(b)
-    # print(b)
-    # print(b_)
-    # print('This should fail: id b_ == id b:', id(b_)==id(b))
-
     # 22 PASS
     # initializing Hash with None throws KeyError (because None not a string)
     # hash_nine = Hash(None)
@@ -201,3 +193,125 @@ def test_hashes():
     # hash_14 = Hash(a_kwarg=45)
     # print("I expect to see a Hash with k-v pair [a_kwarg, 45]")
     # print(hash_14._debug_str())
+
+    # 27
+    # table sizes are powers of two, so indexing is a mask of the key's hash
+    hash_15 = Hash(*[str(n) for n in range(200)])
+    assert hash_15._hash_size & (hash_15._hash_size - 1) == 0
+    assert all(hash_15[str(n)] is None for n in range(200))
+    assert hash_15._hash('42') == Hash._hash_key('42') & (
+        hash_15._hash_size - 1)
+
+    # 28
+    # key hashes are memoized and are the same for every Hash object
+    assert Hash._key_hashes['42'] == Hash._hash_key('42')
+    assert 0 <= Hash._hash_key('special_note') < 2 ** 32
+    assert Hash('ID')._hash('ID') == Hash('ID', 'state')._hash('ID')
+
+    # 29
+    # re-setting an existing key replaces its value without adding a slot
+    hash_16 = Hash('bob', 'joe')
+    size_before = hash_16._hash_size
+    for n in range(100):
+        hash_16['bob'] = n
+    assert hash_16['bob'] == 99 and hash_16._count == 2
+    assert hash_16._hash_size == size_before
+
+    # 30
+    # deleting leaves a tombstone: keys probed past it are still found,
+    # and the tombstone's slot is reused by the next new key
+    hash_17 = Hash(*[str(n) for n in range(30)])
+    del hash_17['7']
+    assert hash_17.get('7', 'gone') == 'gone'
+    assert all(hash_17[str(n)] is None for n in range(30) if n != 7)
+    used_before = hash_17._used
+    hash_17['7'] = 'back'
+    assert hash_17['7'] == 'back' and hash_17._used == used_before
+
+    # 31
+    # equality ignores slot order and table size
+    hash_18 = Hash(*[str(n) for n in range(40)])
+    hash_19 = Hash(*[str(n) for n in reversed(range(40))])
+    assert hash_18 == hash_19 and hash_18 == eval(repr(hash_18))
+    hash_19['0'] = 1
+    assert hash_18 != hash_19
+
+    # 32
+    # with_capacity and from_pairs presize, so filling them never rehashes
+    hash_20 = Hash.with_capacity(1000)
+    size_before = hash_20._hash_size
+    for n in range(1000):
+        hash_20[str(n)] = n
+    assert hash_20._hash_size == size_before and hash_20['999'] == 999
+    hash_21 = Hash.from_pairs((str(n), n) for n in range(1000))
+    assert hash_21._hash_size == size_before and hash_21 == hash_20
+
+    # 33
+    # incremental resizing keeps the old slots until they are all migrated,
+    # and every key stays reachable (and deletable) meanwhile
+    hash_22 = Hash.with_capacity(0, incremental=True)
+    for n in range(310):  # the 308th key starts a resize from 512 slots
+        hash_22[str(n)] = n
+    assert hash_22._old_keys is not None
+    assert all(hash_22[str(n)] == n for n in range(310))
+    del hash_22['0']
+    hash_22['1'] = 'one'
+    assert hash_22.get('0') is None and hash_22['1'] == 'one'
+    for n in range(310, 700):
+        hash_22[str(n)] = n
+    assert hash_22._count == 699 and len(hash_22._flatten()) == 699
+    assert all(hash_22[str(n)] == n for n in range(2, 700))
+
+    # 34
+    # Hash objects start just big enough for the keys they are created with
+    assert Hash()._hash_size == 8 and Hash('a', 'b', 'c', 'd')._hash_size == 8
+    assert Hash(*[str(n) for n in range(5)])._hash_size == 16
+
+    # 35
+    # Hash objects made from a shared layout share its keys until a key is
+    # added or deleted, while values are always their own
+    layout = Hash.shared_layout('truck_number', 'deliver_with')
+    hash_23, hash_24 = Hash.from_layout(layout), Hash.from_layout(layout)
+    hash_23['truck_number'] = 2
+    assert hash_23._keys is layout._keys and hash_24['truck_number'] is None
+    hash_24['late_arrival'] = True
+    assert hash_24._keys is not layout._keys and hash_23._keys is layout._keys
+    assert layout.get('late_arrival') is None
+    del hash_23['deliver_with']
+    assert hash_23._keys is not layout._keys and layout['deliver_with'] is None
+    assert hash_24 == Hash('truck_number', 'deliver_with', ('late_arrival',
+                                                            True))
+
+    # 36
+    # mapping protocol: len, in, iteration, keys/values/items and update
+    hash_25 = Hash(['a', 1], ['b', 2])
+    assert len(hash_25) == 2 and 'a' in hash_25 and 'c' not in hash_25
+    assert sorted(hash_25) == ['a', 'b'] and sorted(hash_25.values()) == [1, 2]
+    hash_25.update({'c': 3}, [('d', 4)], Hash(['e', 5]), f=6)
+    assert sorted(hash_25.items()) == [('a', 1), ('b', 2), ('c', 3),
+                                       ('d', 4), ('e', 5), ('f', 6)]
+    hash_25.update((str(n), n) for n in range(100))
+    assert len(hash_25) == 106 and hash_25['99'] == 99
+
+    # 37
+    # iteration also covers old slots not yet migrated by an incremental
+    # resize, and values may be replaced while iterating
+    hash_26 = Hash.with_capacity(0, incremental=True)
+    for n in range(310):
+        hash_26[str(n)] = n
+    assert hash_26._old_keys is not None
+    for key in hash_26:
+        hash_26[key] = -hash_26[key]
+    assert sorted(hash_26.values()) == [-n for n in reversed(range(310))]
+
+    # 38
+    # adding or deleting a key while iterating raises a RuntimeError
+    for change in (lambda h: h.__setitem__('new', 1),
+                   lambda h: h.__delitem__('a')):
+        hash_27 = Hash('a', 'b', 'c')
+        try:
+            for key in hash_27:
+                change(hash_27)
+            raise AssertionError('expected a RuntimeError')
+        except RuntimeError:
+            pass
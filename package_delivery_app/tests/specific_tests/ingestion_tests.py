@@ -0,0 +1,86 @@
+from tempfile import TemporaryDirectory
+from ...load import *
+from ..synthetic_data import write_input_files
+
+
+def test_ingestion():
+    with TemporaryDirectory() as directory:
+        distance_csv, package_csv = write_input_files(directory, 30, 40)
+        gzipped_distance_csv, gzipped_package_csv = write_input_files(
+            directory, 30, 40, suffix='.csv.gz')
+        _, Locations, packages = load_data(distance_csv, package_csv)
+
+        # 1
+        # gzipped csv files load just the same
+        gzipped = load_data(gzipped_distance_csv, gzipped_package_csv)
+        assert gzipped[1] == Locations
+        assert ([(pkg.ID, pkg.location, pkg.deadline) for pkg in gzipped[2]]
+                == [(pkg.ID, pkg.location, pkg.deadline) for pkg in packages])
+
+        # 2
+        # chunks hold at most chunk_size rows, in file order
+        chunks = list(stream_package_chunks(package_csv, Locations, 16))
+        assert [len(chunk.packages) for chunk in chunks] == [16, 16, 8]
+        assert [pkg.ID for chunk in chunks for pkg in chunk.packages] == list(
+            range(1, 41))
+        assert chunks[0].notes[2] == 'Can only be on truck 2'
+        assert not any(chunk.errors for chunk in chunks)
+
+        # 3
+        # parallel loads give the same packages, in the same order
+        for parallel in ('threads', 'processes'):
+            loaded = load_data(distance_csv, package_csv, parallel=parallel,
+                               package_workers=3)
+            assert loaded[1] == Locations
+            assert [(pkg.ID, pkg.location, pkg.deadline,
+                     pkg.special_note.props) for pkg in loaded[2]] == [
+                (pkg.ID, pkg.location, pkg.deadline,
+                 pkg.special_note.props) for pkg in packages]
+
+        # 4
+        # bad rows are reported by line number without stopping the stream;
+        # a quoted note spanning two lines moves the later line numbers
+        with open(package_csv) as f:
+            lines = f.readlines()
+        lines[2] = '2,1 Nowhere Rd,Salt Lake City,UT,84100,EOD,66,\n'
+        lines[3] = lines[3].replace('EOD', '25:99 AM')
+        lines[4] = lines[4].replace(',\n', ',Can only be on truck 2 or 3\n')
+        lines[5] = '5,too,short\n'
+        lines[9] = lines[9].replace('Wrong address listed',
+                                    '"Wrong address\nlisted"')
+        lines[10] = lines[10].replace('EOD', 'noon')
+        with open(package_csv, 'w') as f:
+            f.writelines(lines)
+
+        chunks = list(stream_package_chunks(package_csv, Locations, 5))
+        errors = [error for chunk in chunks for error in chunk.errors]
+        assert [error.line_number for error in errors] == [3, 4, 5, 6, 12]
+        assert [error.row[0] for error in errors] == ['2', '3', '4', '5', '10']
+        assert 'does not match any location' in errors[0].message
+        assert 'AM/PM' in errors[1].message and 'AM/PM' in errors[4].message
+        assert 'Truck-number' in errors[2].message
+        assert 'columns' in errors[3].message
+        packages = [pkg for chunk in chunks for pkg in chunk.packages]
+        assert len(packages) == 35 and packages[4].ID == 9
+        assert packages[4].special_note.wrong_destination
+
+        for parallel, workers in ((None, 1), ('threads', 3), ('threads', 7),
+                                  ('processes', 2)):
+            try:
+                load_data(distance_csv, package_csv, parallel=parallel,
+                          package_workers=workers)
+                raise AssertionError('expected a PackageCsv_ValueError')
+            except PackageCsv_ValueError as error:
+                assert '5 package row(s)' in str(error)
+                assert 'line 12:' in str(error)
+
+        # 5
+        # byte ranges split the csv at line starts: every row is read once
+        for parts in range(1, 12):
+            rows = [(prepared.line_number, prepared.row[0])
+                    for start, stop in package_csv_ranges(package_csv, parts)
+                    for prepared in prepare_package_rows(package_csv, start,
+                                                         stop)]
+            assert rows == [(line_number, row[0]) for line_number, row
+                            in read_package_rows(package_csv)]
+        assert package_csv_ranges(gzipped_package_csv, 4) == [(0, None)]
@@ -0,0 +1,48 @@
+from collections import namedtuple
+from ...classes.location_index import *
+from ...cli import (validate_user_correction_information,
+                    get_time_or_location_from_string)
+from ...load import get_one_package_destination
+
+
+def test_locations():
+    Location = namedtuple('Location', ['num', 'landmark', 'address'])
+    Locations = LocationIndex([
+        Location(1, 'Western Governors University', '4001 S 700 E 84107'),
+        Location(2, 'City Hall', '300 State St 84103'),
+        Location(3, 'Council Hall', '300 State St 84103'),
+    ])
+
+    # 1
+    # still the list of Locations it always was
+    assert len(Locations) == 3 and Locations[1].landmark == 'City Hall'
+    assert [loc.num for loc in Locations] == [1, 2, 3]
+
+    # 2
+    # addresses match ignoring case, spacing and spelled-out directions
+    assert Locations.find_address('4001 South 700 East 84107').num == 1
+    assert Locations.find_address('4001  s 700 e   84107').num == 1
+    assert Locations.find_address('4001 S 700 E 84108') is None
+
+    # 3
+    # find checks landmark, then address with zip, then address without;
+    # for a shared address the lower-numbered location wins, as with .index
+    assert Locations.find('city hall').num == 2
+    assert Locations.find('300 State St 84103').num == 2
+    assert Locations.find('300 State St').num == 2
+    assert Locations.find('Nowhere') is None
+
+    # 4
+    # plain lists of Locations are accepted wherever Locations are looked up
+    plain = list(Locations)
+    assert as_location_index(Locations) is Locations
+    assert as_location_index(plain).find('Council Hall').num == 3
+    row = ['9', '300 State St', 'Salt Lake City', 'UT', '84103']
+    assert get_one_package_destination(row, plain).num == 2
+
+    # 5
+    # the cli destination corrections go through the same lookups
+    assert validate_user_correction_information('9, Council Hall', Locations)
+    assert validate_user_correction_information('9, 4001 S 700 E', plain)
+    assert not validate_user_correction_information('9, Nowhere', Locations)
+    assert get_time_or_location_from_string(' 300 State St ', plain).num == 2
@@ -0,0 +1,39 @@
+from collections import namedtuple
+from ...classes.package import *
+from ...classes.truck import Truck
+
+
+def test_records():
+    Location = namedtuple('Location', ['num', 'landmark', 'address'])
+    hub = Location(1, 'Hub', '4001 S 700 E 84107')
+
+    # 1
+    # package fields are plain attributes, parsed special notes included
+    package = Package('7', None, '2', 'Can only be on truck 2', hub)
+    assert package.ID == 7 and package.location is hub
+    assert package.special_note.truck_number == 2
+    assert package.special_note.deliver_with is None
+    assert package.state is PkgState.AT_HUB
+
+    # 2
+    # the props view reads and writes the very same fields, Hash-style,
+    # including nested records like the special note
+    assert package.props['ID'] == 7 and package.props.get('nope') is None
+    assert package.props['special_note']['truck_number'] == 2
+    package.props['special_note']['truck_number'] = 1
+    assert package.special_note.truck_number == 1
+    package.props['state'] = PkgState.DELIVERED
+    assert package.state is PkgState.DELIVERED
+    assert 'history' in package.props and len(package.props) == 7
+    try:
+        package.props['nope']
+        raise AssertionError('expected a KeyError')
+    except KeyError:
+        pass
+
+    # 3
+    # records have no per-object __dict__
+    truck = Truck()
+    assert not hasattr(truck, '__dict__') and not hasattr(package, '__dict__')
+    truck.props['mileage_for_day'] += 3.5
+    assert truck.mileage_for_day == 3.5 and truck.props['time'] is truck.time
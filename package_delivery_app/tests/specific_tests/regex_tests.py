@@ -1,4 +1,5 @@
 import re
+from ...classes.package import *
 
 
 def test_regexes():
@@ -17,7 +18,53 @@ def test_regexes():
     validate_package_ID_list
     validate_arrival_time
     '''
-    pass
+    parse_special_note_text.cache_clear()
+
+    # 1
+    # one combined regex classifies and extracts each kind of note
+    assert parse_special_note_text('Can only be on truck 2') == (
+        'truck_number', 2)
+    assert parse_special_note_text('can oNlY be on trUcK 2') == (
+        'truck_number', 2)
+    assert parse_special_note_text('Must be delivered with 13, 15, 19') == (
+        'deliver_with', (13, 15, 19))
+    assert parse_special_note_text(
+        'Delayed on flight---will not arrive to depot until 9:05 am') == (
+        'late_arrival', Time_Custom(9, 5, 0))
+    assert parse_special_note_text('Wrong address listed') == (
+        'wrong_destination', True)
+    assert parse_special_note_text('') is None
+
+    # 2
+    # the constraints keep their priority wherever they are in the note
+    assert parse_special_note_text('Wrong address; delayed 9:05 am')[0] == (
+        'late_arrival')
+    assert parse_special_note_text('x\nwrong address')[0] == (
+        'wrong_destination')
+
+    # 3
+    # notes that cannot be parsed still raise
+    for note in ('Can only be on truck 22', 'Can only be on truck2',
+                 'Delayed 19:65 am', 'Delayed\n9:05 am', 'incorrect address'):
+        try:
+            parse_special_note_text(note)
+            raise AssertionError(f'expected {note!r} not to parse')
+        except PackageSpecialNote_ValueError:
+            pass
+
+    # 4
+    # parsed notes are cached by text; packages get their own lists
+    parse_special_note_text('Must be delivered with 13, 15, 19')
+    assert parse_special_note_text.cache_info().hits >= 1
+    notes = ['', 'Must be delivered with 1, 2', '', 'Can only be on truck 2']
+    parsed = parse_special_notes(notes)
+    assert parsed == [None, ('deliver_with', (1, 2)), None,
+                      ('truck_number', 2)]
+    Location = (1, 'Hub', '4001 S 700 E 84107')
+    first, second = [Package(n, None, '1', notes[1], Location, parsed[1])
+                     for n in (1, 2)]
+    first.special_note.deliver_with.append(3)
+    assert second.special_note.deliver_with == [1, 2]
 
 # Test strings and expected pass/fails:
 # s = 'Can only be on truck 2'  # expect: pass
@@ -0,0 +1,39 @@
+import pickle
+from ...classes.time_custom import *
+
+
+def test_times():
+    # 1
+    # plus_minutes returns a new time and leaves the original alone
+    start = Time_Custom(13, 15, 27)
+    later = start.plus_minutes(33.5)
+    assert str(later) == '13:48:57' and str(start) == '13:15:27'
+    assert later == Time_Custom.from_seconds(start.seconds + 2010)
+    assert start.plus_seconds(45).minute == 16
+
+    # 2
+    # times compare as wholes, even when their minutes happen to be equal
+    assert Time_Custom(9, 30, 50) < Time_Custom(10, 30, 10)
+    assert Time_Custom(10, 30, 10) > Time_Custom(9, 30, 50)
+    assert not Time_Custom(10, 30, 10) < Time_Custom(9, 30, 50)
+    assert Time_Custom(8, 0, 0) <= Time_Custom(8, 0, 0) >= Time_Custom(8, 0, 0)
+
+    # 3
+    # times are hashable, immutable and picklable
+    assert len({Time_Custom(8, 0, 0), Time_Custom(8, 0, 0)}) == 1
+    assert Time_Custom(8, 0, 0) != 'eight'
+    try:
+        start.hour = 2
+        raise AssertionError('expected an AttributeError')
+    except AttributeError:
+        pass
+    assert pickle.loads(pickle.dumps(start)) == start
+
+    # 4
+    # plus_minutes still refuses negative or over-16-hour travel times
+    for minutes in (-1, 961):
+        try:
+            start.plus_minutes(minutes)
+            raise AssertionError('expected a ValueError')
+        except ValueError:
+            pass
@@ -0,0 +1,121 @@
+import csv
+import gzip
+from math import hypot
+from random import Random
+
+
+'''
+    Synthetic input files for the benchmarks. They follow the csv formats
+    documented in load.py (see read_distance_csv and read_package_csv), so
+    they go through exactly the same loading code as real input files.
+'''
+
+directions = ('North', 'South', 'East', 'West')
+streets = ('Main St', 'State St', 'Center St', 'Pine Ave', 'Elm Blvd')
+
+
+def make_locations(number_of_locations, seed=0):
+    '''Return list of (landmark, street address, zip, x, y) tuples.
+
+    Location 1 is the hub and sits in the middle of a 20x20 mile area.
+    One location is always '410 S State St 84111', the destination that
+    the cli module hard-codes as a correction for package 9.
+    '''
+    rng = Random(seed)
+    locations = [('Western Governors University', '4001 South 700 East',
+                  '84107', 10.0, 10.0)]
+    for index in range(2, number_of_locations + 1):
+        if index == 2:
+            street_address, zip_code = '410 S State St', '84111'
+        else:
+            street_address = (f'{index * 10} {rng.choice(directions)} '
+                              f'{rng.choice(streets)}')
+            zip_code = str(84100 + index % 90)
+        locations.append((f'Landmark {index}', street_address, zip_code,
+                          rng.uniform(0, 20), rng.uniform(0, 20)))
+    return locations
+
+
+def distance_between(location_one, location_two):
+    '''Return a rounded distance in miles of at least one mile.'''
+    x1, y1 = location_one[3:5]
+    x2, y2 = location_two[3:5]
+    return max(1.0, round(hypot(x1 - x2, y1 - y2), 1))
+
+
+def open_for_writing(filename):
+    '''Open filename as text for writing, gzip-compressed if it ends .gz.'''
+    if filename.endswith('.gz'):
+        return gzip.open(filename, 'wt', newline='')
+    return open(filename, 'w', newline='')
+
+
+def write_distance_csv(filename, locations):
+    '''Write a lower-triangular distance csv for the given locations.'''
+    with open_for_writing(filename) as f:
+        writer = csv.writer(f)
+        writer.writerow(['DISTANCE BETWEEN HUBS IN MILES', ''] +
+                        [f'{loc[0]}\n {loc[1]}' for loc in locations])
+        for row_index, location in enumerate(locations):
+            distances = [distance_between(location, other)
+                         if col_index < row_index
+                         else 0.0 if col_index == row_index
+                         else ''
+                         for col_index, other in enumerate(locations)]
+            writer.writerow([f'{location[0]}\n {location[1]}',
+                             f' {location[1]}\n({location[2]})'] + distances)
+
+
+def write_package_csv(filename, locations, number_of_packages, seed=0):
+    '''Write a package csv whose packages are deliverable on time.
+
+    A small, fixed share of packages get deadlines or special notes, always
+    at locations near the hub, so the simulation can meet every constraint
+    no matter how many packages there are.
+    '''
+    rng = Random(seed)
+    near_hub = sorted(locations[1:],
+                      key=lambda loc: distance_between(locations[0], loc))
+    near_hub = near_hub[:max(4, len(near_hub) // 10)]
+
+    with open_for_writing(filename) as f:
+        writer = csv.writer(f)
+        writer.writerow(['Package ID', 'Address', 'City', 'State', 'Zip',
+                         'Delivery Deadline', 'Mass KILO', 'Special Notes'])
+        for pkg_id in range(1, number_of_packages + 1):
+            location = rng.choice(locations[1:])
+            deadline, note = 'EOD', ''
+
+            if pkg_id <= 40:
+                if pkg_id % 10 == 1:
+                    location = rng.choice(near_hub)
+                    deadline = '10:30 AM'
+                elif pkg_id == 3:
+                    note = 'Can only be on truck 2'
+                elif pkg_id == 6:
+                    note = ('Delayed on flight---will not arrive to depot '
+                            'until 9:05 am')
+                elif pkg_id == 9:
+                    note = 'Wrong address listed'
+                elif pkg_id == 14:
+                    location = rng.choice(near_hub)
+                    deadline = '10:30 AM'
+                    note = 'Must be delivered with 15, 19'
+                elif pkg_id == 16:
+                    note = 'Must be delivered with 13, 19'
+
+            writer.writerow([pkg_id, location[1], 'Salt Lake City', 'UT',
+                             location[2], deadline, rng.randint(1, 80), note])
+
+
+def write_input_files(directory, number_of_locations, number_of_packages,
+                      seed=0, suffix='.csv'):
+    '''Write a distance csv and a package csv into directory and return
+    their two filenames.'''
+    locations = make_locations(number_of_locations, seed)
+    distance_csv = f'{directory}/distances_{number_of_locations}{suffix}'
+    package_csv = (f'{directory}/packages_{number_of_locations}_'
+                   f'{number_of_packages}{suffix}')
+    write_distance_csv(distance_csv, locations)
+    write_package_csv(package_csv, locations, number_of_packages, seed)
+    return distance_csv, package_csv